@@ -1,6 +1,8 @@
 from logging.config import fileConfig
-from app.core.db import Base
-from sqlalchemy import engine_from_config
+from app.core.config import settings
+from app.core.db import Base, build_schema, schema_for
+from app.core.tenancy import is_default, is_known, known_tenants
+from sqlalchemy import create_engine, engine_from_config, inspect, text
 from sqlalchemy import pool
 
 from alembic import context
@@ -50,6 +52,41 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def _tenants() -> list[str]:
+    """
+    Tenants to migrate: `alembic -x tenant=acme upgrade head` for one,
+    `-x tenant=all` for every tenant in TENANTS (and the default).
+    Without -x only the default database/schema is migrated.
+    """
+    requested = context.get_x_argument(as_dictionary=True).get("tenant")
+    if not requested:
+        return [settings.DEFAULT_TENANT]
+    if requested == "all":
+        return known_tenants()
+    if not is_known(requested):
+        raise SystemExit(f"Unknown tenant {requested!r}; add it to TENANTS first")
+    return [requested]
+
+
+def _migrate(connection, schema=None) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata, version_table_schema=schema
+    )
+
+    # The oldest revisions alter tables they never created, so an empty
+    # database/schema (a new tenant) is built from the models and stamped
+    # at head instead of replaying the chain
+    if not inspect(connection).get_table_names(schema=schema):
+        print("Empty schema: creating tables from the models")
+        build_schema(connection)
+        context.get_context().stamp(context.script, "heads")
+        connection.commit()
+        return
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -63,13 +100,26 @@ def run_migrations_online() -> None:
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+    for tenant in _tenants():
+        print(f"Migrating tenant {tenant}")
+        if is_default(tenant):
+            with connectable.connect() as connection:
+                _migrate(connection)
+        elif settings.TENANT_ROUTING == "database":
+            tenant_engine = create_engine(
+                settings.TENANT_DB_URL_TEMPLATE.format(tenant=tenant), poolclass=pool.NullPool
+            )
+            with tenant_engine.connect() as connection:
+                _migrate(connection)
+        else:
+            schema = schema_for(tenant)
+            with connectable.connect() as connection:
+                # Session-wide search_path, so the raw SQL in migrations
+                # (op.execute, CONCURRENTLY blocks) hits the tenant's tables too
+                connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+                connection.execute(text(f'SET search_path TO "{schema}", public'))
+                connection.commit()
+                _migrate(connection.execution_options(schema_translate_map={None: schema}), schema)
 
 
 if context.is_offline_mode():
@@ -0,0 +1,53 @@
+"""Drop ix_leave_requests_employee_id, covered by ix_leave_requests_overlap
+
+Revision ID: a4c8e2f61d93
+Revises: f1c6a8e3b250
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f61d93'
+down_revision: Union[str, Sequence[str], None] = 'f1c6a8e3b250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAME = 'ix_leave_requests_employee_id'
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'leave_requests' AND c.relnamespace = current_schema()::regnamespace"
+    )).first() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The planner kept choosing this index for the approved-days sum over the
+    # partial covering index; ix_leave_requests_overlap serves the foreign key
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index(NAME, table_name='leave_requests', if_exists=True)
+        return
+    if _is_partitioned(bind):
+        # CONCURRENTLY isn't supported on partitioned indexes; dropping is a catalog change
+        op.execute(f"DROP INDEX IF EXISTS {NAME}")
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NAME}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or _is_partitioned(bind):
+        op.create_index(NAME, 'leave_requests', ['employee_id'], if_not_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {NAME} ON leave_requests (employee_id)")
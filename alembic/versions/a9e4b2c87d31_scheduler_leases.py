@@ -0,0 +1,34 @@
+"""Leases for leader-only scheduled jobs
+
+Revision ID: a9e4b2c87d31
+Revises: f3c9a7b14e62
+Create Date: 2026-10-22 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4b2c87d31'
+down_revision: Union[str, Sequence[str], None] = 'f3c9a7b14e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scheduler_leases',
+    sa.Column('job', sa.String(length=100), nullable=False),
+    sa.Column('slot', sa.BigInteger(), nullable=False),
+    sa.Column('owner', sa.String(length=255), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('job')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scheduler_leases')
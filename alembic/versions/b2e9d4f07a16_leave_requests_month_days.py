@@ -0,0 +1,30 @@
+"""Store each leave request's working days per month
+
+Revision ID: b2e9d4f07a16
+Revises: a4c8e2f61d93
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e9d4f07a16'
+down_revision: Union[str, Sequence[str], None] = 'a4c8e2f61d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable, so this is a catalog change even on the partitioned table;
+    # the balance-reconciliation job fills it in for existing rows
+    op.add_column('leave_requests', sa.Column('month_days', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('leave_requests', 'month_days')
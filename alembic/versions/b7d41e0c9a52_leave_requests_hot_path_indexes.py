@@ -0,0 +1,67 @@
+"""Hot-path indexes for leave_requests, built online
+
+Revision ID: b7d41e0c9a52
+Revises: 66ea70859495
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e0c9a52'
+down_revision: Union[str, Sequence[str], None] = '66ea70859495'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (columns, INCLUDE columns, WHERE clause)
+INDEXES = {
+    'ix_leave_requests_overlap': (['employee_id', 'start_date', 'end_date'], [], "status <> 'REJECTED'"),
+    'ix_leave_requests_approved_days': (['employee_id', 'days'], [], "status = 'APPROVED'"),
+    'ix_leave_requests_pending_days': (['employee_id', 'days'], [], "status = 'PENDING'"),
+    'ix_leave_requests_pending_queue': (['created_at', 'id'], ['employee_id'], "status = 'PENDING'"),
+    'ix_leave_requests_dates': (['start_date', 'end_date'], [], None),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for name, (columns, _, where) in INDEXES.items():
+            op.create_index(name, 'leave_requests', columns, if_not_exists=True,
+                            sqlite_where=sa.text(where) if where else None)
+        return
+
+    # CONCURRENTLY can't run inside a transaction and doesn't block writes
+    with op.get_context().autocommit_block():
+        for name, (columns, include, where) in INDEXES.items():
+            # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would keep
+            invalid = bind.execute(sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace AND NOT i.indisvalid"
+            ), {"name": name}).first()
+            if invalid:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            sql = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON leave_requests ({', '.join(columns)})"
+            if include:
+                sql += f" INCLUDE ({', '.join(include)})"
+            if where:
+                sql += f" WHERE {where}"
+            op.execute(sql)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for name in INDEXES:
+            op.drop_index(name, table_name='leave_requests', if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
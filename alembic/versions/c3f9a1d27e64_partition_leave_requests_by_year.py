@@ -0,0 +1,94 @@
+"""Partition leave_requests by start_date year
+
+Revision ID: c3f9a1d27e64
+Revises: b7d41e0c9a52
+Create Date: 2026-10-19 11:00:00.000000
+
+Postgres only. Copies the existing rows into a table partitioned by
+RANGE (start_date), one partition per year, then swaps the names. Writes
+to leave_requests are blocked (reads are not) for the duration of the copy,
+so run it in a quiet window on large tables.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a1d27e64'
+down_revision: Union[str, Sequence[str], None] = 'b7d41e0c9a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+YEARS_AHEAD = 2
+
+# Same definitions as revision b7d41e0c9a52; built on the parent so every partition gets them
+INDEXES = {
+    'ix_leave_requests_employee_id': (['employee_id'], [], None),
+    'ix_leave_requests_overlap': (['employee_id', 'start_date', 'end_date'], [], "status <> 'REJECTED'"),
+    'ix_leave_requests_approved_days': (['employee_id', 'days'], [], "status = 'APPROVED'"),
+    'ix_leave_requests_pending_days': (['employee_id', 'days'], [], "status = 'PENDING'"),
+    'ix_leave_requests_pending_queue': (['created_at', 'id'], ['employee_id'], "status = 'PENDING'"),
+    'ix_leave_requests_dates': (['start_date', 'end_date'], [], None),
+}
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = 'leave_requests' AND c.relnamespace = current_schema()::regnamespace"
+    )).first() is not None
+
+
+def _swap(partitioned: bool) -> None:
+    """Copy leave_requests into a new table of the requested shape and take over its name."""
+    bind = op.get_bind()
+    op.execute("LOCK TABLE leave_requests IN SHARE MODE")
+    partition_by = " PARTITION BY RANGE (start_date)" if partitioned else ""
+    pk = "id, start_date" if partitioned else "id"
+    # LIKE keeps column types and defaults, including the id sequence
+    op.execute(f"CREATE TABLE leave_requests_new (LIKE leave_requests INCLUDING DEFAULTS){partition_by}")
+    op.execute(f"ALTER TABLE leave_requests_new ADD CONSTRAINT leave_requests_new_pkey PRIMARY KEY ({pk})")
+
+    if partitioned:
+        bounds = bind.execute(sa.text(
+            "SELECT EXTRACT(YEAR FROM min(start_date))::int, EXTRACT(YEAR FROM max(start_date))::int FROM leave_requests"
+        )).first()
+        this_year = date.today().year
+        first = min(bounds[0] or this_year, this_year)
+        last = max(bounds[1] or this_year, this_year + YEARS_AHEAD)
+        for year in range(first, last + 1):
+            op.execute(
+                f"CREATE TABLE leave_requests_{year} PARTITION OF leave_requests_new "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+        op.execute("CREATE TABLE leave_requests_default PARTITION OF leave_requests_new DEFAULT")
+
+    op.execute("INSERT INTO leave_requests_new SELECT * FROM leave_requests")
+    op.execute("ALTER SEQUENCE IF EXISTS leave_requests_id_seq OWNED BY leave_requests_new.id")
+    op.execute("DROP TABLE leave_requests")
+    op.execute("ALTER TABLE leave_requests_new RENAME TO leave_requests")
+    op.execute("ALTER TABLE leave_requests RENAME CONSTRAINT leave_requests_new_pkey TO leave_requests_pkey")
+    op.create_foreign_key('leave_requests_employee_id_fkey', 'leave_requests', 'employees', ['employee_id'], ['id'])
+    op.create_foreign_key('leave_requests_leave_type_id_fkey', 'leave_requests', 'leave_types', ['leave_type_id'], ['id'])
+    for name, (columns, include, where) in INDEXES.items():
+        op.create_index(name, 'leave_requests', columns, postgresql_include=include,
+                        postgresql_where=sa.text(where) if where else None)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or _is_partitioned(bind):
+        return
+    _swap(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not _is_partitioned(bind):
+        return
+    _swap(partitioned=False)
@@ -0,0 +1,47 @@
+"""Transactional outbox for leave lifecycle webhooks
+
+Revision ID: c6d1f8a2e437
+Revises: b2e9d4f07a16
+Create Date: 2026-10-22 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d1f8a2e437'
+down_revision: Union[str, Sequence[str], None] = 'b2e9d4f07a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('leave_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('delivered_to', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_events_employee_id'), 'outbox_events', ['employee_id'], unique=False)
+    op.create_index('ix_outbox_pending', 'outbox_events', ['id'], unique=False,
+                    postgresql_where=sa.text("status = 'pending'"), sqlite_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_pending', table_name='outbox_events')
+    op.drop_index(op.f('ix_outbox_events_employee_id'), table_name='outbox_events')
+    op.drop_table('outbox_events')
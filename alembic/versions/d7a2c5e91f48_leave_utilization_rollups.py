@@ -0,0 +1,41 @@
+"""Monthly leave utilization rollups
+
+Revision ID: d7a2c5e91f48
+Revises: c6d1f8a2e437
+Create Date: 2026-10-22 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2c5e91f48'
+down_revision: Union[str, Sequence[str], None] = 'c6d1f8a2e437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Starts empty; the balance-reconciliation job rebuilds it from leave_requests
+    op.create_table('leave_utilization_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('domain', sa.String(length=100), nullable=False),
+    sa.Column('leave_type_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('approved_days', sa.Integer(), nullable=False),
+    sa.Column('pending_days', sa.Integer(), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['leave_type_id'], ['leave_types.id']),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('domain', 'leave_type_id', 'month', name='uq_rollup_domain_type_month')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('leave_utilization_rollups')
@@ -0,0 +1,64 @@
+"""Move password setup tokens to a hashed, expiring table
+
+Revision ID: d84e2b6f1c07
+Revises: c3f9a1d27e64
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84e2b6f1c07'
+down_revision: Union[str, Sequence[str], None] = 'c3f9a1d27e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Outstanding links get a fresh validity window from the moment of the upgrade
+TTL_HOURS = 24
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tokens = op.create_table('password_setup_tokens',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_password_setup_tokens_employee_id'), 'password_setup_tokens', ['employee_id'], unique=False)
+    op.create_index(op.f('ix_password_setup_tokens_token_hash'), 'password_setup_tokens', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_password_setup_tokens_expires_at'), 'password_setup_tokens', ['expires_at'], unique=False)
+
+    bind = op.get_bind()
+    pending = bind.execute(sa.text(
+        "SELECT id, password_setup_token FROM employees WHERE password_setup_token IS NOT NULL"
+    )).all()
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=TTL_HOURS)
+    if pending:
+        op.bulk_insert(tokens, [
+            {"employee_id": emp_id, "token_hash": hashlib.sha256(token.encode()).hexdigest(), "expires_at": expires_at}
+            for emp_id, token in pending
+        ])
+
+    with op.batch_alter_table('employees') as batch_op:
+        batch_op.drop_column('password_setup_token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Hashes can't be turned back into tokens; outstanding links stop working
+    with op.batch_alter_table('employees') as batch_op:
+        batch_op.add_column(sa.Column('password_setup_token', sa.VARCHAR(length=255), autoincrement=False, nullable=True))
+    op.drop_index(op.f('ix_password_setup_tokens_expires_at'), table_name='password_setup_tokens')
+    op.drop_index(op.f('ix_password_setup_tokens_token_hash'), table_name='password_setup_tokens')
+    op.drop_index(op.f('ix_password_setup_tokens_employee_id'), table_name='password_setup_tokens')
+    op.drop_table('password_setup_tokens')
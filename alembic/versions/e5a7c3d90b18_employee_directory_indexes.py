@@ -0,0 +1,65 @@
+"""Employee directory indexes (keyset order, prefix and trigram search)
+
+Revision ID: e5a7c3d90b18
+Revises: d84e2b6f1c07
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3d90b18'
+down_revision: Union[str, Sequence[str], None] = 'd84e2b6f1c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (Postgres index body, generic columns or expressions)
+INDEXES = {
+    'ix_employees_name_id': ("(name, id)", ['name', 'id']),
+    'ix_employees_domain_name_id': ("(domain, name, id)", ['domain', 'name', 'id']),
+    'ix_employees_job_type_name_id': ("(job_type, name, id)", ['job_type', 'name', 'id']),
+    'ix_employees_name_lower': ("(lower(name) text_pattern_ops)", [sa.text('lower(name)')]),
+    'ix_employees_email_lower': ("(lower(email) text_pattern_ops)", [sa.text('lower(email)')]),
+}
+TRGM_INDEXES = {
+    'ix_employees_name_trgm': "USING gin (name gin_trgm_ops)",
+    'ix_employees_email_trgm': "USING gin (email gin_trgm_ops)",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for name, (_, columns) in INDEXES.items():
+            op.create_index(name, 'employees', columns, if_not_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, (body, _) in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON employees {body}")
+        # Fuzzy search falls back to substring matching when the extension can't be installed
+        try:
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except sa.exc.DBAPIError as e:
+            print("⚠️ pg_trgm unavailable, skipping trigram indexes:", e.orig)
+            return
+        for name, body in TRGM_INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON employees {body}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        for name in INDEXES:
+            op.drop_index(name, table_name='employees', if_exists=True)
+        return
+
+    with op.get_context().autocommit_block():
+        for name in [*TRGM_INDEXES, *INDEXES]:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,52 @@
+"""Manager hierarchy on employees with a closure table
+
+Revision ID: f1c6a8e3b250
+Revises: e5a7c3d90b18
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a8e3b250'
+down_revision: Union[str, Sequence[str], None] = 'e5a7c3d90b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('employees') as batch_op:
+        batch_op.add_column(sa.Column('manager_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_employees_manager_id', 'employees', ['manager_id'], ['id'], ondelete='SET NULL')
+        batch_op.create_index(batch_op.f('ix_employees_manager_id'), ['manager_id'], unique=False)
+
+    op.create_table('employee_hierarchy',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['employees.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_employee_hierarchy_descendant_depth', 'employee_hierarchy', ['descendant_id', 'depth'], unique=False)
+
+    # Nobody has a manager yet: every employee is the root of their own tree
+    op.execute(
+        "INSERT INTO employee_hierarchy (ancestor_id, descendant_id, depth) "
+        "SELECT id, id, 0 FROM employees"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_employee_hierarchy_descendant_depth', table_name='employee_hierarchy')
+    op.drop_table('employee_hierarchy')
+    with op.batch_alter_table('employees') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_employees_manager_id'))
+        batch_op.drop_constraint('fk_employees_manager_id', type_='foreignkey')
+        batch_op.drop_column('manager_id')
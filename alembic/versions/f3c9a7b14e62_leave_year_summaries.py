@@ -0,0 +1,43 @@
+"""Per-year leave summaries kept after archiving
+
+Revision ID: f3c9a7b14e62
+Revises: e8b3d6f02a59
+Create Date: 2026-10-22 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a7b14e62'
+down_revision: Union[str, Sequence[str], None] = 'e8b3d6f02a59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('leave_year_summaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('leave_type_id', sa.Integer(), nullable=False),
+    sa.Column('approved_days', sa.Integer(), nullable=False),
+    sa.Column('approved_requests', sa.Integer(), nullable=False),
+    sa.Column('rejected_requests', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id']),
+    sa.ForeignKeyConstraint(['leave_type_id'], ['leave_types.id']),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('employee_id', 'year', 'leave_type_id', name='uq_year_summary_employee_year_type')
+    )
+    op.create_index(op.f('ix_leave_year_summaries_employee_id'), 'leave_year_summaries', ['employee_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_leave_year_summaries_employee_id'), table_name='leave_year_summaries')
+    op.drop_table('leave_year_summaries')
@@ -6,6 +6,9 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = "yoursecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Stream tokens travel in the URL of GET /leaves/events, so they only open that stream and expire quickly
+STREAM_TOKEN_PURPOSE = "events"
+STREAM_TOKEN_EXPIRE_SECONDS = 60
 
 def hash_password(password: str):
     return pwd_context.hash(password)
@@ -18,3 +21,9 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def create_stream_token(email: str, tenant: str):
+    return create_access_token(
+        data={"sub": email, "tenant": tenant, "purpose": STREAM_TOKEN_PURPOSE},
+        expires_delta=timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS),
+    )
@@ -1,12 +1,16 @@
 # app/routers/auth.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.Webhandler.auth import create_access_token, hash_password, verify_password
 from app.core.db import get_db
+from app.core.etag import bump
+from app.core.tenancy import current_tenant
+from app.core.ratelimit import login_limiter, signup_limiter
 from app.models.employee import Employee
 from app.models.user import RoleEnum, User
 from app.schemas.user_schema import UserCreate, UserLogin
+from app.services import password_tokens
 from passlib.context import CryptContext
 
 router = APIRouter()
@@ -14,7 +18,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # ----------------- Signup -----------------
 @router.post("/signup")
-def signup(user: UserCreate, db: Session = Depends(get_db)):
+def signup(user: UserCreate, request: Request, db: Session = Depends(get_db)):
+    signup_limiter.check(request)
     if db.query(User).filter(User.email == user.email).first():
         raise HTTPException(status_code=400, detail="Email already taken")
     
@@ -26,6 +31,7 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    bump(f"profile:{new_user.email}")
     
     return {
         "email": new_user.email,
@@ -34,7 +40,9 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
 
 # ----------------- Login -----------------
 @router.post("/login")
-def login(login: UserLogin, db: Session = Depends(get_db)):
+def login(login: UserLogin, request: Request, db: Session = Depends(get_db)):
+    # Throttle before any bcrypt work is done
+    login_limiter.check(request, account=login.email)
     user = db.query(User).filter(User.email == login.email).first()
     
     if not user:
@@ -48,7 +56,7 @@ def login(login: UserLogin, db: Session = Depends(get_db)):
     if not verify_password(login.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token(data={"sub": user.email, "role": user.role})
+    access_token = create_access_token(data={"sub": user.email, "role": user.role, "tenant": current_tenant()})
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -62,27 +70,21 @@ class ResetPasswordRequest(BaseModel):
 
 @router.post("/reset-password")
 def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db)):
-    # Find Employee by setup token
-    employee = db.query(Employee).filter(Employee.password_setup_token == payload.token).first()
-    emp = db.query(Employee).filter(Employee.email == payload.email).first()
-
-    if not user or not emp:
+    # Find Employee by setup token (consumes it)
+    emp = password_tokens.redeem(db, payload.token)
+    if not emp:
+        raise HTTPException(status_code=400, detail="Invalid or expired token")
+    user = db.query(User).filter(User.email == emp.email).first()
+    if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # 2️⃣ Update the password
+    # Update the password on both records
     hashed_pw = hash_password(payload.new_password)
     user.password = hashed_pw
     emp.hashed_password = hashed_pw
 
-    # 3️⃣ Mark first_login as False
+    # Mark first_login as False
     emp.first_login = False
-    emp.password_setup_token = None  # in
     db.commit()
 
-    # Also update User table if exists
-    user = db.query(User).filter(User.email == employee.email).first()
-    if user:
-        user.password = hash_password
-        db.commit()
-
     return {"msg": "Password updated successfully. You can now login with your new password."}
@@ -2,18 +2,21 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.Webhandler.auth import SECRET_KEY, ALGORITHM
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def _resolve_user(token: str, db: Session, purpose: str | None = None) -> User:
+    """`purpose` None accepts login tokens only; single-purpose tokens (e.g. stream tokens) pass their own."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        if payload.get("purpose") != purpose:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
@@ -21,3 +24,10 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return _resolve_user(token, db)
+
+# Same check for read-only routes, served from the replica when it is healthy
+def get_current_user_read(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
+    return _resolve_user(token, db)
@@ -1,11 +1,16 @@
 # app/Webhandler/protected_routes.py
-from fastapi import APIRouter, Depends
-from app.Webhandler.oauth2 import get_current_user
+from fastapi import APIRouter, Depends, Request, Response
+from app.core.etag import etag_for, is_not_modified, not_modified_response, set_etag
+from app.Webhandler.oauth2 import get_current_user_read
 from app.models.user import User
 
 
 router = APIRouter()
 
 @router.get("/profile")
-def profile(current_user: User = Depends(get_current_user)):
+def profile(request: Request, response: Response, current_user: User = Depends(get_current_user_read)):
+    tag = etag_for(f"profile:{current_user.email}")
+    if is_not_modified(request, tag):
+        return not_modified_response(tag)
+    set_etag(response, tag)
     return {"email": current_user.email, "role": current_user.role}
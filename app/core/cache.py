@@ -0,0 +1,563 @@
+# app/core/cache.py
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import re
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.tenancy import current_tenant, is_default
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+# Shared by every tenant; everything else is scoped to the current tenant
+GLOBAL_NAMESPACES = {"holidays"}
+TENANT_KEY_RE = re.compile(r"(?:^|:)t=([a-z0-9_]+)/")
+
+
+# ----------------- Backends -----------------
+class CacheBackend:
+    """Minimal key/value contract shared by every backend. Values are strings."""
+
+    # True when publish() reaches every process that shares the backend
+    shared_pubsub = False
+    # False while published messages may be missed (a shared subscriber connection is down)
+    subscribed = True
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        """Set only if the key is absent. Returns True when the value was stored."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        raise NotImplementedError
+
+    def publish(self, channel: str, message: str) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        raise NotImplementedError
+
+    def on_reconnect(self, callback: Callable[[], None]) -> None:
+        """Called when subscriptions are live again after a gap in which messages may have been missed."""
+
+
+class InMemoryBackend(CacheBackend):
+    """
+    Per-process LRU dict. Pub/sub only reaches subscribers in this process.
+    Tenant-scoped keys (see Cache) get an LRU of their own capped at
+    `tenant_max_entries`, so a busy tenant can't push out everyone else.
+    `max_entries` bounds all partitions together: past it the oldest entry
+    of the least recently used partition goes. At most `max_tenants`
+    tenant partitions are kept.
+    """
+
+    def __init__(self, max_entries: int = 10000, tenant_max_entries: int = 1000, max_tenants: int = 256):
+        self.max_entries = max_entries
+        self.tenant_max_entries = tenant_max_entries
+        self.max_tenants = max_tenants
+        # Partitions in least recently used order; "" holds keys shared by every tenant
+        self._parts: "OrderedDict[str, OrderedDict[str, tuple[str, Optional[float]]]]" = OrderedDict({"": OrderedDict()})
+        self._size = 0
+        self._subscribers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+        self._lock = threading.RLock()
+
+    def _part(self, key: str, create: bool = False):
+        match = TENANT_KEY_RE.search(key)
+        name = match.group(1) if match else ""
+        part = self._parts.get(name)
+        if part is None and create:
+            part = self._parts[name] = OrderedDict()
+            while len(self._parts) > self.max_tenants + 1:
+                self._drop_partition(next(n for n in self._parts if n))
+        if part is not None:
+            self._parts.move_to_end(name)
+        return part, name
+
+    def _drop_partition(self, name: str) -> None:
+        self._size -= len(self._parts.pop(name))
+
+    def _evict_oldest(self) -> None:
+        for name, part in self._parts.items():
+            if part:
+                part.popitem(last=False)
+                self._size -= 1
+                if name and not part:
+                    del self._parts[name]
+                return
+
+    def _live(self, key: str) -> Optional[str]:
+        part, _ = self._part(key)
+        item = part.get(key) if part is not None else None
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires < time.time():
+            del part[key]
+            self._size -= 1
+            return None
+        part.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: str, ttl: Optional[int]) -> None:
+        part, name = self._part(key, create=True)
+        if key not in part:
+            self._size += 1
+        part[key] = (value, time.time() + ttl if ttl else None)
+        part.move_to_end(key)
+        limit = self.tenant_max_entries if name else self.max_entries
+        while len(part) > limit:
+            part.popitem(last=False)
+            self._size -= 1
+        while self._size > self.max_entries:
+            self._evict_oldest()
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            part, name = self._part(key)
+            if part is not None and part.pop(key, None) is not None:
+                self._size -= 1
+                if name and not part:
+                    del self._parts[name]
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            value = int(self._live(key) or 0) + amount
+            self._store(key, str(value), None)
+            return value
+
+    def publish(self, channel, message):
+        for callback in list(self._subscribers.get(channel, ())):
+            callback(message)
+
+    def subscribe(self, channel, callback):
+        with self._lock:
+            self._subscribers[channel].append(callback)
+
+
+class MmapBackend(CacheBackend):
+    """
+    Fixed-size open-addressing hash table in a memory-mapped file, shared by all
+    workers on the same host. Writers serialise on an flock of the file.
+    Entries that do not fit a slot are simply not cached.
+    """
+
+    MAGIC = b"LVCACHE1"
+    SLOT_SIZE = 4096
+    # state (0 empty, 1 used, 2 deleted), expires_at, key length, value length
+    SLOT_HEADER = struct.Struct("<BdHI")
+    MAX_PROBES = 8
+
+    def __init__(self, path: str, slots: int = 2048):
+        self.path = path
+        self.slots = slots
+        size = len(self.MAGIC) + slots * self.SLOT_SIZE
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        # flock only excludes other processes; threads share the descriptor
+        self._thread_lock = threading.Lock()
+        with self._locked():
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self.MAGIC, 0)
+        self._mm = mmap.mmap(self._fd, size)
+        self._local_subscribers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+
+    def _locked(self):
+        fd, thread_lock = self._fd, self._thread_lock
+
+        class _Lock:
+            def __enter__(self):
+                thread_lock.acquire()
+                fcntl.flock(fd, fcntl.LOCK_EX)
+
+            def __exit__(self, *exc):
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                thread_lock.release()
+
+        return _Lock()
+
+    def _offset(self, index: int) -> int:
+        return len(self.MAGIC) + index * self.SLOT_SIZE
+
+    def _probe(self, key: bytes):
+        start = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") % self.slots
+        for i in range(self.MAX_PROBES):
+            yield self._offset((start + i) % self.slots)
+
+    def _read(self, offset: int):
+        state, expires, klen, vlen = self.SLOT_HEADER.unpack_from(self._mm, offset)
+        body = offset + self.SLOT_HEADER.size
+        return state, expires, self._mm[body:body + klen], body + klen, vlen
+
+    def _find(self, key: bytes):
+        """Return (offset of the live entry or None, first reusable offset or None)."""
+        free = None
+        now = time.time()
+        for offset in self._probe(key):
+            state, expires, stored_key, _, _ = self._read(offset)
+            expired = state == 1 and expires and expires < now
+            if state == 1 and not expired and stored_key == key:
+                return offset, offset
+            if free is None and (state != 1 or expired or stored_key == key):
+                free = offset
+            if state == 0:
+                break
+        return None, free
+
+    def _write(self, offset: int, key: bytes, value: bytes, ttl: Optional[int]) -> None:
+        expires = time.time() + ttl if ttl else 0.0
+        self.SLOT_HEADER.pack_into(self._mm, offset, 1, expires, len(key), len(value))
+        body = offset + self.SLOT_HEADER.size
+        self._mm[body:body + len(key) + len(value)] = key + value
+
+    def _fits(self, key: bytes, value: bytes) -> bool:
+        return self.SLOT_HEADER.size + len(key) + len(value) <= self.SLOT_SIZE
+
+    def _get(self, key: bytes) -> Optional[str]:
+        offset, _ = self._find(key)
+        if offset is None:
+            return None
+        _, _, _, value_at, vlen = self._read(offset)
+        return self._mm[value_at:value_at + vlen].decode()
+
+    def _set(self, key: bytes, value: bytes, ttl: Optional[int]) -> bool:
+        offset, free = self._find(key)
+        if not self._fits(key, value):
+            if offset is not None:
+                self.SLOT_HEADER.pack_into(self._mm, offset, 2, 0.0, 0, 0)
+            return False
+        target = offset if offset is not None else free
+        if target is None:
+            # Probe window full: evict the home slot, it is only a cache
+            target = next(self._probe(key))
+        self._write(target, key, value, ttl)
+        return True
+
+    def get(self, key):
+        with self._locked():
+            return self._get(key.encode())
+
+    def set(self, key, value, ttl=None):
+        with self._locked():
+            self._set(key.encode(), value.encode(), ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._locked():
+            if self._get(key.encode()) is not None:
+                return False
+            return self._set(key.encode(), value.encode(), ttl)
+
+    def delete(self, key):
+        with self._locked():
+            offset, _ = self._find(key.encode())
+            if offset is not None:
+                self.SLOT_HEADER.pack_into(self._mm, offset, 2, 0.0, 0, 0)
+
+    def incr(self, key, amount=1):
+        with self._locked():
+            value = int(self._get(key.encode()) or 0) + amount
+            self._set(key.encode(), str(value).encode(), None)
+            return value
+
+    def publish(self, channel, message):
+        # Other processes read versions straight from the shared file, so only
+        # local listeners need to hear about it.
+        for callback in list(self._local_subscribers.get(channel, ())):
+            callback(message)
+
+    def subscribe(self, channel, callback):
+        self._local_subscribers[channel].append(callback)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Speaks RESP directly over a socket, so any Redis-protocol server works
+    (Redis, Valkey, KeyDB, a local stand-in). Subscriptions use a dedicated
+    connection serviced by a daemon thread.
+    """
+
+    shared_pubsub = True
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int((parsed.path or "/0").lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+        self._sub_thread: Optional[threading.Thread] = None
+        self._sub_sock: Optional[socket.socket] = None
+        self._reconnect_callbacks: list[Callable[[], None]] = []
+        self.subscribed = False
+
+    # ---- wire protocol ----
+    @staticmethod
+    def _encode(*args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    @classmethod
+    def _parse(cls, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Cache server closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length == -1:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            length = int(rest)
+            if length == -1:
+                return None
+            return [cls._parse(reader) for _ in range(length)]
+        raise RuntimeError(f"Unexpected cache reply: {line!r}")
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        reader = sock.makefile("rb")
+        if self.password:
+            sock.sendall(self._encode("AUTH", self.password))
+            self._parse(reader)
+        if self.db:
+            sock.sendall(self._encode("SELECT", self.db))
+            self._parse(reader)
+        return sock, reader
+
+    def _command(self, *args, idempotent: bool = True):
+        """
+        One request/reply. A dropped connection is retried once on a fresh
+        one, unless the command is not idempotent and may already have
+        reached the server: running INCRBY or PUBLISH twice is worse than
+        failing once.
+        """
+        with self._lock:
+            for attempt in (1, 2):
+                sent = False
+                try:
+                    if self._sock is None:
+                        self._sock, self._reader = self._connect()
+                    sent = True
+                    self._sock.sendall(self._encode(*args))
+                    return self._parse(self._reader)
+                except (OSError, ConnectionError):
+                    self._sock = None
+                    if attempt == 2 or (sent and not idempotent):
+                        raise
+
+    # ---- contract ----
+    def get(self, key):
+        return self._command("GET", key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self._command("SET", key, value, "EX", int(ttl))
+        else:
+            self._command("SET", key, value)
+
+    def add(self, key, value, ttl=None):
+        args = ["SET", key, value, "NX"]
+        if ttl:
+            args += ["EX", int(ttl)]
+        # A retried SET NX would see its own first write and report the key as taken
+        return self._command(*args, idempotent=False) == "OK"
+
+    def delete(self, key):
+        self._command("DEL", key)
+
+    def incr(self, key, amount=1):
+        return self._command("INCRBY", key, amount, idempotent=False)
+
+    def publish(self, channel, message):
+        self._command("PUBLISH", channel, message, idempotent=False)
+
+    def subscribe(self, channel, callback):
+        new = channel not in self._subscribers
+        self._subscribers[channel].append(callback)
+        if self._sub_thread is None:
+            self._sub_thread = threading.Thread(target=self._listen, name="cache-subscriber", daemon=True)
+            self._sub_thread.start()
+        elif new and self._sub_sock is not None:
+            # Listener already connected; a reconnect resubscribes everything anyway
+            try:
+                self._sub_sock.sendall(self._encode("SUBSCRIBE", channel))
+            except OSError:
+                pass
+
+    def on_reconnect(self, callback):
+        self._reconnect_callbacks.append(callback)
+
+    def _listen(self):
+        while True:
+            try:
+                sock, reader = self._connect()
+                sock.settimeout(None)
+                self._sub_sock = sock
+                sock.sendall(self._encode("SUBSCRIBE", *self._subscribers.keys()))
+                while True:
+                    reply = self._parse(reader)
+                    if isinstance(reply, list) and reply and reply[0] == "message":
+                        for callback in list(self._subscribers.get(reply[1], ())):
+                            callback(reply[2])
+                    elif not self.subscribed:
+                        # Subscribed from here on; whatever was published while we were away is lost
+                        for callback in list(self._reconnect_callbacks):
+                            callback()
+                        self.subscribed = True
+            except (OSError, ConnectionError, RuntimeError):
+                self.subscribed = False
+                self._sub_sock = None
+                time.sleep(1)
+
+
+# ----------------- Versioned cache -----------------
+class Cache:
+    """
+    JSON cache on top of a backend with namespace versioning.
+
+    Data keys embed the namespace version (`ns:v<version>:key`), so
+    `invalidate(ns)` just bumps the version and every worker stops seeing the
+    old entries. The bump is also published so processes that memoise versions
+    locally can drop them straight away. Versions are only memoised while
+    the subscription is live, and are all dropped when it comes back, since
+    bumps published in between never arrived.
+
+    Namespaces belong to the current tenant (`t=<tenant>/ns`) unless listed
+    in GLOBAL_NAMESPACES; the default tenant keeps the plain names.
+    """
+
+    def __init__(self, backend: CacheBackend, prefix: str = "leave"):
+        self.backend = backend
+        self.prefix = prefix
+        self._versions: dict[str, int] = {}
+        self._listeners: list[Callable[[str], None]] = []
+        backend.subscribe(INVALIDATION_CHANNEL, self._on_invalidate)
+        backend.on_reconnect(self._versions.clear)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _on_invalidate(self, namespace: str) -> None:
+        self._versions.pop(namespace, None)
+        for listener in list(self._listeners):
+            listener(namespace)
+
+    def on_invalidate(self, listener: Callable[[str], None]) -> None:
+        """Register a callback fired with the namespace whenever it is invalidated."""
+        self._listeners.append(listener)
+
+    @staticmethod
+    def _scoped(namespace: str) -> str:
+        tenant = current_tenant()
+        if is_default(tenant) or namespace in GLOBAL_NAMESPACES:
+            return namespace
+        return f"t={tenant}/{namespace}"
+
+    def version(self, namespace: str) -> int:
+        return self._version(self._scoped(namespace))
+
+    def _version(self, namespace: str) -> int:
+        memo = (self.backend.shared_pubsub and self.backend.subscribed) or isinstance(self.backend, InMemoryBackend)
+        if memo and namespace in self._versions:
+            return self._versions[namespace]
+        vkey = self._key(f"version:{namespace}")
+        value = self.backend.get(vkey)
+        if value is None:
+            # Seed with a clock value so a restarted in-memory backend never
+            # reissues a version number that clients may still hold.
+            self.backend.add(vkey, str(time.time_ns()))
+            value = self.backend.get(vkey)
+        version = int(value)
+        if memo:
+            self._versions[namespace] = version
+        return version
+
+    def invalidate(self, namespace: str) -> int:
+        namespace = self._scoped(namespace)
+        self._version(namespace)
+        version = self.backend.incr(self._key(f"version:{namespace}"))
+        self._versions.pop(namespace, None)
+        self.backend.publish(INVALIDATION_CHANNEL, namespace)
+        return version
+
+    def get(self, namespace: str, key: str) -> Any:
+        namespace = self._scoped(namespace)
+        raw = self.backend.get(self._key(f"{namespace}:v{self._version(namespace)}:{key}"))
+        return None if raw is None else json.loads(raw)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        namespace = self._scoped(namespace)
+        raw = json.dumps(value, default=str)
+        self.backend.set(self._key(f"{namespace}:v{self._version(namespace)}:{key}"), raw, ttl)
+
+    def get_or_set(self, namespace: str, key: str, loader: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        # Key resolved once, before loading: if the namespace is invalidated
+        # mid-load the value lands under the old version and is never served
+        namespace = self._scoped(namespace)
+        full_key = self._key(f"{namespace}:v{self._version(namespace)}:{key}")
+        raw = self.backend.get(full_key)
+        if raw is not None:
+            return json.loads(raw)
+        value = loader()
+        self.backend.set(full_key, json.dumps(value, default=str), ttl)
+        return value
+
+
+def build_backend(backend: str = None) -> CacheBackend:
+    backend = (backend or settings.CACHE_BACKEND).lower()
+    if backend == "redis":
+        return RedisBackend(settings.CACHE_URL)
+    if backend == "mmap":
+        return MmapBackend(settings.CACHE_MMAP_PATH, settings.CACHE_MMAP_SLOTS)
+    if backend == "memory":
+        return InMemoryBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_TENANT_MAX_ENTRIES, settings.CACHE_MAX_TENANTS)
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+cache = Cache(build_backend())
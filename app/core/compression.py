@@ -0,0 +1,133 @@
+# app/core/compression.py
+import zlib
+
+from app.core.metrics import metrics
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best of br/gzip the client accepts (q > 0). Brotli wins ties when installed."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    wildcard = offered.get("*", 0.0)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = offered.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flushed per chunk so streamed responses (NDJSON) still arrive incrementally
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli for response bodies. Whole bodies under
+    `minimum_size` go out untouched; streamed bodies are compressed chunk by
+    chunk. Server-sent events and already-encoded or binary bodies are skipped.
+    """
+
+    SKIP_TYPES = ("text/event-stream", "image/", "audio/", "video/", "application/zip", "application/gzip")
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if compressor is None:
+                response_headers = {k.lower(): v for k, v in start["headers"]}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    start["status"] in (204, 304)
+                    or b"content-encoding" in response_headers
+                    or content_type.startswith(self.SKIP_TYPES)
+                    or (not more and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                new_headers = [(k, v) for k, v in start["headers"] if k.lower() not in (b"content-length", b"vary")]
+                vary = response_headers.get(b"vary")
+                new_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                new_headers.append((b"content-encoding", encoding.encode()))
+                if not more:
+                    data = compressor.chunk(body) + compressor.finish()
+                    new_headers.append((b"content-length", str(len(data)).encode()))
+                    await send({**start, "headers": new_headers})
+                    await send({"type": "http.response.body", "body": data})
+                    metrics.inc("compressed_responses_total", encoding=encoding)
+                    metrics.observe("compression_ratio", len(data) / len(body), encoding=encoding)
+                    return
+                await send({**start, "headers": new_headers})
+                metrics.inc("compressed_responses_total", encoding=encoding)
+
+            data = compressor.chunk(body) if body else b""
+            if not more:
+                data += compressor.finish()
+            if data or not more:
+                await send({"type": "http.response.body", "body": data, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
+        if start is not None and compressor is None and not passthrough:
+            # Response start without any body message
+            await send(start)
@@ -1,4 +1,5 @@
 # app/core/config.py
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,6 +9,10 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
 
+    # Full SQLAlchemy URL; overrides the POSTGRES_* settings when set.
+    # e.g. sqlite:///./leave.db or sqlite:// (in-memory) for benchmarks and single-node use
+    DB_URL: str | None = None
+
     APP_ENV: str = "dev"
     APP_PORT: int = 8000
 
@@ -15,6 +20,16 @@ class Settings(BaseSettings):
 
     COUNTRY: str = "IN"
     API_KEY: str  # holidays API
+    HOLIDAY_API_URL: str = "https://calendarific.com/api/v2/holidays"
+    HOLIDAY_API_CONNECT_TIMEOUT: float = 3.0
+    HOLIDAY_API_READ_TIMEOUT: float = 10.0
+    HOLIDAY_API_RETRIES: int = 2
+    HOLIDAY_API_POOL_SIZE: int = 10
+    HOLIDAY_API_BREAKER_FAILURES: int = 5
+    HOLIDAY_API_BREAKER_RESET_SECONDS: float = 30.0
+    # POST /leaves/working-days: countries besides COUNTRY, and years either side of this one
+    WORKING_DAYS_COUNTRIES: list[str] = []
+    WORKING_DAYS_YEAR_WINDOW: int = 5
 
     # ✅ SMTP configuration
     SMTP_SERVER: str = "smtp.gmail.com"       # SMTP host
@@ -25,8 +40,117 @@ class Settings(BaseSettings):
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
 
+    # Optional read replica for GET routes (same URL format as DATABASE_URL)
+    REPLICA_DATABASE_URL: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 2.0
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    # Auth abuse protection: token buckets ("memory" per process or "shared" via the cache)
+    RATE_LIMIT_STORE: str = "memory"
+    LOGIN_IP_BURST: int = 10
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_ACCOUNT_BURST: int = 5
+    LOGIN_ACCOUNT_PER_MINUTE: float = 5
+    SIGNUP_IP_BURST: int = 5
+    SIGNUP_IP_PER_MINUTE: float = 5
+    MAX_INFLIGHT_REQUESTS: int = 200
+    AUTH_MAX_CONCURRENCY: int = 8
+    SHED_LOW_PRIORITY_AT: float = 0.75
+
+    # Response compression (gzip, or brotli when the package is installed)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Tracing (OpenTelemetry SDK): JSON-lines spans to a local file or OTLP/HTTP to a collector
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "file"  # file, otlp or none
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SAMPLE_RATIO: float = 1.0
+    TRACING_SERVICE_NAME: str = "leave-management-api"
+
+    # Background jobs (holiday refresh, reconciliation, email retries, new-year maintenance)
+    SCHEDULER_ENABLED: bool = True
+
+    # Leave lifecycle webhooks (transactional outbox), e.g. '["http://payroll/hooks/leave"]'
+    OUTBOX_WEBHOOK_URLS: list[str] = []
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_BATCHES_PER_RUN: int = 10
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RELAY_INTERVAL: float = 5
+    OUTBOX_RETENTION_DAYS: int = 7
+
+    # Idempotency-Key support for POST /leaves and POST /employees
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+
+    # Password setup links sent to new employees
+    PASSWORD_SETUP_TOKEN_TTL_HOURS: int = 24
+
+    # leave_requests yearly partitions (Postgres) created ahead of time
+    PARTITION_YEARS_AHEAD: int = 2
+
+    # Cold archive: requests ending before the last ARCHIVE_KEEP_YEARS years move to files
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_KEEP_YEARS: int = 2
+    ARCHIVE_BATCH_SIZE: int = 5000
+
+    # Multi-tenancy: tenant from the JWT `tenant` claim or <tenant><TENANT_HOST_SUFFIX> hosts.
+    # TENANT_ROUTING "schema" = one Postgres schema per tenant on the shared pool,
+    # "database" = TENANT_DB_URL_TEMPLATE (e.g. postgresql+psycopg://u:p@db/leave_{tenant})
+    # with a small pool per tenant, at most TENANT_MAX_ENGINES pools open at once.
+    MULTI_TENANT: bool = False
+    DEFAULT_TENANT: str = "default"
+    TENANTS: list[str] = []  # the only tenants admitted (besides DEFAULT_TENANT)
+    TENANT_HOST_SUFFIX: str | None = None  # e.g. ".leave.example.com"
+    TENANT_ROUTING: str = "schema"
+    TENANT_SCHEMA_PREFIX: str = "tenant_"
+    TENANT_DB_URL_TEMPLATE: str | None = None
+    TENANT_MAX_ENGINES: int = 50
+    TENANT_POOL_SIZE: int = 2
+    TENANT_MAX_OVERFLOW: int = 3
+    TENANT_AUTO_PROVISION: bool = False  # create a tenant's tables on first use (dev, SQLite)
+    TENANT_MAX_INFLIGHT: int = 50
+
+    # Shared cache: "memory" (per process), "mmap" (per host) or "redis" (fleet-wide)
+    CACHE_BACKEND: str = "memory"
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_MMAP_PATH: str = "/tmp/leave_cache.mmap"
+    CACHE_MMAP_SLOTS: int = 2048
+    CACHE_MAX_ENTRIES: int = 10000  # memory backend, all tenants together
+    CACHE_TENANT_MAX_ENTRIES: int = 1000  # per-tenant LRU share of the memory backend
+    CACHE_MAX_TENANTS: int = 256  # tenant partitions kept by the memory backend
+    HOLIDAY_CACHE_TTL: int = 24 * 60 * 60
+    BALANCE_CACHE_TTL: int = 10 * 60  # backstop; balances are invalidated on every change
+
+    # Server-sent events at GET /leaves/events. PUSH_BACKEND "local" reaches streams on this
+    # worker only; "cache" fans out through the cache backend's pub/sub (every worker with redis)
+    PUSH_BACKEND: str = "local"
+    PUSH_MAX_CONNECTIONS: int = 20000  # per worker
+    PUSH_MAX_PER_USER: int = 8
+    PUSH_QUEUE_SIZE: int = 32  # unread events before a slow stream is closed, at least 2
+    PUSH_HEARTBEAT_SECONDS: float = 20
+
+    @model_validator(mode="after")
+    def _tenant_registry(self):
+        # Admission, background jobs and migrations all work from this list
+        if self.MULTI_TENANT and not self.TENANTS:
+            raise ValueError("MULTI_TENANT requires TENANTS, the tenants to admit, run jobs for and migrate")
+        return self
+
+    @model_validator(mode="after")
+    def _push_queue(self):
+        # An overflowing stream is sent an `overflow` event and then closed, which takes two slots
+        if self.PUSH_QUEUE_SIZE < 2:
+            raise ValueError("PUSH_QUEUE_SIZE must be at least 2")
+        return self
+
     @property
     def DATABASE_URL(self) -> str:
+        if self.DB_URL:
+            return self.DB_URL
         return (
             f"postgresql+psycopg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
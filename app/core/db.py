@@ -1,27 +1,287 @@
 # app/core/db.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import StaticPool
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.tenancy import current_tenant, is_default, is_known, tenant_scope
+from app.core.tracing import instrument_engine, instrument_sessions, tracer
+
+# ----------------- Engine factory -----------------
+SQLITE_PRAGMAS = {
+    "synchronous": "NORMAL",  # safe with WAL, far fewer fsyncs
+    "foreign_keys": "ON",
+    "busy_timeout": "5000",
+    "temp_store": "MEMORY",
+    "cache_size": "-65536",  # 64 MiB
+    "mmap_size": "268435456",
+}
+
+def create_db_engine(url: str, **kwargs) -> Engine:
+    """Engine for Postgres (default) or SQLite, file or in-memory, with tuned pragmas."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return _instrumented(create_engine(url, pool_pre_ping=True, **kwargs))
+
+    in_memory = parsed.database in (None, "", ":memory:")
+    if in_memory:
+        # One shared connection, otherwise every pooled connection gets its own empty DB
+        kwargs.setdefault("poolclass", StaticPool)
+    sqlite_engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return _instrumented(sqlite_engine)
+
+def _instrumented(new_engine: Engine) -> Engine:
+    if tracer.enabled:
+        instrument_engine(new_engine)
+    return new_engine
+
+def is_postgres(bind) -> bool:
+    """For Postgres-only features (partitioning, pg_trgm, CONCURRENTLY...) to degrade gracefully."""
+    return bind.dialect.name == "postgresql"
+
+# ----------------- Tenant routing -----------------
+def schema_for(tenant: str) -> str:
+    return f"{settings.TENANT_SCHEMA_PREFIX}{tenant}"
+
+class TenantRouter:
+    """
+    Bind for a tenant. The default tenant (and single-tenant mode) uses the
+    engine as configured.
+      schema   - the same engine with a schema_translate_map, so a tenant's
+                 tables live in its own Postgres schema and share one pool
+      database - an engine per tenant from TENANT_DB_URL_TEMPLATE with a small
+                 pool; beyond max_engines the least recently used is disposed,
+                 so open connections stay under max_engines * (pool + overflow)
+    """
+
+    def __init__(self, mode: str, max_engines: int):
+        if mode not in ("schema", "database"):
+            raise ValueError(f"Unknown TENANT_ROUTING: {mode}")
+        self.mode = mode
+        self.max_engines = max_engines
+        self._binds: "OrderedDict[tuple, Engine]" = OrderedDict()
+        self._provisioned: set[str] = set()
+        self._provisioning: set[str] = set()
+        self._lock = threading.Lock()
+        self._provision_lock = threading.RLock()
+
+    def bind_for(self, tenant: str, base: Engine) -> Engine:
+        if not settings.MULTI_TENANT or is_default(tenant):
+            return base
+        # Database mode has no per-tenant replicas: reads go to the tenant's primary
+        key = (tenant,) if self.mode == "database" else (tenant, id(base))
+        with self._lock:
+            bind = self._binds.get(key)
+            if bind is not None:
+                self._binds.move_to_end(key)
+                return bind
+        if not is_known(tenant):
+            # Never open a pool (or provision a database) for an unlisted tenant
+            raise ValueError(f"Unknown tenant: {tenant}")
+        bind = self._create(tenant, base)
+        evicted = []
+        with self._lock:
+            if key in self._binds:
+                # Lost a race with another thread; keep theirs
+                evicted.append(bind)
+                bind = self._binds[key]
+            else:
+                self._binds[key] = bind
+            while len(self._binds) > self.max_engines:
+                evicted.append(self._binds.popitem(last=False)[1])
+            metrics.set_gauge("tenant_binds", len(self._binds))
+        for old in evicted:
+            if self.mode == "database":
+                old.dispose()  # closes idle connections; checked-out ones close on return
+        if settings.TENANT_AUTO_PROVISION and tenant not in self._provisioned:
+            self._auto_provision(tenant)
+        return bind
+
+    def _auto_provision(self, tenant: str) -> None:
+        # Other threads wait until the tables exist; provisioning's own bind_for calls pass through
+        with self._provision_lock:
+            if tenant in self._provisioned or tenant in self._provisioning:
+                return
+            self._provisioning.add(tenant)
+            try:
+                provision_tenant(tenant)
+            finally:
+                self._provisioning.discard(tenant)
+
+    def _create(self, tenant: str, base: Engine) -> Engine:
+        if self.mode == "schema":
+            # A view over the base engine: same pool, no extra connections
+            return base.execution_options(schema_translate_map={None: schema_for(tenant)})
+        if not settings.TENANT_DB_URL_TEMPLATE:
+            raise RuntimeError("TENANT_DB_URL_TEMPLATE is required for TENANT_ROUTING=database")
+        return create_db_engine(
+            settings.TENANT_DB_URL_TEMPLATE.format(tenant=tenant),
+            pool_size=settings.TENANT_POOL_SIZE,
+            max_overflow=settings.TENANT_MAX_OVERFLOW,
+        )
+
+    def open_binds(self) -> int:
+        return len(self._binds)
+
+tenant_router = TenantRouter(settings.TENANT_ROUTING, settings.TENANT_MAX_ENGINES)
+
+class TenantSession(Session):
+    """Session pinned to the tenant current when it was opened; every statement goes to that tenant's bind."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.info["tenant"] = current_tenant()
+
+    def get_bind(self, mapper=None, **kw):
+        return tenant_router.bind_for(self.info["tenant"], super().get_bind(mapper, **kw))
 
 # Engine
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_db_engine(settings.DATABASE_URL)
 
 # Session
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+SessionLocal = sessionmaker(bind=engine, class_=TenantSession, autocommit=False, autoflush=False)
+
+# Optional read replica
+replica_engine = (
+    create_db_engine(settings.REPLICA_DATABASE_URL)
+    if settings.REPLICA_DATABASE_URL else None
+)
+ReplicaSessionLocal = (
+    sessionmaker(bind=replica_engine, class_=TenantSession, autocommit=False, autoflush=False)
+    if replica_engine is not None else None
+)
+
+@contextmanager
+def tenant_begin():
+    """
+    Connection in a transaction for the current tenant, for DDL and raw SQL.
+    In schema mode search_path is set too, since text() statements don't go
+    through the schema_translate_map.
+    """
+    tenant = current_tenant()
+    bind = tenant_router.bind_for(tenant, engine)
+    with bind.begin() as conn:
+        if settings.MULTI_TENANT and not is_default(tenant) and tenant_router.mode == "schema":
+            conn.execute(text(f'SET LOCAL search_path TO "{schema_for(tenant)}", public'))
+        yield conn
+
+if tracer.enabled:
+    instrument_sessions(SessionLocal)
+    if ReplicaSessionLocal is not None:
+        instrument_sessions(ReplicaSessionLocal)
 
 # Declarative Base
 class Base(DeclarativeBase):
     pass
 
+# ----------------- Read-your-writes -----------------
+def _client_key(request: Request | None) -> str | None:
+    if request is None:
+        return None
+    ident = request.headers.get("authorization") or (request.client.host if request.client else None)
+    return hashlib.sha256(ident.encode()).hexdigest()[:32] if ident else None
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_writer(session):
+    # Pin this client to the primary for a while so it sees its own write
+    key = session.info.get("client_key")
+    if session.info.pop("wrote", False) and key:
+        cache.set("read-your-writes", key, True, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+def _recent_writer(request: Request) -> bool:
+    key = _client_key(request)
+    return bool(key and cache.get("read-your-writes", key))
+
+# ----------------- Replica lag -----------------
+_replica_health = {"checked_at": 0.0, "fresh": False}
+
+def replica_is_fresh() -> bool:
+    """Checks replica lag at most every REPLICA_LAG_CHECK_INTERVAL seconds."""
+    now = time.monotonic()
+    if now - _replica_health["checked_at"] < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return _replica_health["fresh"]
+    try:
+        with replica_engine.connect() as conn:
+            lag = 0.0
+            if is_postgres(conn):
+                # Caught up replicas report no lag even if the primary has been idle
+                lag = conn.execute(text(
+                    "SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)"
+                )).scalar()
+            fresh = float(lag) <= settings.REPLICA_MAX_LAG_SECONDS
+    except Exception as e:
+        print("⚠️ Replica health check failed:", e)
+        fresh = False
+    _replica_health.update(checked_at=now, fresh=fresh)
+    return fresh
+
 # Depends helper
-def get_db():
+def get_db(request: Request = None):
     db = SessionLocal()
+    db.info["client_key"] = _client_key(request)
     try:
         yield db
     finally:
         db.close()
 
+def get_read_db(request: Request = None):
+    """Session for read-only routes: replica when healthy, otherwise the primary."""
+    if ReplicaSessionLocal is None or _recent_writer(request) or not replica_is_fresh():
+        yield from get_db(request)
+        return
+    db = ReplicaSessionLocal()
+    db.info["replica"] = True
+    try:
+        yield db
+    finally:
+        db.close()
+
+def is_replica(db: Session) -> bool:
+    return bool(db.info.get("replica"))
+
 # Initialize tables
-def init_db():
+def build_schema(conn) -> None:
+    """Tables, partitions and hierarchy self-rows from the models, on an open connection. Safe to repeat."""
     import app.models  # noqa: F401 (register models)
-    Base.metadata.create_all(bind=engine)
+    from app.core.partitions import ensure_future_partitions
+    from app.services.hierarchy import backfill
+    Base.metadata.create_all(bind=conn)
+    ensure_future_partitions(conn)
+    backfill(conn)
+
+def init_db():
+    with engine.begin() as conn:
+        build_schema(conn)
+
+def provision_tenant(tenant: str) -> None:
+    """Create a tenant's schema (schema mode) and tables. Safe to repeat."""
+    with tenant_scope(tenant):
+        if tenant_router.mode == "schema" and not is_default(tenant):
+            with engine.begin() as conn:
+                conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema_for(tenant)}"'))
+        with tenant_begin() as conn:
+            build_schema(conn)
+    tenant_router._provisioned.add(tenant)
@@ -0,0 +1,35 @@
+# app/core/etag.py
+from fastapi import Request, Response
+from app.core.cache import cache
+
+
+def etag_for(namespace: str) -> str:
+    """Weak ETag derived from the namespace's version counter, no DB access needed."""
+    return f'W/"{namespace}-{cache.version(namespace)}"'
+
+
+def bump(namespace: str) -> None:
+    cache.invalidate(namespace)
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, tag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _strip_weak(tag) in {_strip_weak(t) for t in header.split(",")}
+
+
+def not_modified_response(tag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": tag, "Cache-Control": "private, no-cache"})
+
+
+def set_etag(response: Response, tag: str) -> None:
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = "private, no-cache"
@@ -0,0 +1,146 @@
+# app/core/http.py
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.tracing import tracer
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider that keeps failing."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. After that a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial_running):
+                raise CircuitOpenError("Circuit open, skipping call")
+            if state == "half-open":
+                self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one; waiters share its result."""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result: Any = None
+            self.error: BaseException | None = None
+
+    def __init__(self):
+        self._calls: dict[Hashable, SingleFlight._Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+
+class HttpClient:
+    """Keep-alive session with pooled connections, default timeouts, bounded retries and a breaker."""
+
+    def __init__(
+        self,
+        timeout: tuple[float, float] = (3.0, 10.0),
+        retries: int = 2,
+        backoff: float = 0.5,
+        pool_size: int = 10,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        with tracer.span(f"HTTP {method}", kind="client", attributes={"http.method": method, "http.url": url}) as span:
+            self.breaker.before_call()
+            kwargs.setdefault("timeout", self.timeout)
+            kwargs["headers"] = tracer.inject(dict(kwargs.get("headers") or {}))
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                self.breaker.record_failure()
+                raise
+            if span is not None:
+                span.set_attribute("http.status_code", resp.status_code)
+            # A 4xx is about this request, not the provider's health; only 5xx and 429 count
+            if resp.status_code >= 500 or resp.status_code == 429:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            resp.raise_for_status()
+            return resp
+
+    def get_json(self, url: str, **kwargs) -> Any:
+        return self.request("GET", url, **kwargs).json()
@@ -1,6 +1,30 @@
 import smtplib
+from collections import deque
 from email.message import EmailMessage
+from opentelemetry.trace import StatusCode
 from app.core.config import settings
+from app.core.tracing import tracer
+
+# Messages that failed to send, retried by the scheduled email-retry job.
+# Kept per process, so that job runs in every worker.
+_retry_queue: deque = deque(maxlen=1000)
+MAX_SEND_ATTEMPTS = 5
+
+def _deliver(msg: EmailMessage) -> bool:
+    # Connect to Gmail SMTP and send
+    with tracer.span("email.send", kind="client", attributes={"email.subject": msg["Subject"]}) as span:
+        try:
+            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
+                smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+                smtp.send_message(msg)
+            print(f"Password setup email sent to {msg['To']}")
+            return True
+        except Exception as e:
+            print("Error sending email:", e)
+            if span is not None:
+                span.record_exception(e)
+                span.set_status(StatusCode.ERROR, str(e))
+            return False
 
 def send_password_setup_email(to_email: str, token: str):
     """
@@ -18,15 +42,22 @@ def send_password_setup_email(to_email: str, token: str):
         f"Hello,\n\n"
         f"Welcome to LeaveEase! Please set your password using the link below:\n\n"
         f"{setup_link}\n\n"
-        f"This link is valid for 24 hours.\n\n"
+        f"This link is valid for {settings.PASSWORD_SETUP_TOKEN_TTL_HOURS} hours.\n\n"
         f"Thanks,\nLeaveEase Team"
     )
 
-    # Connect to Gmail SMTP and send
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            smtp.send_message(msg)
-        print(f"Password setup email sent to {to_email}")
-    except Exception as e:
-        print("Error sending email:", e)
+    if not _deliver(msg):
+        _retry_queue.append((msg, 1))
+
+def retry_failed_emails() -> int:
+    """Retries queued messages once each. Returns how many were delivered."""
+    delivered = 0
+    for _ in range(len(_retry_queue)):
+        msg, attempts = _retry_queue.popleft()
+        if _deliver(msg):
+            delivered += 1
+        elif attempts + 1 < MAX_SEND_ATTEMPTS:
+            _retry_queue.append((msg, attempts + 1))
+        else:
+            print(f"Giving up on email to {msg['To']} after {attempts + 1} attempts")
+    return delivered
@@ -0,0 +1,55 @@
+# app/core/metrics.py
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    """Tiny in-process registry rendered in the Prometheus text format at /metrics."""
+
+    def __init__(self):
+        self._counters: dict[tuple, float] = defaultdict(float)
+        self._gauges: dict[tuple, float] = {}
+        self._summaries: dict[tuple, list[float]] = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        with self._lock:
+            self._counters[self._key(name, labels)] += amount
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            summary = self._summaries[self._key(name, labels)]
+            summary[0] += 1
+            summary[1] += value
+
+    def value(self, name: str, **labels) -> float:
+        key = self._key(name, labels)
+        return self._counters.get(key, self._gauges.get(key, 0))
+
+    @staticmethod
+    def _labels(labels: tuple) -> str:
+        parts = [f'{k}="{v}"' for k, v in labels]
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{name}{self._labels(labels)} {value}")
+            for (name, labels), value in sorted(self._gauges.items()):
+                lines.append(f"{name}{self._labels(labels)} {value}")
+            for (name, labels), (count, total) in sorted(self._summaries.items()):
+                lines.append(f"{name}_count{self._labels(labels)} {count}")
+                lines.append(f"{name}_sum{self._labels(labels)} {total}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
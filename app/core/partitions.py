@@ -0,0 +1,103 @@
+# app/core/partitions.py
+"""
+Yearly range partitions for leave_requests on Postgres.
+
+The table is declared with postgresql_partition_by; Postgres then requires
+the partition key in the primary key, so the PK is widened to
+(id, start_date) at DDL time only. The ORM keeps `id` as the identity, and
+SQLite keeps its plain rowid primary key.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import PrimaryKeyConstraint, text
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.config import settings
+
+PARTITIONED_TABLE = "leave_requests"
+PARTITION_KEY = "start_date"
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _partitioned_primary_key(constraint, compiler, **kw):
+    sql = compiler.visit_primary_key_constraint(constraint, **kw)
+    table = constraint.table
+    if table.dialect_options["postgresql"]["partition_by"] and PARTITION_KEY in table.c:
+        if PARTITION_KEY not in constraint.columns:
+            sql = sql.rstrip(")") + f", {PARTITION_KEY})"
+    return sql
+
+
+def partition_name(year: int) -> str:
+    return f"{PARTITIONED_TABLE}_{year}"
+
+
+def is_partitioned(bind) -> bool:
+    if bind.dialect.name != "postgresql":
+        return False
+    return bind.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :t AND c.relnamespace = current_schema()::regnamespace"
+    ), {"t": PARTITIONED_TABLE}).first() is not None
+
+
+def _create_partition(bind, year: int) -> None:
+    name = partition_name(year)
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    )
+    bounds = {"lo": date(year, 1, 1), "hi": date(year + 1, 1, 1)}
+    in_year = f"{PARTITION_KEY} >= :lo AND {PARTITION_KEY} < :hi"
+    stranded = bind.execute(text("SELECT to_regclass(:n)"), {"n": DEFAULT_PARTITION}).scalar() and bind.execute(
+        text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_year} LIMIT 1"), bounds
+    ).first()
+    if not stranded:
+        bind.execute(create)
+        return
+    # Postgres refuses the new partition while the default holds rows in its
+    # range, so detach the default, create it, move those rows, reattach
+    print(f"⚠️ Moving {year} rows out of {DEFAULT_PARTITION} into {name}")
+    bind.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    bind.execute(create)
+    bind.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_year}"), bounds)
+    bind.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_year}"), bounds)
+    bind.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def ensure_partitions(bind, years) -> list[str]:
+    """Create the yearly partitions (and the catch-all default) that don't exist yet."""
+    if not is_partitioned(bind):
+        return []
+    created = []
+    for year in sorted(set(years)):
+        name = partition_name(year)
+        exists = bind.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar()
+        if exists:
+            continue
+        _create_partition(bind, year)
+        created.append(name)
+    # Rows outside every yearly range land here instead of failing the insert
+    bind.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARTITIONED_TABLE} DEFAULT"))
+    return created
+
+
+def latest_start_date(today: date | None = None) -> date:
+    """Last start_date a write may use, so new rows always land in a yearly partition that exists."""
+    return date((today or date.today()).year + settings.PARTITION_YEARS_AHEAD, 12, 31)
+
+
+def ensure_future_partitions(bind, today: date | None = None) -> list[str]:
+    """Keep partitions for this year and PARTITION_YEARS_AHEAD years after it."""
+    year = (today or date.today()).year
+    return ensure_partitions(bind, range(year, year + settings.PARTITION_YEARS_AHEAD + 1))
+
+
+def pruning_bounds(start: date, end: date, max_span_days: int):
+    """
+    start_date bounds that any request overlapping [start, end] must satisfy,
+    given that no request spans more than `max_span_days`. Adding them to a
+    query lets the planner skip every other year's partition.
+    """
+    return start - timedelta(days=max_span_days), end
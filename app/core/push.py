@@ -0,0 +1,170 @@
+# app/core/push.py
+"""
+Server-sent events for GET /leaves/events. Clients keep one idle stream
+open instead of polling status and balance endpoints.
+
+Services call `push.publish(employee_id, event, data)` after commit, from
+any thread. The broker formats the frame once and hands it to the event
+loop, which puts it on the bounded queue of every stream that employee has
+open in the current tenant. With PUSH_BACKEND "cache" messages go through
+the cache backend's pub/sub first, so with redis a change made on one
+worker reaches streams held by every other worker.
+
+Idle streams cost a queue and a suspended generator each; there are no
+per-connection timers. One loop task sends heartbeats to streams that have
+been quiet for PUSH_HEARTBEAT_SECONDS, which also finds dead sockets. A
+stream whose queue fills up (client not reading) is sent an `overflow`
+event and closed; the client reconnects and refetches.
+"""
+import asyncio
+import json
+import time
+from typing import Optional
+
+from app.core.cache import CacheBackend, cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.tenancy import current_tenant
+
+PUSH_CHANNEL = "push:events"
+# Long-lived; the in-flight caps in front of the app do not count them
+STREAM_PATHS = ("/leaves/events",)
+
+HEARTBEAT = b": ping\n\n"
+_CLOSE = None
+
+
+def frame(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n".encode()
+
+
+class PushLimitError(RuntimeError):
+    def __init__(self, detail: str, per_user: bool):
+        super().__init__(detail)
+        self.per_user = per_user
+
+
+class Subscriber:
+    __slots__ = ("key", "queue", "last_sent")
+
+    def __init__(self, key: tuple[str, int], queue_size: int):
+        self.key = key
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.last_sent = time.monotonic()
+
+
+class PushBroker:
+    def __init__(self, backend: Optional[CacheBackend] = None, max_connections: int = 20000,
+                 max_per_user: int = 8, queue_size: int = 32, heartbeat_seconds: float = 20):
+        self.backend = backend
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        # Only touched on the event loop; publishers elsewhere just peek at it
+        self._subscribers: dict[tuple[str, int], set[Subscriber]] = {}
+        self.connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        if backend is not None:
+            backend.subscribe(PUSH_CHANNEL, self._on_message)
+
+    # ---- publishing (any thread) ----
+    def publish(self, employee_id: int, event: str, data: dict) -> None:
+        tenant = current_tenant()
+        if self.backend is not None:
+            self.backend.publish(PUSH_CHANNEL, json.dumps([tenant, employee_id, event, data], default=str))
+        else:
+            self._dispatch(tenant, employee_id, event, data)
+
+    def _on_message(self, message: str) -> None:
+        tenant, employee_id, event, data = json.loads(message)
+        self._dispatch(tenant, employee_id, event, data)
+
+    def _dispatch(self, tenant: str, employee_id: int, event: str, data: dict) -> None:
+        key = (tenant, employee_id)
+        loop = self._loop
+        # Most changes have nobody listening on this worker
+        if loop is None or key not in self._subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._deliver, key, frame(event, data))
+
+    def _deliver(self, key: tuple[str, int], data: bytes) -> None:
+        for sub in list(self._subscribers.get(key, ())):
+            try:
+                sub.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                self._overflow(sub)
+
+    def _overflow(self, sub: Subscriber) -> None:
+        # The client stopped reading; drop what it has not read and end the stream
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(frame("overflow", {"detail": "Too far behind, reconnect and refetch"}))
+        sub.queue.put_nowait(_CLOSE)
+        self._remove(sub)
+        metrics.inc("push_overflow_total")
+
+    # ---- streams (event loop) ----
+    def open(self, employee_id: int) -> Subscriber:
+        """Register a stream for the employee in the current tenant; raises PushLimitError when full."""
+        self._bind_loop(asyncio.get_running_loop())
+        key = (current_tenant(), employee_id)
+        subs = self._subscribers.get(key, set())
+        if self.connections >= self.max_connections:
+            raise PushLimitError("Too many open event streams, please retry shortly", per_user=False)
+        if len(subs) >= self.max_per_user:
+            raise PushLimitError("Too many open event streams for this user", per_user=True)
+        sub = Subscriber(key, self.queue_size)
+        self._subscribers.setdefault(key, subs).add(sub)
+        self.connections += 1
+        metrics.set_gauge("push_connections", self.connections)
+        return sub
+
+    def _remove(self, sub: Subscriber) -> None:
+        subs = self._subscribers.get(sub.key)
+        if subs is None or sub not in subs:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[sub.key]
+        self.connections -= 1
+        metrics.set_gauge("push_connections", self.connections)
+
+    async def stream(self, sub: Subscriber):
+        """Body of the event-stream response; ends on overflow or when the client goes away."""
+        try:
+            yield f"retry: {int(self.heartbeat_seconds * 1000)}\n\n".encode() + frame("ready", {})
+            while True:
+                data = await sub.queue.get()
+                if data is _CLOSE:
+                    return
+                sub.last_sent = time.monotonic()
+                yield data
+        finally:
+            self._remove(sub)
+
+    def _bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is loop:
+            return
+        # First stream, or the app restarted on a new loop (tests)
+        self._loop = loop
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds / 2)
+            cutoff = time.monotonic() - self.heartbeat_seconds
+            for subs in list(self._subscribers.values()):
+                for sub in subs:
+                    if sub.last_sent < cutoff and sub.queue.empty():
+                        sub.queue.put_nowait(HEARTBEAT)
+
+
+def build_broker() -> PushBroker:
+    backend = cache.backend if settings.PUSH_BACKEND == "cache" else None
+    return PushBroker(backend, settings.PUSH_MAX_CONNECTIONS, settings.PUSH_MAX_PER_USER,
+                      settings.PUSH_QUEUE_SIZE, settings.PUSH_HEARTBEAT_SECONDS)
+
+
+push = build_broker()
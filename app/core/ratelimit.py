@@ -0,0 +1,195 @@
+# app/core/ratelimit.py
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from app.core.cache import CacheBackend, RedisBackend, cache
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Token bucket: `burst` tokens, refilled at `per_minute` tokens per minute."""
+    burst: int
+    per_minute: float
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+
+# ----------------- Bucket stores -----------------
+class MemoryBucketStore:
+    """Buckets for this process only, bounded so a spray of IPs can't grow it forever."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rule: Rule, cost: float = 1) -> float:
+        """Consume tokens. Returns 0 when allowed, else seconds until enough tokens exist."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (rule.burst, now))
+            tokens = min(rule.burst, tokens + (now - updated) * rule.rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rule.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SharedBucketStore:
+    """
+    Buckets kept in the shared cache so every worker enforces the same limit.
+    On Redis the refill-and-take step runs as one Lua script; other backends
+    fall back to read-modify-write, which can over-admit slightly under races.
+    """
+
+    SCRIPT = """
+local data = redis.call('GET', KEYS[1])
+local burst, rate, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens, updated = burst, now
+if data then
+  local sep = string.find(data, ':')
+  tokens, updated = tonumber(string.sub(data, 1, sep - 1)), tonumber(string.sub(data, sep + 1))
+end
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('SET', KEYS[1], tokens .. ':' .. now, 'EX', math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def take(self, key: str, rule: Rule, cost: float = 1) -> float:
+        key = f"ratelimit:{key}"
+        now = time.time()
+        ttl = int(rule.burst / rule.rate) + 1
+        if isinstance(self.backend, RedisBackend):
+            # Not resent after a dropped connection: the script may already have charged the bucket
+            return float(self.backend._command("EVAL", self.SCRIPT, 1, key, rule.burst, rule.rate, cost, now,
+                                               idempotent=False))
+        raw = self.backend.get(key)
+        tokens, updated = (float(x) for x in raw.split(":")) if raw else (rule.burst, now)
+        tokens = min(rule.burst, tokens + (now - updated) * rule.rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rule.rate
+        self.backend.set(key, f"{tokens}:{now}", ttl)
+        return wait
+
+
+def build_store():
+    if settings.RATE_LIMIT_STORE == "shared":
+        return SharedBucketStore(cache.backend)
+    return MemoryBucketStore()
+
+
+bucket_store = build_store()
+
+
+# ----------------- Limiter -----------------
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """Checks one bucket per scope (ip, account) and raises 429 when any is empty."""
+
+    def __init__(self, name: str, ip_rule: Rule, account_rule: Rule | None = None, store=None):
+        self.name = name
+        self.ip_rule = ip_rule
+        self.account_rule = account_rule
+        self.store = store or bucket_store
+
+    def check(self, request: Request, account: str | None = None) -> None:
+        checks = [("ip", client_ip(request), self.ip_rule)]
+        if account and self.account_rule:
+            checks.append(("account", account.lower(), self.account_rule))
+        for scope, ident, rule in checks:
+            wait = self.store.take(f"{self.name}:{scope}:{ident}", rule)
+            if wait > 0:
+                metrics.inc("ratelimit_decisions_total", limiter=self.name, scope=scope, decision="rejected")
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many attempts. Please try again later.",
+                    headers={"Retry-After": str(int(wait) + 1)},
+                )
+        metrics.inc("ratelimit_decisions_total", limiter=self.name, scope="all", decision="allowed")
+
+
+login_limiter = RateLimiter(
+    "login",
+    ip_rule=Rule(settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE),
+    account_rule=Rule(settings.LOGIN_ACCOUNT_BURST, settings.LOGIN_ACCOUNT_PER_MINUTE),
+)
+signup_limiter = RateLimiter(
+    "signup",
+    ip_rule=Rule(settings.SIGNUP_IP_BURST, settings.SIGNUP_IP_PER_MINUTE),
+)
+
+
+# ----------------- Load shedding -----------------
+class LoadShedderMiddleware:
+    """
+    Caps in-flight requests and sheds by priority. CPU-bound auth routes get
+    their own small concurrency cap and are refused first once the process is
+    busy, so /leaves keeps its latency while auth is under attack.
+    Long-lived streams under `stream_paths` have their own cap and are not
+    counted. Runs on the event loop, so plain counters are safe.
+    """
+
+    def __init__(self, app, max_inflight: int, auth_max_concurrency: int, shed_low_priority_at: float,
+                 low_priority_prefixes: tuple[str, ...] = ("/auth",), stream_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.stream_paths = stream_paths
+        self.max_inflight = max_inflight
+        self.auth_max_concurrency = auth_max_concurrency
+        self.shed_threshold = int(max_inflight * shed_low_priority_at)
+        self.low_priority_prefixes = low_priority_prefixes
+        self.inflight = 0
+        self.low_inflight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.stream_paths):
+            await self.app(scope, receive, send)
+            return
+
+        low = scope["path"].startswith(self.low_priority_prefixes)
+        priority = "low" if low else "normal"
+        if self.inflight >= self.max_inflight or (
+            low and (self.low_inflight >= self.auth_max_concurrency or self.inflight >= self.shed_threshold)
+        ):
+            metrics.inc("load_shed_total", priority=priority)
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server busy, please retry shortly"},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.inflight += 1
+        self.low_inflight += low
+        metrics.set_gauge("inflight_requests", self.inflight)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.inflight -= 1
+            self.low_inflight -= low
+            metrics.set_gauge("inflight_requests", self.inflight)
@@ -0,0 +1,230 @@
+# app/core/scheduler.py
+import asyncio
+import inspect
+import os
+import random
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import cache
+from app.core.db import engine
+from app.core.metrics import metrics
+from app.core.tracing import tracer
+from app.models.scheduler_lease import SchedulerLease
+
+
+# ----------------- Schedules -----------------
+class CronSchedule:
+    """Standard 5-field cron (minute hour day-of-month month day-of-week), local time."""
+
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(part, lo, hi) for part, (lo, hi) in zip(parts, self.RANGES)
+        )
+        # Cron semantics: when both day fields are restricted, either may match
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse(part: str, lo: int, hi: int) -> set[int]:
+        values: set[int] = set()
+        for chunk in part.split(","):
+            step = 1
+            if "/" in chunk:
+                chunk, step_str = chunk.split("/")
+                step = int(step_str)
+            if chunk == "*":
+                start, end = lo, hi
+            elif "-" in chunk:
+                start, end = (int(x) for x in chunk.split("-"))
+            else:
+                start = end = int(chunk)
+            if start < lo or end > hi or step < 1:
+                raise ValueError(f"Cron field {part!r} out of range {lo}-{hi}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        # cron counts Sunday as 0, Python counts Monday as 0
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return dow
+        if self._any_weekday:
+            return dom
+        return dom or dow
+
+    def next_after(self, after: datetime) -> datetime:
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+
+class IntervalSchedule:
+    """Fires every `seconds`, aligned to the epoch so all workers agree on the slots."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def next_after(self, after: datetime) -> datetime:
+        ts = after.timestamp()
+        return datetime.fromtimestamp((ts // self.seconds + 1) * self.seconds)
+
+
+# ----------------- Jobs -----------------
+@dataclass
+class JobRun:
+    scheduled_for: datetime
+    started_at: datetime
+    duration: float
+    status: str  # ok, error, timeout
+    error: str | None = None
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Any]
+    schedule: CronSchedule | IntervalSchedule
+    timeout: float = 300.0
+    jitter: float = 0.0
+    # Leader jobs run on one worker per slot; others run in every worker
+    leader: bool = True
+    history: deque = field(default_factory=lambda: deque(maxlen=50))
+    next_run: datetime | None = None
+
+
+class Scheduler:
+    """
+    Runs jobs on the event loop started from the FastAPI lifespan. Sync jobs
+    are pushed to a thread. Leader election is a set-if-absent lock keyed by
+    the job's slot. With Redis the lock lives in the cache; the memory and
+    mmap backends are not shared across processes or hosts, so there the
+    default database holds a lease row per job instead.
+    """
+
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Any], *, cron: str = None, every: float = None,
+                timeout: float = 300.0, jitter: float = 0.0, leader: bool = True) -> Job:
+        if (cron is None) == (every is None):
+            raise ValueError("Pass exactly one of cron= or every=")
+        schedule = CronSchedule(cron) if cron else IntervalSchedule(every)
+        job = Job(name=name, func=func, schedule=schedule, timeout=timeout, jitter=jitter, leader=leader)
+        self.jobs[name] = job
+        return job
+
+    def start(self) -> None:
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"job:{job.name}"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            job.next_run = job.schedule.next_after(datetime.now())
+            delay = (job.next_run - datetime.now()).total_seconds() + random.uniform(0, job.jitter)
+            await asyncio.sleep(max(delay, 0))
+            if job.leader and not await asyncio.to_thread(self._acquire, job):
+                metrics.inc("scheduler_job_runs_total", job=job.name, status="skipped")
+                continue
+            await self.run_job(job, job.next_run)
+
+    def _acquire(self, job: Job) -> bool:
+        slot = int(job.next_run.timestamp())
+        try:
+            if cache.backend.shared_pubsub:
+                key = f"scheduler:lock:{job.name}:{slot}"
+                return cache.backend.add(key, self.owner, ttl=int(job.timeout + job.jitter) + 60)
+            return self._claim_lease(job.name, slot)
+        except Exception as e:
+            print(f"⚠️ Scheduler lock for {job.name} unavailable:", e)
+            return False
+
+    def _claim_lease(self, name: str, slot: int) -> bool:
+        """Move the job's lease to `slot`; only one worker can do that per slot."""
+        table = SchedulerLease.__table__
+        with engine.begin() as conn:
+            moved = conn.execute(
+                update(table)
+                .where(table.c.job == name, table.c.slot < slot)
+                .values(slot=slot, owner=self.owner)
+            ).rowcount
+        if moved:
+            return True
+        # First run of this job anywhere; a duplicate key means another worker got there first
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(table).values(job=name, slot=slot, owner=self.owner))
+            return True
+        except IntegrityError:
+            return False
+
+    async def run_job(self, job: Job, scheduled_for: datetime | None = None) -> JobRun:
+        started = time.monotonic()
+        started_at = datetime.now()
+        status, error = "ok", None
+        with tracer.span(f"job {job.name}", attributes={"job.name": job.name}) as span:
+            try:
+                if inspect.iscoroutinefunction(job.func):
+                    await asyncio.wait_for(job.func(), job.timeout)
+                else:
+                    # The thread can't be killed on timeout; we just stop waiting for it
+                    await asyncio.wait_for(asyncio.to_thread(job.func), job.timeout)
+            except asyncio.TimeoutError:
+                status, error = "timeout", f"exceeded {job.timeout}s"
+            except Exception as e:
+                status, error = "error", repr(e)
+                print(f"❌ Job {job.name} failed:", e)
+            if span is not None:
+                span.set_attribute("job.status", status)
+        duration = time.monotonic() - started
+        run = JobRun(scheduled_for or started_at, started_at, duration, status, error)
+        job.history.append(run)
+        metrics.inc("scheduler_job_runs_total", job=job.name, status=status)
+        metrics.observe("scheduler_job_duration_seconds", duration, job=job.name)
+        return run
+
+    def status(self) -> list[dict]:
+        return [
+            {
+                "name": job.name,
+                "schedule": getattr(job.schedule, "expr", None) or f"every {job.schedule.seconds}s",
+                "leader": job.leader,
+                "next_run": job.next_run,
+                "history": [run.__dict__ for run in reversed(job.history)],
+            }
+            for job in self.jobs.values()
+        ]
+
+
+scheduler = Scheduler()
@@ -0,0 +1,159 @@
+# app/core/tenancy.py
+"""
+Tenant resolution. Every request runs with a tenant id in a context
+variable; the database router (app.core.db), the cache (app.core.cache)
+and the reference registry read it from there, so service code never
+passes it around.
+
+The tenant comes from the `tenant` claim of the bearer token, or from the
+Host header (`acme.leave.example.com` with TENANT_HOST_SUFFIX
+`.leave.example.com`). A token only works on its own tenant's host.
+With MULTI_TENANT off everything runs as DEFAULT_TENANT.
+
+TENANTS is the tenant registry: only listed tenants are admitted, and
+background jobs and `alembic -x tenant=all upgrade head` cover exactly
+those tenants.
+"""
+import contextvars
+import re
+from contextlib import contextmanager
+from urllib.parse import parse_qs
+
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+
+from app.Webhandler.auth import ALGORITHM, SECRET_KEY
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.tracing import tracer
+
+TENANT_ID_RE = re.compile(r"^[a-z0-9][a-z0-9_]{0,39}$")
+
+_tenant: contextvars.ContextVar[str | None] = contextvars.ContextVar("tenant", default=None)
+
+
+def current_tenant() -> str:
+    return _tenant.get() or settings.DEFAULT_TENANT
+
+
+def is_default(tenant: str) -> bool:
+    return tenant == settings.DEFAULT_TENANT
+
+
+def is_known(tenant: str) -> bool:
+    """The default tenant, or a well-formed id listed in TENANTS; anything else is refused."""
+    if is_default(tenant):
+        return True
+    return settings.MULTI_TENANT and bool(TENANT_ID_RE.match(tenant)) and tenant in settings.TENANTS
+
+
+def known_tenants() -> list[str]:
+    """Every admitted tenant; background jobs and migrations run for each."""
+    if not settings.MULTI_TENANT:
+        return [settings.DEFAULT_TENANT]
+    return list(dict.fromkeys([settings.DEFAULT_TENANT, *settings.TENANTS]))
+
+
+@contextmanager
+def tenant_scope(tenant: str):
+    """Run a block (job, script, test) as the given tenant."""
+    token = _tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _tenant.reset(token)
+
+
+# ----------------- Resolution -----------------
+def tenant_from_host(host: str | None) -> str | None:
+    suffix = settings.TENANT_HOST_SUFFIX
+    if not host or not suffix:
+        return None
+    host = host.split(":", 1)[0].lower()
+    if host.endswith(suffix) and len(host) > len(suffix):
+        return host[: -len(suffix)].replace("-", "_")
+    return None
+
+
+def tenant_from_token(authorization: str | None) -> str | None:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        claims = jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None  # the route's own auth check rejects it
+    return claims.get("tenant")
+
+
+def resolve_tenant(host: str | None, authorization: str | None) -> str:
+    """Tenant for a request; raises ValueError when it is unknown or the token belongs elsewhere."""
+    from_host = tenant_from_host(host)
+    from_token = tenant_from_token(authorization)
+    if from_host and from_token and from_host != from_token:
+        raise ValueError("Token was issued for another tenant")
+    tenant = from_token or from_host or settings.DEFAULT_TENANT
+    if not is_known(tenant):
+        raise ValueError("Unknown tenant")
+    return tenant
+
+
+# ----------------- Middleware -----------------
+class TenantMiddleware:
+    """
+    Sets the tenant for the request and caps in-flight requests per tenant,
+    so one busy tenant can't take every worker slot from the others.
+    Long-lived streams under `stream_paths` are not counted.
+    Runs on the event loop, so plain counters are safe.
+    """
+
+    def __init__(self, app, max_inflight_per_tenant: int, stream_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.max_inflight_per_tenant = max_inflight_per_tenant
+        self.stream_paths = stream_paths
+        self.inflight: dict[str, int] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not settings.MULTI_TENANT:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        stream = scope["path"].startswith(self.stream_paths)
+        if stream and not authorization:
+            # EventSource clients can only send a stream token in the query string
+            token = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("stream_token")
+            authorization = f"Bearer {token[0]}" if token else ""
+        try:
+            tenant = resolve_tenant(headers.get(b"host", b"").decode("latin-1"), authorization)
+        except ValueError as e:
+            await JSONResponse(status_code=403, content={"detail": str(e)})(scope, receive, send)
+            return
+
+        if stream:
+            with tenant_scope(tenant):
+                await self.app(scope, receive, send)
+            return
+
+        if self.inflight.get(tenant, 0) >= self.max_inflight_per_tenant:
+            metrics.inc("tenant_shed_total", tenant=tenant)
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Too many concurrent requests for this tenant, please retry shortly"},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        span = tracer.current_span()
+        if span is not None:
+            span.set_attribute("tenant.id", tenant)
+
+        self.inflight[tenant] = self.inflight.get(tenant, 0) + 1
+        try:
+            with tenant_scope(tenant):
+                await self.app(scope, receive, send)
+        finally:
+            self.inflight[tenant] -= 1
+            if not self.inflight[tenant]:
+                del self.inflight[tenant]
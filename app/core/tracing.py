@@ -0,0 +1,180 @@
+# app/core/tracing.py
+"""
+Tracing on the OpenTelemetry SDK. Spans go to a local JSON-lines file or to
+an OTLP/HTTP collector (e.g. http://collector:4318/v1/traces) from the SDK's
+batch processor. The FastAPI instrumentation produces the request spans;
+`tracer` is a thin wrapper for our own spans (service calls, SQL, outbound
+HTTP, email, jobs) that is a no-op while tracing is off.
+
+    with tracer.span("overlap-check", attributes={"employee_id": 7}):
+        ...
+"""
+import functools
+from contextlib import contextmanager
+from typing import Callable
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from app.core.config import settings
+
+KIND = {"internal": SpanKind.INTERNAL, "server": SpanKind.SERVER, "client": SpanKind.CLIENT}
+
+
+class Tracer:
+    def __init__(self, provider: TracerProvider | None = None):
+        self.set_provider(provider)
+
+    def set_provider(self, provider: TracerProvider | None) -> None:
+        self.provider = provider
+        self._tracer = provider.get_tracer("app") if provider is not None else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.provider is not None
+
+    @staticmethod
+    def current_span():
+        """The active span, or None outside a sampled trace."""
+        span = trace.get_current_span()
+        return span if span.is_recording() else None
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: dict | None = None):
+        """Child of the current span, or a new trace. Exceptions are recorded and mark the span failed."""
+        if not self.enabled:
+            yield None
+            return
+        with self._tracer.start_as_current_span(name, kind=KIND[kind], attributes=attributes) as span:
+            yield span
+
+    def start(self, name: str, kind: str = "internal", attributes: dict | None = None):
+        """
+        Child span without touching the context, for callback pairs such as
+        engine events. None outside a trace, which keeps SQL issued by
+        background threads out of the export.
+        """
+        if not self.enabled or self.current_span() is None:
+            return None
+        attributes = {k: v for k, v in (attributes or {}).items() if v is not None}
+        return self._tracer.start_span(name, kind=KIND[kind], attributes=attributes)
+
+    def inject(self, headers: dict) -> dict:
+        """Adds traceparent for the current span to outgoing request headers."""
+        if self.enabled:
+            propagate.inject(headers)
+        return headers
+
+    def flush(self) -> None:
+        if self.provider is not None:
+            self.provider.force_flush()
+
+
+def traced(name: str | None = None, kind: str = "internal") -> Callable:
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name, kind=kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_methods(*private: str) -> Callable:
+    """Class decorator: a span around every public static method plus the listed private ones."""
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if isinstance(value, staticmethod) and (not attr.startswith("_") or attr in private):
+                setattr(cls, attr, staticmethod(traced(f"{cls.__name__}.{attr}")(value.__func__)))
+        return cls
+    return decorator
+
+
+# ----------------- SQL -----------------
+# opentelemetry-instrumentation-sqlalchemy does not support SQLAlchemy 2.1 yet,
+# so statement spans come from engine events here.
+def instrument_engine(engine) -> None:
+    """A client span per statement, parented to whatever span issued it."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        context._trace_span = tracer.start(f"SQL {verb}", kind="client", attributes={
+            "db.system": engine.dialect.name,
+            "db.statement": statement[:2000],
+            "db.executemany": executemany or None,
+        })
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_trace_span", None) if context is not None else None
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+            span.end()
+
+
+def instrument_sessions(session_factory) -> None:
+    """A span from Session.commit() start to finish, covering the final flush and COMMIT."""
+    from sqlalchemy import event
+
+    @event.listens_for(session_factory, "before_commit")
+    def _before_commit(session):
+        session.info["_trace_commit"] = tracer.start("Session.commit", kind="client")
+
+    @event.listens_for(session_factory, "after_commit")
+    def _after_commit(session):
+        span = session.info.pop("_trace_commit", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _after_rollback(session):
+        span = session.info.pop("_trace_commit", None)
+        if span is not None:
+            span.set_status(Status(StatusCode.ERROR, "rolled back"))
+            span.end()
+
+
+# ----------------- HTTP server -----------------
+def instrument_app(app) -> None:
+    """Server span per request, continuing the caller's trace when a traceparent header is sent."""
+    if not tracer.enabled:
+        return
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    # Per-message send/receive spans would swamp event streams
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=tracer.provider, exclude_spans=["receive", "send"])
+
+
+def build_provider() -> TracerProvider | None:
+    if not settings.TRACING_ENABLED or settings.TRACING_EXPORTER == "none":
+        return None
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    else:
+        exporter = ConsoleSpanExporter(out=open(settings.TRACING_FILE_PATH, "a", encoding="utf-8"),
+                                       formatter=lambda span: span.to_json(indent=None) + "\n")
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+                              sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    return provider
+
+
+tracer = Tracer(build_provider())
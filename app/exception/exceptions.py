@@ -24,5 +24,6 @@ async def http_exception_handler(request: Request, exc):
     """Handle HTTP exceptions"""
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),  # e.g. Retry-After on 429
     )
\ No newline at end of file
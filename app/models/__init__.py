@@ -1,3 +1,10 @@
 from .employee import Employee
 from .leave_type import LeaveType
 from .leave_request import LeaveRequest
+from .leave_rollup import LeaveUtilizationRollup
+from .outbox import OutboxEvent
+from .idempotency import IdempotencyRecord
+from .leave_archive import LeaveYearSummary
+from .password_token import PasswordSetupToken
+from .employee_hierarchy import EmployeeHierarchy
+from .scheduler_lease import SchedulerLease
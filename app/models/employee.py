@@ -1,6 +1,6 @@
 # app/models/employee.py
 from pydantic import ValidationError
-from sqlalchemy import BigInteger, Column, Integer, String, Date, DateTime, func,Boolean
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer, String, Date, DateTime, func,Boolean
 from app.core.db import Base
 from app.schemas.employee import EmployeeCreate
 
@@ -20,5 +20,18 @@ class Employee(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     hashed_password = Column(String(255), nullable=True)  # temp password will be hashed
     first_login = Column(Boolean, default=True)           # forces password reset
-    password_setup_token = Column(String(255), nullable=True)  # token for password setup
+    # Direct manager; change it through app.services.hierarchy so the closure table follows
+    manager_id = Column(Integer, ForeignKey("employees.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    # Directory listing: keyset order (name, id) per filter, and prefix search.
+    # Trigram (pg_trgm) indexes for fuzzy search are created by migration only.
+    __table_args__ = (
+        Index("ix_employees_name_id", "name", "id"),
+        Index("ix_employees_domain_name_id", "domain", "name", "id"),
+        Index("ix_employees_job_type_name_id", "job_type", "name", "id"),
+        Index("ix_employees_name_lower", func.lower(name).label("name_lower"),
+              postgresql_ops={"name_lower": "text_pattern_ops"}),
+        Index("ix_employees_email_lower", func.lower(email).label("email_lower"),
+              postgresql_ops={"email_lower": "text_pattern_ops"}),
+    )
     
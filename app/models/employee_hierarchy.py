@@ -0,0 +1,21 @@
+# app/models/employee_hierarchy.py
+from sqlalchemy import Column, ForeignKey, Index, Integer
+from app.core.db import Base
+
+class EmployeeHierarchy(Base):
+    """
+    Closure table of the reporting tree: one row per (manager above, employee
+    below) pair at any distance, plus a depth-0 row per employee. Maintained
+    by app.services.hierarchy alongside Employee.manager_id.
+    """
+    __tablename__ = "employee_hierarchy"
+
+    ancestor_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    # PK (ancestor_id, descendant_id) serves "everyone under X" and "may X approve Y";
+    # this one serves "everyone above Y", nearest first
+    __table_args__ = (
+        Index("ix_employee_hierarchy_descendant_depth", "descendant_id", "depth"),
+    )
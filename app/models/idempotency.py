@@ -0,0 +1,18 @@
+# app/models/idempotency.py
+from sqlalchemy import Column, Integer, String, DateTime, JSON, UniqueConstraint, func
+from app.core.db import Base
+
+class IdempotencyRecord(Base):
+    """Stored outcome of a POST made with an Idempotency-Key header."""
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(100), nullable=False)  # route plus caller, so keys can't collide across users
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is still running
+    response_body = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (UniqueConstraint("scope", "key", name="uq_idempotency_scope_key"),)
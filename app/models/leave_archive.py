@@ -0,0 +1,20 @@
+# app/models/leave_archive.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint, func
+from app.core.db import Base
+
+class LeaveYearSummary(Base):
+    """What is left in the database for a closed year once its requests are archived to files."""
+    __tablename__ = "leave_year_summaries"
+
+    id = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False, index=True)
+    year = Column(Integer, nullable=False)
+    leave_type_id = Column(Integer, ForeignKey("leave_types.id"), nullable=False)
+    approved_days = Column(Integer, nullable=False, default=0)
+    approved_requests = Column(Integer, nullable=False, default=0)
+    rejected_requests = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("employee_id", "year", "leave_type_id", name="uq_year_summary_employee_year_type"),
+    )
@@ -1,10 +1,15 @@
 # app/models/leave_request.py
-from sqlalchemy import Column, Integer, Date, Enum, DateTime, ForeignKey, String, func
+from sqlalchemy import Column, Integer, Date, Enum, DateTime, ForeignKey, Index, JSON, String, func, text
 import enum
 from sqlalchemy.orm import relationship
 from app.core.db import Base
+from app.core import partitions  # noqa: F401 (partition-aware primary key DDL)
 from app.models.leave_type import LeaveType
 
+# Longest calendar span a single request may cover. Partition pruning relies on it:
+# a request overlapping a date starts at most this many days before it.
+MAX_LEAVE_SPAN_DAYS = 366
+
 class LeaveStatus(str, enum.Enum):
     PENDING = "PENDING"
     APPROVED = "APPROVED"
@@ -14,10 +19,14 @@ class LeaveRequest(Base):
     __tablename__ = "leave_requests"
 
     id = Column(Integer, primary_key=True)
-    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False, index=True)
+    # No single-column index: ix_leave_requests_overlap leads with employee_id
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     days = Column(Integer, nullable=False)
+    # {"2026-03-01": 4, ...}: working days per month, fixed whenever the dates are set.
+    # Rollups add and subtract exactly this, see app/services/rollups.py
+    month_days = Column(JSON, nullable=True)
     reason = Column(String(255), nullable=True)
     status = Column(Enum(LeaveStatus), nullable=False, default=LeaveStatus.PENDING)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -27,3 +36,23 @@ class LeaveRequest(Base):
     status = Column(Enum(LeaveStatus), default=LeaveStatus.PENDING, nullable=False)
     approved_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Hot-path indexes, kept in sync with alembic revision b7d41e0c9a52.
+    __table_args__ = (
+        # Overlap check in apply_leave
+        Index("ix_leave_requests_overlap", "employee_id", "start_date", "end_date",
+              postgresql_where=text("status <> 'REJECTED'"), sqlite_where=text("status <> 'REJECTED'")),
+        # Approved-days sum per employee, answered from the index alone
+        Index("ix_leave_requests_approved_days", "employee_id", "days",
+              postgresql_where=text("status = 'APPROVED'"), sqlite_where=text("status = 'APPROVED'")),
+        # Pending-days sum per employee (approval queue balances)
+        Index("ix_leave_requests_pending_days", "employee_id", "days",
+              postgresql_where=text("status = 'PENDING'"), sqlite_where=text("status = 'PENDING'")),
+        # Approval queue order
+        Index("ix_leave_requests_pending_queue", "created_at", "id", postgresql_include=["employee_id"],
+              postgresql_where=text("status = 'PENDING'"), sqlite_where=text("status = 'PENDING'")),
+        # Date-range lookups across employees (mass leave, archival, rollup rebuilds)
+        Index("ix_leave_requests_dates", "start_date", "end_date"),
+        # Yearly partitions on Postgres, see app/core/partitions.py
+        {"postgresql_partition_by": "RANGE (start_date)"},
+    )
+
@@ -0,0 +1,20 @@
+# app/models/leave_rollup.py
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint, func
+from app.core.db import Base
+
+class LeaveUtilizationRollup(Base):
+    """Working days per (domain, leave type, month), maintained on every leave transition."""
+    __tablename__ = "leave_utilization_rollups"
+
+    id = Column(Integer, primary_key=True)
+    domain = Column(String(100), nullable=False)
+    leave_type_id = Column(Integer, ForeignKey("leave_types.id"), nullable=False)
+    month = Column(Date, nullable=False)  # first day of the month
+    approved_days = Column(Integer, nullable=False, default=0)
+    pending_days = Column(Integer, nullable=False, default=0)
+    requests = Column(Integer, nullable=False, default=0)  # non-rejected requests touching the month
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("domain", "leave_type_id", "month", name="uq_rollup_domain_type_month"),
+    )
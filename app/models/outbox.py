@@ -0,0 +1,26 @@
+# app/models/outbox.py
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, func, text
+from app.core.db import Base
+
+class OutboxEvent(Base):
+    """Leave lifecycle event written in the same transaction as the change it describes."""
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(50), nullable=False)  # leave.applied, leave.approved, ...
+    employee_id = Column(Integer, nullable=False, index=True)
+    leave_id = Column(Integer, nullable=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, delivered, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+    delivered_to = Column(JSON, nullable=True)  # webhook URLs that accepted it
+
+    __table_args__ = (
+        # The relay only ever scans pending rows in id order
+        Index("ix_outbox_pending", "id", postgresql_where=text("status = 'pending'"),
+              sqlite_where=text("status = 'pending'")),
+    )
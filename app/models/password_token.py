@@ -0,0 +1,13 @@
+# app/models/password_token.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from app.core.db import Base
+
+class PasswordSetupToken(Base):
+    """One-time password setup link. Only the SHA-256 of the token is stored."""
+    __tablename__ = "password_setup_tokens"
+
+    id = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,12 @@
+# app/models/scheduler_lease.py
+from sqlalchemy import Column, String, BigInteger, DateTime, func
+from app.core.db import Base
+
+class SchedulerLease(Base):
+    """Last slot claimed for each leader job; whoever moves `slot` forward runs that occurrence."""
+    __tablename__ = "scheduler_leases"
+
+    job = Column(String(100), primary_key=True)
+    slot = Column(BigInteger, nullable=False)  # epoch seconds of the scheduled run
+    owner = Column(String(255), nullable=False)  # host:pid of the winning worker
+    acquired_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
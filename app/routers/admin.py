@@ -0,0 +1,63 @@
+# app/routers/admin.py
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.Webhandler.oauth2 import get_current_user
+from app.core.db import get_db
+from app.core.scheduler import scheduler
+from app.models.user import RoleEnum, User
+from app.schemas.leave import LeaveYearSummaryOut
+from app.services import archive
+from app.services.reference import reference
+from app.utils.fields import parse_fields
+
+router = APIRouter()
+
+
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
+# ✅ Scheduled jobs with their next run and recent history
+@router.get("/jobs")
+def list_jobs(current_user: User = Depends(require_admin)):
+    return scheduler.status()
+
+
+# ✅ Reload leave types and company holidays after changing them outside the API
+@router.post("/reference/reload")
+def reload_reference(current_user: User = Depends(require_admin)):
+    reference.invalidate()
+    snapshot = reference.current()
+    return {"version": snapshot.version, "leave_types": len(snapshot.leave_types),
+            "company_holidays": len(snapshot.company_holidays)}
+
+
+# ✅ Archived years: summaries from the database, full records streamed from the archive files
+@router.get("/archive/summaries", response_model=list[LeaveYearSummaryOut] | list[dict])
+def archived_summaries(
+    year: int = Query(..., ge=2000, le=2100),
+    employee_id: int | None = Query(None, gt=0),
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    columns = parse_fields(fields, LeaveYearSummaryOut.model_fields, default=()) if fields else None
+    return archive.year_summaries(db, year, employee_id=employee_id, fields=columns)
+
+
+@router.get("/archive/leaves")
+def archived_leaves(
+    year: int = Query(..., ge=2000, le=2100),
+    employee_id: int | None = Query(None, gt=0),
+    current_user: User = Depends(require_admin),
+):
+    if year not in archive.archived_years():
+        raise HTTPException(status_code=404, detail=f"No archived leave data for {year}")
+    lines = (json.dumps(record) + "\n" for record in archive.iter_records(year, employee_id=employee_id))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
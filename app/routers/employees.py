@@ -1,31 +1,56 @@
 # app/routers/employees.py
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from pydantic_core import ValidationError
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Literal, Optional
 from passlib.context import CryptContext
-import secrets
 
-from app.Webhandler.oauth2 import get_current_user
-from app.core.db import get_db
+from app.Webhandler.oauth2 import get_current_user, get_current_user_read
+from app.core.db import get_db, get_read_db
 from app.models.employee import Employee
 from app.models.user import User, RoleEnum
-from app.schemas.employee import EmployeeCreate, EmployeeOut
+from app.schemas.employee import (
+    EmployeeCreate, EmployeeDirectoryPage, EmployeeOut, EmployeeSummary, Reorg,
+)
 from app.schemas.leave import LeaveOut
+from app.services import directory, hierarchy, idempotency, password_tokens
 from app.services.leave_service import LeaveService
 from app.core.mail import send_password_setup_email
+from app.utils.fields import parse_fields
 
 router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 
+# ✅ Directory: filters, prefix/fuzzy search, keyset pagination and sparse fields
+@router.get("/", response_model=EmployeeDirectoryPage)
+def list_employees(
+    domain: Optional[str] = Query(None),
+    job_type: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Name or email search"),
+    match: Literal["prefix", "fuzzy"] = Query("prefix"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    # Contact details and allocations are for admins only
+    allowed = directory.DIRECTORY_FIELDS if current_user.role == RoleEnum.admin else directory.PUBLIC_FIELDS
+    columns = parse_fields(fields, allowed, default=directory.PUBLIC_FIELDS)
+    return directory.list_employees(
+        db, columns, domain=domain, job_type=job_type, q=q, match=match, cursor=cursor, limit=limit
+    )
+
+
 @router.post("/", response_model=EmployeeOut, status_code=201)
 async def add_employee(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
 ):
     # Only admin can add employees
     if current_user.role != RoleEnum.admin:
@@ -33,6 +58,16 @@ async def add_employee(
 
     payload_dict = await request.json()
 
+    # Retries carrying the same Idempotency-Key get the original response back
+    if idempotency_key:
+        return idempotency.run(
+            db, idempotency_key, f"POST /employees:{current_user.id}", payload_dict,
+            lambda: _create_employee(payload_dict, db), status_code=201,
+        )
+    return _create_employee(payload_dict, db)
+
+
+def _create_employee(payload_dict: dict, db: Session) -> EmployeeOut:
     # Validate input manually
     try:
         payload = EmployeeCreate(**payload_dict)
@@ -44,8 +79,8 @@ async def add_employee(
     if db.query(Employee).filter(Employee.email == payload.email).first():
         raise HTTPException(status_code=409, detail="Email already exists")
 
-    # Generate password setup token
-    setup_token = secrets.token_urlsafe(32)
+    if payload.manager_id is not None and db.get(Employee, payload.manager_id) is None:
+        raise HTTPException(status_code=404, detail="Manager not found")
 
     # Create Employee record
     emp = Employee(
@@ -58,12 +93,14 @@ async def add_employee(
         joining_date=payload.joining_date,
         annual_allocation=payload.annual_allocation or 24,
         first_login=True,
-        password_setup_token=setup_token,
+        manager_id=payload.manager_id,
     )
 
     db.add(emp)
-    db.commit()
-    db.refresh(emp)
+    db.flush()
+    hierarchy.add_employee(db, emp.id, payload.manager_id)
+    # Only a hash of the token is stored; the cleartext goes out by email
+    setup_token = password_tokens.issue(db, emp.id)
 
     # Create corresponding User record
     user = User(
@@ -72,6 +109,11 @@ async def add_employee(
         role=RoleEnum.employee,
     )
     db.add(user)
+    db.flush()
+    db.refresh(emp)
+    out = EmployeeOut.model_validate(emp)
+    # Stored with the employee, so a retry never replays a create that rolled back
+    idempotency.remember(db, out)
     db.commit()
 
     # Send password setup email
@@ -80,8 +122,56 @@ async def add_employee(
     except Exception as e:
         print("⚠️ Failed to send email:", e)
 
+    return out
+
+# ✅ Reporting hierarchy
+@router.put("/{employee_id}/manager", response_model=EmployeeOut)
+def change_manager(
+    employee_id: int,
+    manager_id: Optional[int] = Query(None, gt=0, description="New direct manager; omit for the top of the tree"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Not authorized to change managers")
+    emp = hierarchy.move(db, employee_id, manager_id)
+    db.commit()
+    db.refresh(emp)
     return emp
 
+
+@router.post("/reorg", response_model=list[EmployeeOut])
+def reorg(
+    payload: Reorg,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Not authorized to change managers")
+    moved = [hierarchy.move(db, m.employee_id, m.manager_id) for m in payload.moves]
+    db.commit()
+    return moved
+
+
+@router.get("/{employee_id}/reports", response_model=list[EmployeeSummary])
+def list_reports(
+    employee_id: int,
+    direct: bool = Query(False, description="Only direct reports"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    return hierarchy.reports(db, employee_id, direct_only=direct)
+
+
+@router.get("/{employee_id}/approvers", response_model=list[EmployeeSummary])
+def list_approvers(
+    employee_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    return hierarchy.approvers(db, employee_id)
+
+
 # ✅ Cancel leave (before approval)
 @router.delete("/{leave_id}/cancel")
 def cancel_leave(
@@ -1,19 +1,203 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+import requests
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.core.db import get_db
-from app.schemas.leave import LeaveApply, LeaveAction, LeaveOut, LeaveBalanceOut
+from app.core.config import settings
+from app.core.db import SessionLocal, get_db, get_read_db
+from app.core.etag import etag_for, is_not_modified, not_modified_response, set_etag
+from app.core.http import CircuitOpenError
+from app.core.push import PushLimitError, push
+from app.core.tenancy import current_tenant
+from app.models.employee import Employee
+from app.models.user import RoleEnum, User
+from app.schemas.leave_type import LeaveTypeOut
+from app.schemas.leave import (
+    LeaveApply, LeaveAction, LeaveOut, LeaveBalanceOut, MassLeaveApply, MassLeaveReport, PendingApprovalOut,
+    PendingApprovalPage, LeaveForecastRequest, LeaveForecastOut, WorkingDaysRequest, WorkingDaysOut,
+)
+from app.Webhandler.auth import STREAM_TOKEN_EXPIRE_SECONDS, STREAM_TOKEN_PURPOSE, create_stream_token
+from app.Webhandler.oauth2 import _resolve_user, get_current_user, get_current_user_read
+from app.services import hierarchy, idempotency
+from app.services.holidays import batch_working_days
 from app.services.leave_service import LeaveService
+from app.services.reference import NAMESPACE as REFERENCE_NAMESPACE, reference
+from app.utils.fields import parse_fields
 
 router = APIRouter()
 
 @router.post("/", response_model=LeaveOut, status_code=201)
-def apply_leave(payload: LeaveApply, db: Session = Depends(get_db)):
-    return LeaveService.apply_leave(payload, db)
+def apply_leave(
+    payload: LeaveApply,
+    db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+):
+    if not idempotency_key:
+        return LeaveService.apply_leave(payload, db)
+    return idempotency.run(
+        db, idempotency_key, f"POST /leaves:{payload.employee_id}", payload,
+        lambda: LeaveService.apply_leave(payload, db), status_code=201,
+    )
+
+@router.post("/bulk", response_model=MassLeaveReport)
+def apply_mass_leave(
+    payload: MassLeaveApply,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+):
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Not authorized to apply leave in bulk")
+    if not idempotency_key:
+        return LeaveService.apply_mass_leave(payload, db)
+    return idempotency.run(
+        db, idempotency_key, f"POST /leaves/bulk:{current_user.id}", payload,
+        lambda: LeaveService.apply_mass_leave(payload, db),
+    )
+
+@router.post("/forecast", response_model=LeaveForecastOut)
+def forecast_leave_plan(
+    payload: LeaveForecastRequest,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    """Working days, overlaps and projected balance for candidate ranges, without applying anything."""
+    # Employees plan their own leave; managers may look at anyone under them
+    if current_user.role != RoleEnum.admin:
+        acting_id = _acting_employee_id(db, current_user)
+        if acting_id != payload.employee_id and not hierarchy.can_approve(db, acting_id, payload.employee_id):
+            raise HTTPException(status_code=403, detail="Not authorized to forecast leave for this employee")
+    return LeaveService.forecast(payload, db)
+
+@router.post("/working-days", response_model=WorkingDaysOut)
+def working_days(payload: WorkingDaysRequest, current_user: User = Depends(get_current_user_read)):
+    """
+    Working-day counts for up to 5000 ranges. Calendars are cached per
+    (country, year), so past the first call for a year each range costs a
+    couple of list lookups; target is under 10 µs per range server-side.
+    """
+    default = (payload.country or settings.COUNTRY).upper()
+    ranges = [((r.country or default).upper(), r.start_date, r.end_date) for r in payload.ranges]
+    # Every new (country, year) is a paid provider call: keep to the configured ones
+    countries = {settings.COUNTRY.upper(), *(c.upper() for c in settings.WORKING_DAYS_COUNTRIES)}
+    unknown = sorted({country for country, _, _ in ranges} - countries)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported country: {', '.join(unknown)}")
+    this_year, window = date.today().year, settings.WORKING_DAYS_YEAR_WINDOW
+    if any(start.year < this_year - window or end.year > this_year + window for _, start, end in ranges):
+        raise HTTPException(status_code=400,
+                            detail=f"Dates must fall between {this_year - window} and {this_year + window}")
+    try:
+        return WorkingDaysOut(days=batch_working_days(ranges))
+    except (requests.RequestException, CircuitOpenError) as e:
+        response = getattr(e, "response", None)
+        if response is not None and response.status_code < 500 and response.status_code != 429:
+            raise HTTPException(status_code=400, detail="Holiday provider rejected the calendar request")
+        raise HTTPException(status_code=503, detail="Holiday provider unavailable, please retry shortly",
+                            headers={"Retry-After": "5"})
+
+def _acting_employee_id(db: Session, user: User) -> int:
+    """Employee record behind a non-admin login; approvers act as themselves."""
+    employee_id = db.execute(select(Employee.id).where(Employee.email == user.email)).scalar()
+    if employee_id is None:
+        raise HTTPException(status_code=403, detail="No employee record for this account")
+    return employee_id
 
 @router.post("/{leave_id}/action", response_model=LeaveOut)
-def act_on_leave(leave_id: int, payload: LeaveAction, db: Session = Depends(get_db)):
-    return LeaveService.act_on_leave(leave_id, payload, db)
+def act_on_leave(
+    leave_id: int,
+    payload: LeaveAction,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Admins may act on any request, managers on requests from anyone under them
+    approver_id = None if current_user.role == RoleEnum.admin else _acting_employee_id(db, current_user)
+    return LeaveService.act_on_leave(leave_id, payload, db, approver_id=approver_id)
+
+@router.get("/types", response_model=list[LeaveTypeOut])
+def leave_types(request: Request, response: Response):
+    # Served from the reference snapshot; the ETag follows its version
+    tag = etag_for(REFERENCE_NAMESPACE)
+    if is_not_modified(request, tag):
+        return not_modified_response(tag)
+    set_etag(response, tag)
+    return list(reference.current().leave_types.values())
 
 @router.get("/balance/{employee_id}", response_model=LeaveBalanceOut)
-def leave_balance(employee_id: int, db: Session = Depends(get_db)):
+def leave_balance(employee_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    # Tag is read before computing, so a racing write can only make the
+    # client refetch once more, never keep a stale body. Used days come from
+    # the cache or the primary, so a lagging replica can't pair old totals
+    # with the new tag.
+    tag = etag_for(f"balance:{employee_id}")
+    if is_not_modified(request, tag):
+        return not_modified_response(tag)
+    set_etag(response, tag)
     return LeaveService.leave_balance(employee_id, db)
+
+@router.get("/pending", response_model=PendingApprovalPage)
+def pending_approvals(
+    domain: str | None = Query(None, description="Only employees in this domain"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=200),
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    manager_id: int | None = Query(None, gt=0, description="Only requests from employees under this manager (admins)"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    # Managers always get the queue of their own reports
+    if current_user.role != RoleEnum.admin:
+        manager_id = _acting_employee_id(db, current_user)
+    columns = parse_fields(fields, PendingApprovalOut.model_fields, default=()) if fields else None
+    return LeaveService.pending_approvals(db, domain=domain, page=page, limit=limit, fields=columns,
+                                          manager_id=manager_id)
+
+def _stream_employee_id(token: str, purpose: str | None) -> int:
+    db = SessionLocal()
+    try:
+        return _acting_employee_id(db, _resolve_user(token, db, purpose))
+    finally:
+        # Closed now rather than held for the life of the stream
+        db.close()
+
+@router.post("/events/token")
+def leave_events_token(current_user: User = Depends(get_current_user_read)):
+    """
+    Short-lived token for `GET /leaves/events?stream_token=`. EventSource
+    cannot send headers, and the login token must not end up in access logs.
+    Fetch a new one before each (re)connect.
+    """
+    return {
+        "stream_token": create_stream_token(current_user.email, current_tenant()),
+        "expires_in": STREAM_TOKEN_EXPIRE_SECONDS,
+    }
+
+@router.get("/events")
+async def leave_events(
+    stream_token: str | None = Query(None, description="From POST /leaves/events/token, for EventSource clients"),
+    authorization: str | None = Header(None),
+):
+    """
+    Server-sent events for the caller's own leave requests: `leave` when one
+    is applied, approved, rejected, modified or cancelled, and `balance` with
+    the new ETag of GET /leaves/balance. Streams start with `ready`; refetch
+    state then and after any reconnect.
+    """
+    if authorization and authorization.lower().startswith("bearer "):
+        token, purpose = authorization[7:], None
+    elif stream_token:
+        token, purpose = stream_token, STREAM_TOKEN_PURPOSE
+    else:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    employee_id = await run_in_threadpool(_stream_employee_id, token, purpose)
+    try:
+        sub = push.open(employee_id)
+    except PushLimitError as e:
+        raise HTTPException(status_code=429 if e.per_user else 503, detail=str(e), headers={"Retry-After": "5"})
+    return StreamingResponse(
+        push.stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,29 @@
+# app/routers/reports.py
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.Webhandler.oauth2 import get_current_user_read
+from app.core.db import get_read_db
+from app.models.user import RoleEnum, User
+from app.schemas.leave import UtilizationRow
+from app.services import rollups
+from app.utils.fields import parse_fields
+
+router = APIRouter()
+
+
+# ✅ Utilization by domain / leave type / month, served from the rollup table only
+@router.get("/utilization", response_model=list[UtilizationRow] | list[dict])
+def utilization(
+    year: int = Query(default_factory=lambda: date.today().year, ge=2000, le=2100),
+    domain: str | None = Query(None),
+    leave_type_id: int | None = Query(None, gt=0),
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_read),
+):
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Not authorized to view reports")
+    columns = parse_fields(fields, UtilizationRow.model_fields, default=()) if fields else None
+    return rollups.utilization_report(db, year, domain=domain, leave_type_id=leave_type_id, fields=columns)
@@ -13,6 +13,7 @@ class EmployeeBase(BaseModel):
     phone_number: int = Field(..., description="10-digit phone number")  # required int
     job_type: Optional[str] = None
     address: Optional[str] = None
+    manager_id: Optional[int] = Field(None, gt=0, description="Direct manager's employee id")
 
     @field_validator("name")
     @classmethod
@@ -53,6 +54,7 @@ class EmployeeOut(BaseModel):
     phone_number: int  # required, not optional anymore
     job_type: Optional[str] = None
     address: Optional[str] = None
+    manager_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -62,3 +64,32 @@ class EmployeeWithTempPassword(EmployeeOut):
     """Optional schema when returning info with temp password (internal use only)"""
     temp_password: Optional[str] = None
     password_setup_token: Optional[str] = None
+
+
+class EmployeeDirectoryPage(BaseModel):
+    """One page of the directory; items carry only the requested fields"""
+    items: list[dict]
+    next_cursor: Optional[str] = None
+
+
+class EmployeeSummary(BaseModel):
+    """Hierarchy listings: reports and approvers"""
+    id: int
+    name: str
+    email: EmailStr
+    domain: str
+    job_type: Optional[str] = None
+    manager_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ManagerChange(BaseModel):
+    employee_id: int = Field(gt=0)
+    manager_id: Optional[int] = Field(None, gt=0, description="New direct manager; null for the top of the tree")
+
+
+class Reorg(BaseModel):
+    """Manager changes applied in order, in one transaction"""
+    moves: list[ManagerChange] = Field(min_length=1, max_length=1000)
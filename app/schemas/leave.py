@@ -1,10 +1,12 @@
 # app/schemas/leave.py
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 from datetime import date, datetime
 from typing import Optional
 from enum import Enum
 import re
 
+from app.models.leave_request import MAX_LEAVE_SPAN_DAYS
+
 # ============================================
 # ENUMS FOR BETTER TYPE SAFETY
 # ============================================
@@ -263,6 +265,143 @@ class LeaveBalanceOut(BaseModel):
             raise ValueError("Used leave cannot exceed allocation")
         return v
 
+# ============================================
+# APPROVAL QUEUE SCHEMAS
+# ============================================
+
+class PendingApprovalOut(BaseModel):
+    """Pending leave request with the employee's balance at the time of listing"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(gt=0, description="Leave request ID")
+    employee_id: int = Field(gt=0, description="Employee ID")
+    employee_name: str = Field(description="Employee name")
+    domain: str = Field(description="Employee domain")
+    leave_type_id: int = Field(description="Leave type ID")
+    start_date: date = Field(description="Leave start date")
+    end_date: date = Field(description="Leave end date")
+    days: int = Field(ge=1, description="Number of leave days")
+    reason: Optional[str] = Field(None, description="Leave reason")
+    created_at: Optional[datetime] = Field(None, description="When request was created")
+
+    allocation: int = Field(ge=0, description="Total annual leave allocation")
+    used: int = Field(ge=0, description="Approved leave days")
+    pending: int = Field(ge=0, description="Leave days pending approval, including this request")
+    remaining: int = Field(description="Allocation minus approved days")
+
+class PendingApprovalPage(BaseModel):
+    """One page of the approval queue; items carry only the requested fields when fields= is used"""
+    items: list[PendingApprovalOut] | list[dict]
+    total: int = Field(ge=0, description="Pending requests matching the filters")
+    page: int = Field(ge=1)
+    limit: int = Field(ge=1)
+
+# ============================================
+# UTILIZATION REPORT SCHEMAS
+# ============================================
+
+class UtilizationRow(BaseModel):
+    """Leave utilization for one (domain, leave type, month) bucket"""
+    model_config = ConfigDict(from_attributes=True)
+
+    domain: str
+    leave_type_id: int
+    month: date = Field(description="First day of the month")
+    approved_days: int
+    pending_days: int
+    requests: int = Field(description="Non-rejected requests touching the month")
+
+class LeaveYearSummaryOut(BaseModel):
+    """Per-employee totals kept for an archived year"""
+    model_config = ConfigDict(from_attributes=True)
+
+    employee_id: int
+    year: int
+    leave_type_id: int
+    approved_days: int
+    approved_requests: int
+    rejected_requests: int
+
+# ============================================
+# LEAVE PLAN FORECAST SCHEMAS
+# ============================================
+
+# Each distinct (country, year) may cost one holiday provider call
+MAX_CALENDAR_YEARS = 20
+
+class ForecastRange(BaseModel):
+    start_date: date
+    end_date: date
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        if self.end_date < self.start_date:
+            raise ValueError("End date cannot be before start date")
+        if (self.end_date - self.start_date).days > MAX_LEAVE_SPAN_DAYS:
+            raise ValueError(f"Leave cannot span more than {MAX_LEAVE_SPAN_DAYS} days")
+        return self
+
+class LeaveForecastRequest(BaseModel):
+    """Candidate ranges to try out, e.g. a whole year's plan; nothing is written"""
+    model_config = ConfigDict(extra='forbid')
+
+    employee_id: int = Field(gt=0)
+    ranges: list[ForecastRange] = Field(min_length=1, max_length=1000)
+
+    @model_validator(mode='after')
+    def validate_calendars(self):
+        years = {year for r in self.ranges for year in range(r.start_date.year, r.end_date.year + 1)}
+        if len(years) > MAX_CALENDAR_YEARS:
+            raise ValueError(f"Ranges may touch at most {MAX_CALENDAR_YEARS} calendar years")
+        return self
+
+class LeaveForecastItem(BaseModel):
+    index: int = Field(description="Position of the range in the request")
+    start_date: date
+    end_date: date
+    days: int = Field(description="Working days in the range")
+    overlaps_existing: list[int] = Field(description="Live leave requests the range overlaps")
+    overlaps_plan: list[int] = Field(description="Indexes of other candidate ranges it overlaps")
+    remaining_after: int = Field(description="Projected balance once this and every earlier accepted range is taken")
+    ok: bool = Field(description="Can be taken: in the future, no overlaps, and enough balance after approved, "
+                                 "pending and earlier accepted ranges. Stricter than POST /leaves, which only "
+                                 "counts approved days")
+
+class LeaveForecastOut(BaseModel):
+    employee_id: int
+    allocation: int
+    used: int = Field(description="Approved leave days")
+    pending: int = Field(description="Leave days awaiting approval")
+    items: list[LeaveForecastItem] = Field(description="Ranges in chronological order")
+
+# ============================================
+# WORKING-DAY BATCH SCHEMAS
+# ============================================
+
+class WorkingDayRange(ForecastRange):
+    country: Optional[str] = Field(None, pattern=r"^[A-Za-z]{2}$", description="Defaults to the request's country")
+
+class WorkingDaysRequest(BaseModel):
+    """Many ranges in one call, e.g. every candidate end date for a date picker"""
+    model_config = ConfigDict(extra='forbid')
+
+    country: Optional[str] = Field(None, pattern=r"^[A-Za-z]{2}$", description="Defaults to the configured COUNTRY")
+    ranges: list[WorkingDayRange] = Field(min_length=1, max_length=5000)
+
+    @model_validator(mode='after')
+    def validate_calendars(self):
+        years = {
+            ((r.country or self.country or "").upper(), year)
+            for r in self.ranges
+            for year in range(r.start_date.year, r.end_date.year + 1)
+        }
+        if len(years) > MAX_CALENDAR_YEARS:
+            raise ValueError(f"Ranges may touch at most {MAX_CALENDAR_YEARS} country/year calendars")
+        return self
+
+class WorkingDaysOut(BaseModel):
+    days: list[int] = Field(description="Working days per range, in request order")
+
 # ============================================
 # ADDITIONAL UTILITY SCHEMAS
 # ============================================
@@ -303,6 +442,42 @@ class LeaveSearchFilters(BaseModel):
 # BULK OPERATIONS SCHEMAS
 # ============================================
 
+class MassLeaveApply(BaseModel):
+    """Same leave for a whole domain or an explicit set of employees (e.g. shutdowns)"""
+    model_config = ConfigDict(str_strip_whitespace=True, extra='forbid')
+
+    start_date: date
+    end_date: date
+    leave_type_id: int = Field(gt=0)
+    reason: Optional[str] = Field(None, min_length=3, max_length=255)
+    domain: Optional[str] = Field(None, description="Apply to every employee in this domain")
+    employee_ids: Optional[list[int]] = Field(None, min_length=1, max_length=20000)
+    auto_approve: bool = Field(False, description="Create the requests as APPROVED")
+
+    @model_validator(mode='after')
+    def validate_target(self):
+        if (self.domain is None) == (self.employee_ids is None):
+            raise ValueError("Provide exactly one of domain or employee_ids")
+        if self.end_date < self.start_date:
+            raise ValueError("End date cannot be before start date")
+        if (self.end_date - self.start_date).days > MAX_LEAVE_SPAN_DAYS:
+            raise ValueError(f"Leave cannot span more than {MAX_LEAVE_SPAN_DAYS} days")
+        if self.start_date < date.today():
+            raise ValueError("Start date cannot be in the past")
+        return self
+
+class MassLeaveResult(BaseModel):
+    employee_id: int
+    status: str = Field(description="applied or skipped")
+    leave_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class MassLeaveReport(BaseModel):
+    days: int = Field(description="Working days in the range")
+    applied: int
+    skipped: int
+    results: list[MassLeaveResult]
+
 class BulkLeaveAction(BaseModel):
     """Schema for bulk leave actions"""
     leave_ids: list[int] = Field(min_length=1, max_length=50)
@@ -0,0 +1,195 @@
+# app/services/archive.py
+"""
+Cold archive for closed years. Finished requests (approved or rejected)
+whose end date is before the retention cutoff are written to gzip'd
+columnar JSON files, one directory per start year, and replaced in the
+database by per-employee yearly summaries so balances stay correct.
+Pending requests are never archived.
+
+    archive/leave_requests/year=2023/part-000000000101-000000005100.json.gz
+    {"rows": 5000, "columns": {"id": [...], "employee_id": [...], ...}}
+
+Part names come from the id range, so re-running a batch after a crash
+overwrites the same file instead of duplicating rows.
+"""
+import enum
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tenancy import current_tenant, is_default
+from app.models.leave_archive import LeaveYearSummary
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.utils.fields import project
+
+COLUMNS = [c.name for c in LeaveRequest.__table__.columns]
+
+
+def cutoff(today: date | None = None) -> date:
+    """Requests ending before this date belong to a closed, archivable year."""
+    today = today or date.today()
+    return date(today.year - settings.ARCHIVE_KEEP_YEARS + 1, 1, 1)
+
+
+def rebuild_since(db: Session) -> date | None:
+    """First month rollups can be recomputed from leave_requests, or None before any archiving."""
+    archived = db.execute(select(LeaveYearSummary.id).limit(1)).first()
+    return cutoff() if archived else None
+
+
+# ----------------- Files -----------------
+def _root() -> Path:
+    tenant = current_tenant()
+    root = Path(settings.ARCHIVE_DIR)
+    return (root if is_default(tenant) else root / f"tenant={tenant}") / "leave_requests"
+
+
+def _year_dir(year: int) -> Path:
+    return _root() / f"year={year}"
+
+
+def _encode(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _write_part(year: int, rows: list[LeaveRequest]) -> Path:
+    columns = {name: [_encode(getattr(lr, name)) for lr in rows] for name in COLUMNS}
+    ids = columns["id"]
+    path = _year_dir(year) / f"part-{min(ids):012d}-{max(ids):012d}.json.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump({"rows": len(rows), "columns": columns}, f, separators=(",", ":"))
+    # The file must be durable before the rows are deleted
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def archived_years() -> list[int]:
+    root = _root()
+    if not root.exists():
+        return []
+    return sorted(int(p.name.split("=", 1)[1]) for p in root.glob("year=*"))
+
+
+def iter_records(year: int, employee_id: int | None = None) -> Iterator[dict]:
+    """Archived rows of one year, one part file in memory at a time."""
+    seen: set[int] = set()
+    for path in sorted(_year_dir(year).glob("part-*.json.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            columns = json.load(f)["columns"]
+        ids = columns["id"]
+        # Columnar layout: filter on one column before building any rows
+        if employee_id is None:
+            positions = range(len(ids))
+        else:
+            positions = [i for i, e in enumerate(columns["employee_id"]) if e == employee_id]
+        for i in positions:
+            if ids[i] in seen:
+                continue
+            seen.add(ids[i])
+            yield {name: values[i] for name, values in columns.items()}
+
+
+# ----------------- Summaries -----------------
+def _summaries(rows: list[LeaveRequest]) -> list[dict]:
+    totals: dict[tuple, dict] = {}
+    for lr in rows:
+        key = (lr.employee_id, lr.start_date.year, lr.leave_type_id)
+        agg = totals.setdefault(key, {
+            "employee_id": key[0], "year": key[1], "leave_type_id": key[2],
+            "approved_days": 0, "approved_requests": 0, "rejected_requests": 0,
+        })
+        if lr.status == LeaveStatus.APPROVED:
+            agg["approved_days"] += lr.days
+            agg["approved_requests"] += 1
+        else:
+            agg["rejected_requests"] += 1
+    return list(totals.values())
+
+
+def _upsert_summaries(db: Session, rows: list[dict]) -> None:
+    dialect = db.get_bind().dialect.name
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect)
+    table = LeaveYearSummary.__table__
+    counters = ("approved_days", "approved_requests", "rejected_requests")
+    for row in rows:
+        if insert is None:
+            current = db.execute(
+                select(LeaveYearSummary).filter_by(
+                    employee_id=row["employee_id"], year=row["year"], leave_type_id=row["leave_type_id"]
+                ).with_for_update()
+            ).scalar_one_or_none()
+            if current is None:
+                db.add(LeaveYearSummary(**row))
+            else:
+                for name in counters:
+                    setattr(current, name, getattr(current, name) + row[name])
+            continue
+        stmt = insert(table).values(**row)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["employee_id", "year", "leave_type_id"],
+            set_={**{name: table.c[name] + stmt.excluded[name] for name in counters}, "archived_at": func.now()},
+        ))
+
+
+# ----------------- Archiving -----------------
+def archive_closed_years(db: Session, batch_size: int | None = None, today: date | None = None) -> dict[int, int]:
+    """
+    Move finished requests of closed years out of leave_requests in batches.
+    Each batch is written to disk first, then summarised and deleted in one
+    transaction. Returns archived row counts per year.
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    before = cutoff(today)
+    archived: dict[int, int] = defaultdict(int)
+    while True:
+        rows = db.execute(
+            select(LeaveRequest)
+            .where(LeaveRequest.end_date < before, LeaveRequest.status != LeaveStatus.PENDING)
+            .order_by(LeaveRequest.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not rows:
+            break
+        by_year: dict[int, list[LeaveRequest]] = defaultdict(list)
+        for lr in rows:
+            by_year[lr.start_date.year].append(lr)
+        for year, chunk in by_year.items():
+            _write_part(year, chunk)
+            archived[year] += len(chunk)
+        _upsert_summaries(db, _summaries(rows))
+        db.execute(
+            delete(LeaveRequest).where(LeaveRequest.id.in_([lr.id for lr in rows])),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        db.expunge_all()
+    return dict(archived)
+
+
+def year_summaries(db: Session, year: int, employee_id: int | None = None, fields: list[str] | None = None):
+    columns = project(LeaveYearSummary, fields) if fields else [LeaveYearSummary]
+    query = select(*columns).where(LeaveYearSummary.year == year).order_by(
+        LeaveYearSummary.employee_id, LeaveYearSummary.leave_type_id
+    )
+    if employee_id is not None:
+        query = query.where(LeaveYearSummary.employee_id == employee_id)
+    if fields:
+        return [dict(row) for row in db.execute(query).mappings()]
+    return db.execute(query).scalars().all()
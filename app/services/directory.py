@@ -0,0 +1,80 @@
+# app/services/directory.py
+"""
+Employee directory: filters, name/email search and keyset pagination over
+(name, id), which the (domain|job_type, name, id) indexes serve directly.
+
+Search modes:
+  prefix - lower(name) / lower(email) starting with q. Postgres uses the
+           text_pattern_ops expression indexes; SQLite a range on the same
+           expression indexes.
+  fuzzy  - trigram similarity (pg_trgm `%` operator, GIN indexes) when the
+           extension is installed, otherwise a substring match.
+"""
+from sqlalchemy import func, or_, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.employee import Employee
+from app.utils.fields import decode_cursor, encode_cursor, project
+
+DIRECTORY_FIELDS = ["id", "name", "email", "phone_number", "job_type", "address", "domain", "joining_date", "annual_allocation", "manager_id"]
+PUBLIC_FIELDS = ["id", "name", "email", "job_type", "domain"]
+
+_trgm_available: dict[str, bool] = {}
+
+
+def has_trgm(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.url)
+    if key not in _trgm_available:
+        _trgm_available[key] = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+    return _trgm_available[key]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _prefix_match(column, prefix: str, dialect: str):
+    expr = func.lower(column)
+    if dialect == "postgresql":
+        return expr.like(_escape_like(prefix) + "%", escape="\\")
+    # Binary collation: the prefix range is exact and index-friendly
+    return (expr >= prefix) & (expr < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+def _search(db: Session, q: str, match: str):
+    q = q.strip().lower()
+    if match == "fuzzy":
+        if has_trgm(db):
+            return or_(Employee.name.op("%")(q), Employee.email.op("%")(q))
+        pattern = f"%{_escape_like(q)}%"
+        return or_(func.lower(Employee.name).like(pattern, escape="\\"), func.lower(Employee.email).like(pattern, escape="\\"))
+    dialect = db.get_bind().dialect.name
+    return or_(_prefix_match(Employee.name, q, dialect), _prefix_match(Employee.email, q, dialect))
+
+
+def list_employees(db: Session, fields: list[str], domain: str = None, job_type: str = None, q: str = None,
+                   match: str = "prefix", cursor: str = None, limit: int = 50) -> dict:
+    columns = project(Employee, fields)
+    if "name" not in fields:
+        columns.append(Employee.name)  # needed for the cursor, dropped from the output
+    query = select(*columns).order_by(Employee.name, Employee.id).limit(limit + 1)
+    if domain:
+        query = query.where(Employee.domain == domain)
+    if job_type:
+        query = query.where(Employee.job_type == job_type)
+    if q and q.strip():
+        query = query.where(_search(db, q, match))
+    if cursor:
+        last_name, last_id = decode_cursor(cursor, (str, int))
+        query = query.where(tuple_(Employee.name, Employee.id) > tuple_(last_name, last_id))
+
+    rows = db.execute(query).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor([page[-1].name, page[-1].id]) if len(rows) > limit else None
+    return {
+        "items": [{name: getattr(row, name) for name in fields} for row in page],
+        "next_cursor": next_cursor,
+    }
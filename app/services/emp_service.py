@@ -8,6 +8,7 @@ from datetime import date, timedelta
 from sqlalchemy.orm import Session
 from app.models.leave_request import LeaveRequest, LeaveStatus
 from app.core.config import settings
+from app.core.partitions import latest_start_date
 from fastapi import HTTPException
 
 from app.services.holidays import fetch_holidays
@@ -43,6 +44,8 @@ class LeaveService:
             raise HTTPException(status_code=400, detail="Leave dates cannot be in the past")
         if end_date < start_date:
             raise HTTPException(status_code=400, detail="End date cannot be before start date")
+        if start_date > latest_start_date():
+            raise HTTPException(status_code=400, detail=f"Start date cannot be after {latest_start_date()}")
 
         # Check public holidays
         holidays = fetch_holidays(country=settings.COUNTRY, year=start_date.year)
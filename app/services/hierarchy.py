@@ -0,0 +1,112 @@
+# app/services/hierarchy.py
+"""
+Reporting hierarchy. Employee.manager_id is the source of truth and
+employee_hierarchy is its closure table, kept in step in the same
+transaction, so each question is one indexed query:
+
+    who may approve X      ancestors of X            (descendant_id, depth) index
+    may A approve X        row (A, X) with depth > 0  primary key
+    everyone under Y       descendants of Y          primary key prefix
+
+A reorg moves a whole subtree by rewriting only the rows that cross its
+boundary; rows inside the subtree keep their depths.
+"""
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, exists, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.employee import Employee
+from app.models.employee_hierarchy import EmployeeHierarchy as H
+
+
+def _self_rows(employee_ids=None):
+    """Depth-0 rows for employees that have none, e.g. rows created before the closure table."""
+    missing = select(Employee.id, Employee.id, literal(0)).where(
+        ~exists().where(H.ancestor_id == Employee.id, H.descendant_id == Employee.id)
+    )
+    if employee_ids is not None:
+        missing = missing.where(Employee.id.in_(employee_ids))
+    return insert(H).from_select(["ancestor_id", "descendant_id", "depth"], missing)
+
+
+def backfill(conn) -> int:
+    """Give every employee without closure rows their own tree; safe to repeat."""
+    return conn.execute(_self_rows()).rowcount
+
+
+def add_employee(db: Session, employee_id: int, manager_id: int | None) -> None:
+    """Closure rows for a new employee (no reports yet); runs in the caller's transaction."""
+    db.execute(insert(H).values(ancestor_id=employee_id, descendant_id=employee_id, depth=0))
+    if manager_id is not None:
+        db.execute(insert(H).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(H.ancestor_id, literal(employee_id), H.depth + 1).where(H.descendant_id == manager_id),
+        ))
+
+
+def can_approve(db: Session, approver_id: int, employee_id: int) -> bool:
+    """Anyone above the employee in the reporting chain may approve; nobody approves their own leave."""
+    return db.execute(
+        select(exists().where(H.ancestor_id == approver_id, H.descendant_id == employee_id, H.depth > 0))
+    ).scalar()
+
+
+def approvers(db: Session, employee_id: int) -> list[Employee]:
+    """Managers above the employee, direct manager first."""
+    return db.execute(
+        select(Employee)
+        .join(H, H.ancestor_id == Employee.id)
+        .where(H.descendant_id == employee_id, H.depth > 0)
+        .order_by(H.depth)
+    ).scalars().all()
+
+
+def reports_of(manager_id: int, direct_only: bool = False):
+    """Subquery of employee ids under the manager, for IN (...) filters."""
+    query = select(H.descendant_id).where(H.ancestor_id == manager_id)
+    return query.where(H.depth == 1) if direct_only else query.where(H.depth > 0)
+
+
+def reports(db: Session, manager_id: int, direct_only: bool = False) -> list[Employee]:
+    return db.execute(
+        select(Employee).where(Employee.id.in_(reports_of(manager_id, direct_only))).order_by(Employee.name, Employee.id)
+    ).scalars().all()
+
+
+def move(db: Session, employee_id: int, manager_id: int | None) -> Employee:
+    """
+    Put the employee (and everyone under them) under a new manager, or at
+    the top when manager_id is None. Runs in the caller's transaction.
+    """
+    # Lock both rows in id order so concurrent reorgs touching them serialise
+    ids = sorted({employee_id, manager_id} - {None})
+    rows = {e.id: e for e in db.execute(select(Employee).where(Employee.id.in_(ids)).order_by(Employee.id).with_for_update()).scalars()}
+    emp = rows.get(employee_id)
+    if emp is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if manager_id is not None and manager_id not in rows:
+        raise HTTPException(status_code=404, detail="Manager not found")
+    db.execute(_self_rows(ids))
+    if manager_id is not None and db.execute(
+        select(exists().where(H.ancestor_id == employee_id, H.descendant_id == manager_id))
+    ).scalar():
+        raise HTTPException(status_code=400, detail="An employee cannot report to themselves or to someone under them")
+    if emp.manager_id == manager_id:
+        return emp
+
+    subtree = select(H.descendant_id).where(H.ancestor_id == employee_id)
+    above = select(H.ancestor_id).where(H.descendant_id == employee_id, H.depth > 0)
+    # Links from the old chain into the subtree
+    db.execute(
+        delete(H).where(H.descendant_id.in_(subtree), H.ancestor_id.in_(above)),
+        execution_options={"synchronize_session": False},
+    )
+    if manager_id is not None:
+        sup, sub = aliased(H), aliased(H)
+        db.execute(insert(H).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1)
+            .join(sub, and_(sup.descendant_id == manager_id, sub.ancestor_id == employee_id)),
+        ))
+    emp.manager_id = manager_id
+    return emp
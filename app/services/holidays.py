@@ -1,8 +1,14 @@
 # app/Webhandler/holidays.py
+from collections import OrderedDict
 from datetime import date, datetime, timedelta
-import requests
 import os
+import threading
 from dotenv import load_dotenv
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.http import CircuitBreaker, HttpClient, SingleFlight
+from app.services.reference import reference
+from app.utils.dates import WorkingDayCalendar, working_days
 
 # Load .env file
 load_dotenv()
@@ -10,17 +16,29 @@ load_dotenv()
 API_KEY = os.getenv("API_KEY")  # your Calendarific API key
 COUNTRY = os.getenv("COUNTRY", "IN")  # default country
 
+# One pooled keep-alive client for the provider, shared by every request
+holiday_client = HttpClient(
+    timeout=(settings.HOLIDAY_API_CONNECT_TIMEOUT, settings.HOLIDAY_API_READ_TIMEOUT),
+    retries=settings.HOLIDAY_API_RETRIES,
+    pool_size=settings.HOLIDAY_API_POOL_SIZE,
+    breaker=CircuitBreaker(settings.HOLIDAY_API_BREAKER_FAILURES, settings.HOLIDAY_API_BREAKER_RESET_SECONDS),
+)
+# Concurrent cold-cache lookups for the same (country, year) share one call
+_in_flight = SingleFlight()
+
+def _request_holidays(country: str, year: int) -> set[date]:
+    data = holiday_client.get_json(
+        settings.HOLIDAY_API_URL,
+        params={"api_key": API_KEY, "country": country, "year": year},
+    )
+    # Extract holiday dates as a set of date objects
+    return {datetime.fromisoformat(h['date']['iso']).date() for h in data['response']['holidays']}
+
 # Function to fetch holidays from Calendarific API
 def fetch_holidays(country: str = COUNTRY, year: int = None) -> set[date]:
     if year is None:
         year = date.today().year
-    url = f"https://calendarific.com/api/v2/holidays?api_key={API_KEY}&country={country}&year={year}"
-    resp = requests.get(url)
-    resp.raise_for_status()  # Raise exception if API fails
-    data = resp.json()
-    # Extract holiday dates as a set of date objects
-    holidays = {datetime.fromisoformat(h['date']['iso']).date() for h in data['response']['holidays']}
-    return holidays
+    return _in_flight.do((country, year), lambda: _request_holidays(country, year))
 
 # Function to calculate working days excluding holidays and weekends
 def workdays(start: date, end: date, holidays: set[date]) -> int:
@@ -31,3 +49,53 @@ def workdays(start: date, end: date, holidays: set[date]) -> int:
             days += 1
         current += timedelta(days=1)
     return days
+
+# Provider holiday dates for (country, year), cached across workers
+def provider_holidays(country: str, year: int) -> tuple[date, ...]:
+    dates = cache.get_or_set(
+        "holidays",
+        f"{country}:{year}",
+        lambda: sorted(d.isoformat() for d in fetch_holidays(country=country, year=year)),
+        ttl=settings.HOLIDAY_CACHE_TTL,
+    )
+    return tuple(date.fromisoformat(d) for d in dates)
+
+# Non-working days for (country, year): the provider's public holidays plus
+# the tenant's company holidays from the reference snapshot
+def holiday_dates(country: str, year: int) -> tuple[date, ...]:
+    company = reference.current().company_holidays_in(year)
+    provider = provider_holidays(country, year)
+    return tuple(sorted(set(provider).union(company))) if company else provider
+
+# Built calendars, keyed by their holiday list so a refreshed or invalidated
+# holiday cache entry yields a new calendar
+_calendars: "OrderedDict[tuple, WorkingDayCalendar]" = OrderedDict()
+_calendars_lock = threading.Lock()
+MAX_CALENDARS = 128
+
+def working_day_calendar(country: str, year: int) -> WorkingDayCalendar:
+    holidays = holiday_dates(country, year)
+    key = (country, year, holidays)
+    with _calendars_lock:
+        calendar = _calendars.get(key)
+        if calendar is not None:
+            _calendars.move_to_end(key)
+            return calendar
+    calendar = WorkingDayCalendar(year, holidays)
+    with _calendars_lock:
+        _calendars[key] = calendar
+        while len(_calendars) > MAX_CALENDARS:
+            _calendars.popitem(last=False)
+    return calendar
+
+# Working days for many (country, start, end) ranges. One cache read per
+# distinct (country, year); after that each range is two list lookups per
+# year it touches (about a microsecond).
+def batch_working_days(ranges: list[tuple[str, date, date]]) -> list[int]:
+    calendars: dict[str, dict[int, WorkingDayCalendar]] = {}
+    for country, start, end in ranges:
+        by_year = calendars.setdefault(country, {})
+        for year in range(start.year, end.year + 1):
+            if year not in by_year:
+                by_year[year] = working_day_calendar(country, year)
+    return [working_days(calendars[country], start, end) for country, start, end in ranges]
@@ -0,0 +1,128 @@
+# app/services/idempotency.py
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.idempotency import IdempotencyRecord
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _hash(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True).encode()).hexdigest()
+
+
+def _replay(record: IdempotencyRecord) -> JSONResponse:
+    return JSONResponse(
+        status_code=record.status_code,
+        content=record.response_body,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+# db.info key for the claimed record while its handler runs
+_PENDING = "idempotency_record"
+
+
+def run(db: Session, key: str, scope: str, payload: Any, handler: Callable[[], Any], status_code: int = 200):
+    """
+    Runs `handler` once per (scope, key). A retry with the same key gets the
+    stored response from a single indexed lookup; the same key with a
+    different payload is rejected. Failed attempts are forgotten so the
+    client can retry them. Handlers call `remember` before their commit so
+    the response is stored in the same transaction as the change.
+    """
+    request_hash = _hash(payload)
+    now = _utcnow()
+
+    record = db.execute(
+        select(IdempotencyRecord).where(IdempotencyRecord.scope == scope, IdempotencyRecord.key == key)
+    ).scalar_one_or_none()
+    if record is not None and _as_utc(record.expires_at) <= now:
+        db.delete(record)
+        db.commit()
+        record = None
+
+    if record is not None:
+        if record.request_hash != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+        if record.status_code is not None:
+            return _replay(record)
+        stale = _as_utc(record.created_at or now) + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+        if stale > now:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        # The first attempt died mid-flight; take it over
+        db.delete(record)
+        db.commit()
+
+    # Claim the key before doing any work; the unique constraint settles races
+    record = IdempotencyRecord(
+        scope=scope,
+        key=key,
+        request_hash=request_hash,
+        created_at=now,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+    )
+    db.add(record)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+
+    db.info[_PENDING] = (record, status_code)
+    try:
+        result = handler()
+    except Exception:
+        db.rollback()
+        # A handler that failed after committing keeps its stored response
+        db.execute(delete(IdempotencyRecord).where(
+            IdempotencyRecord.id == record.id, IdempotencyRecord.status_code.is_(None)
+        ))
+        db.commit()
+        raise
+    finally:
+        db.info.pop(_PENDING, None)
+
+    if record.status_code is None:
+        # The handler made no commit of its own to ride on
+        remember(db, result, record, status_code)
+        db.commit()
+    return JSONResponse(status_code=record.status_code, content=record.response_body)
+
+
+def remember(db: Session, result: Any, record: IdempotencyRecord = None, status_code: int = None) -> None:
+    """Store `result` as the response for the key `run` claimed on this session; a no-op outside `run`."""
+    if record is None:
+        if _PENDING not in db.info:
+            return
+        record, status_code = db.info[_PENDING]
+    record.status_code = status_code
+    record.response_body = jsonable_encoder(result)
+
+
+def purge_expired(db: Session, batch_size: int = 1000) -> int:
+    """Deletes expired keys in batches to keep the table bounded."""
+    total = 0
+    while True:
+        ids = select(IdempotencyRecord.id).where(IdempotencyRecord.expires_at < _utcnow()).limit(batch_size)
+        deleted = db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.id.in_(ids))).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,105 @@
+# app/services/index_check.py
+"""
+Checks that the hot-path queries in LeaveService are planned against the
+indexes built for them. Run after migrations or planner upgrades:
+
+    python -m app.services.index_check
+
+Exits non-zero when any query misses its index.
+"""
+import json
+import re
+import sys
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal, is_postgres
+from app.services.leave_service import LeaveService
+
+
+def hot_path_queries():
+    """query name -> (statement, indexes that satisfy it)"""
+    today = date.today()
+    return {
+        "overlap": (LeaveService._overlap_stmt(1, today, today), {"ix_leave_requests_overlap"}),
+        "used_days": (LeaveService._used_days_stmt(1), {"ix_leave_requests_approved_days"}),
+        "range_overlap": (
+            LeaveService._range_overlap_stmt(today, today),
+            {"ix_leave_requests_dates", "ix_leave_requests_overlap"},
+        ),
+        # count() over() reads every pending row, so either pending-only index is a good plan
+        "pending_queue": (
+            LeaveService._pending_queue_stmt(),
+            {"ix_leave_requests_pending_queue", "ix_leave_requests_pending_days"},
+        ),
+    }
+
+
+@contextmanager
+def _explained(conn, prefix: str):
+    """
+    Prefix EXPLAIN onto statements at the cursor, so the plan is for exactly
+    the SQL and bound parameters the app sends, not a literal rendering.
+    """
+    plans = []
+
+    def rewrite(conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        plans.extend(cursor.fetchall())
+
+    event.listen(conn, "before_cursor_execute", rewrite, retval=True)
+    event.listen(conn, "after_cursor_execute", capture)
+    try:
+        yield plans
+    finally:
+        event.remove(conn, "before_cursor_execute", rewrite)
+        event.remove(conn, "after_cursor_execute", capture)
+
+
+def _pg_indexes(plan: dict) -> set[str]:
+    found = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= _pg_indexes(child)
+    return found
+
+
+def _plan_indexes(db: Session, stmt) -> set[str]:
+    conn = db.connection()
+    if is_postgres(conn):
+        # Tiny dev tables always seq-scan; this asks whether the index is usable at all
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        with _explained(conn, "EXPLAIN (FORMAT JSON) ") as rows:
+            conn.execute(stmt)
+        plan = rows[0][0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _pg_indexes(plan[0]["Plan"])
+    with _explained(conn, "EXPLAIN QUERY PLAN ") as rows:
+        conn.execute(stmt)
+    return {m.group(1) for row in rows for m in re.finditer(r"USING (?:COVERING )?INDEX (\w+)", row[-1])}
+
+
+def verify_index_usage(db: Session) -> list[dict]:
+    results = []
+    for name, (stmt, expected) in hot_path_queries().items():
+        used = _plan_indexes(db, stmt)
+        results.append({"query": name, "ok": bool(used & expected), "expected": sorted(expected), "used": sorted(used)})
+    db.rollback()
+    return results
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        results = verify_index_usage(db)
+    finally:
+        db.close()
+    for r in results:
+        mark = "✅" if r["ok"] else "❌"
+        print(f"{mark} {r['query']}: expected one of {r['expected']}, plan used {r['used'] or 'no index'}")
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
@@ -0,0 +1,122 @@
+# app/services/jobs.py
+import functools
+from datetime import date
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.db import SessionLocal, tenant_begin
+from app.core.etag import bump
+from app.core.mail import retry_failed_emails
+from app.core.partitions import ensure_future_partitions
+from app.core.scheduler import Scheduler
+from app.core.tenancy import known_tenants, tenant_scope
+from app.models.employee import Employee
+from app.services import archive, idempotency, password_tokens, rollups
+from app.services.outbox import relay
+from app.services.holidays import fetch_holidays
+from app.services.leave_service import LeaveService
+
+
+def refresh_holidays():
+    """Re-fetch this year's and next year's calendars so requests never hit the provider cold."""
+    year = date.today().year
+    for y in (year, year + 1):
+        dates = sorted(d.isoformat() for d in fetch_holidays(country=settings.COUNTRY, year=y))
+        cache.set("holidays", f"{settings.COUNTRY}:{y}", dates, ttl=settings.HOLIDAY_CACHE_TTL)
+
+
+def _bump_all_balances(db) -> None:
+    for (employee_id,) in db.query(Employee.id).yield_per(1000):
+        bump(f"balance:{employee_id}")
+
+
+def reconcile_balances():
+    """Rebuild utilization rollups from leave_requests and drop every cached balance."""
+    db = SessionLocal()
+    try:
+        rollups.rebuild(db, LeaveService._holidays, since=archive.rebuild_since(db))
+        _bump_all_balances(db)
+    finally:
+        db.close()
+
+
+def new_year_maintenance():
+    """
+    Runs just after New Year: adds the next leave_requests partition, warms
+    the new year's holiday calendar and invalidates cached balances and ETags
+    so nobody sees last year's figures. Balances are allocation minus every
+    approved day on record, so there are no yearly allocations to reset or
+    carry forward here.
+    """
+    with tenant_begin() as conn:
+        ensure_future_partitions(conn)
+    refresh_holidays()
+    db = SessionLocal()
+    try:
+        _bump_all_balances(db)
+    finally:
+        db.close()
+
+
+def purge_password_tokens():
+    db = SessionLocal()
+    try:
+        password_tokens.purge_expired(db)
+    finally:
+        db.close()
+
+
+def archive_closed_years():
+    db = SessionLocal()
+    try:
+        archived = archive.archive_closed_years(db)
+        if archived:
+            print("📦 Archived leave requests:", archived)
+    finally:
+        db.close()
+
+
+def relay_outbox():
+    relay.run_once()
+
+
+def purge_outbox():
+    relay.purge_delivered(settings.OUTBOX_RETENTION_DAYS)
+
+
+def purge_idempotency_keys():
+    db = SessionLocal()
+    try:
+        idempotency.purge_expired(db)
+    finally:
+        db.close()
+
+
+def for_each_tenant(job):
+    """Run a job once per tenant, in that tenant's context. One tenant failing doesn't skip the rest."""
+    @functools.wraps(job)
+    def run():
+        failed = []
+        for tenant in known_tenants():
+            with tenant_scope(tenant):
+                try:
+                    job()
+                except Exception as e:
+                    print(f"⚠️ Job {job.__name__} failed for tenant {tenant}:", e)
+                    failed.append(tenant)
+        if failed:
+            raise RuntimeError(f"failed for tenants: {', '.join(failed)}")
+    return run
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    # Holiday calendars are shared by every tenant
+    scheduler.add_job("holiday-refresh", refresh_holidays, cron="15 3 * * *", jitter=60, timeout=120)
+    scheduler.add_job("balance-reconciliation", for_each_tenant(reconcile_balances), cron="30 2 * * *", jitter=60, timeout=1800)
+    scheduler.add_job("email-retry", retry_failed_emails, every=300, jitter=30, timeout=120, leader=False)
+    scheduler.add_job("outbox-relay", for_each_tenant(relay_outbox), every=settings.OUTBOX_RELAY_INTERVAL, timeout=60)
+    scheduler.add_job("outbox-purge", for_each_tenant(purge_outbox), cron="45 3 * * *", jitter=60, timeout=600)
+    scheduler.add_job("idempotency-purge", for_each_tenant(purge_idempotency_keys), every=3600, jitter=120, timeout=600)
+    scheduler.add_job("password-token-purge", for_each_tenant(purge_password_tokens), every=3600, jitter=120, timeout=600)
+    scheduler.add_job("leave-archive", for_each_tenant(archive_closed_years), cron="30 4 * * 0", jitter=300, timeout=3600)
+    scheduler.add_job("new-year-maintenance", for_each_tenant(new_year_maintenance), cron="5 0 1 1 *", timeout=600)
@@ -1,20 +1,121 @@
+from bisect import bisect_right
 from datetime import date, timedelta
 from fastapi import HTTPException
+from datetime import datetime, timezone
+from sqlalchemy import case, func, insert, literal, select, union_all
 from sqlalchemy.orm import Session
 from typing import List, Dict
 
+from app.core.cache import cache
+from app.core.etag import bump, etag_for
 from app.core.config import Settings, settings
+from app.core.db import SessionLocal, is_replica
+from app.core.partitions import latest_start_date, pruning_bounds
+from app.core.push import push
+from app.core.tracing import traced_methods
 from app.models.employee import Employee
-from app.models.leave_request import LeaveRequest, LeaveStatus
-from app.schemas.leave import LeaveApply, LeaveAction, LeaveOut, LeaveBalanceOut
-from app.services.holidays import fetch_holidays, workdays
+from app.models.leave_archive import LeaveYearSummary
+from app.models.leave_request import MAX_LEAVE_SPAN_DAYS, LeaveRequest, LeaveStatus
+from app.schemas.leave import (
+    LeaveApply, LeaveAction, LeaveOut, LeaveBalanceOut, PendingApprovalOut, PendingApprovalPage,
+    MassLeaveApply, MassLeaveReport, MassLeaveResult, LeaveForecastRequest, LeaveForecastItem, LeaveForecastOut,
+)
+from app.services import hierarchy, idempotency, outbox, rollups
+from app.services.holidays import holiday_dates, working_day_calendar, workdays
+from app.services.reference import reference
+from app.utils.dates import working_days
 
 
+# Approval-queue columns that need the balance join / the employees join
+BALANCE_FIELDS = {"used", "pending", "remaining"}
+EMPLOYEE_FIELDS = {"employee_name", "domain", "allocation", "remaining"}
+
+
+@traced_methods("_holidays", "_used_days", "_used_days_now", "_track")
 class LeaveService:
     @staticmethod
     def _calc_days(start, end) -> int:
         return (end - start).days + 1
 
+    # ----------------- Hot-path statements -----------------
+    # Built in one place so app.services.index_check can EXPLAIN exactly what we run
+
+    @staticmethod
+    def _overlap_stmt(employee_id: int, start: date, end: date):
+        lower, upper = pruning_bounds(start, end, MAX_LEAVE_SPAN_DAYS)
+        return select(LeaveRequest.id).where(
+            LeaveRequest.employee_id == employee_id,
+            LeaveRequest.status != LeaveStatus.REJECTED,
+            LeaveRequest.start_date.between(lower, upper),
+            LeaveRequest.end_date >= start,
+        ).limit(1)
+
+    @staticmethod
+    def _used_days_stmt(employee_id: int):
+        # Closed years live on as summaries once archived
+        archived = select(func.coalesce(func.sum(LeaveYearSummary.approved_days), 0)).where(
+            LeaveYearSummary.employee_id == employee_id,
+        ).scalar_subquery()
+        return select(func.coalesce(func.sum(LeaveRequest.days), 0) + archived).where(
+            LeaveRequest.employee_id == employee_id,
+            LeaveRequest.status == LeaveStatus.APPROVED,
+        )
+
+    @staticmethod
+    def _range_overlap_stmt(start: date, end: date):
+        """Employees with a live request touching [start, end]."""
+        lower, upper = pruning_bounds(start, end, MAX_LEAVE_SPAN_DAYS)
+        return select(LeaveRequest.employee_id).where(
+            LeaveRequest.status != LeaveStatus.REJECTED,
+            LeaveRequest.start_date.between(lower, upper),
+            LeaveRequest.end_date >= start,
+        )
+
+    # ----------------- Cached lookups -----------------
+    @staticmethod
+    def _holidays(year: int) -> set[date]:
+        return set(holiday_dates(settings.COUNTRY, year))
+
+    @staticmethod
+    def _used_days(employee_id: int, db: Session) -> int:
+        """Approved days for display. The cache is only filled from the primary, never a lagging replica."""
+        def load():
+            if not is_replica(db):
+                return db.execute(LeaveService._used_days_stmt(employee_id)).scalar()
+            primary = SessionLocal()
+            try:
+                return primary.execute(LeaveService._used_days_stmt(employee_id)).scalar()
+            finally:
+                primary.close()
+
+        return cache.get_or_set(f"balance:{employee_id}", "used", load, ttl=settings.BALANCE_CACHE_TTL)
+
+    @staticmethod
+    def _used_days_now(employee_id: int, db: Session) -> int:
+        # Balance checks before a write read the primary directly, not the cache
+        return db.execute(LeaveService._used_days_stmt(employee_id)).scalar()
+
+    @staticmethod
+    def _track(db: Session, lr: LeaveRequest, sign: int, domain: str = None, status=None) -> None:
+        """Keep utilization rollups in step with the request, inside the same transaction."""
+        if domain is None:
+            domain = db.get(Employee, lr.employee_id).domain
+        rollups.record(db, domain, lr, sign, LeaveService._holidays, status=status)
+
+    @staticmethod
+    def _change(event) -> dict:
+        # Taken before commit, which expires the outbox row
+        return {"event": event.event_type, **event.payload}
+
+    @staticmethod
+    def _balance_changed(employee_id: int, change: dict = None) -> None:
+        # Drops cached totals and moves the ETag served by GET /leaves/balance
+        bump(f"balance:{employee_id}")
+        # Then tells the employee's open /leaves/events streams
+        if change is not None:
+            push.publish(employee_id, "leave", change)
+        push.publish(employee_id, "balance", {"employee_id": employee_id, "etag": etag_for(f"balance:{employee_id}")})
+
     @staticmethod
     def apply_leave(payload: LeaveApply, db: Session) -> LeaveOut:
         errors: List[Dict[str, str]] = []
@@ -38,25 +139,22 @@ class LeaveService:
         if payload.end_date < payload.start_date:
             errors.append({"date_range": "End date cannot be before start date"})
 
-        overlap_exists = db.query(LeaveRequest).filter(
-            LeaveRequest.employee_id == emp.id,
-            LeaveRequest.status != LeaveStatus.REJECTED,
-            LeaveRequest.start_date <= payload.end_date,
-            LeaveRequest.end_date >= payload.start_date,
+        if payload.start_date > latest_start_date():
+            errors.append({"start_date": f"Start date cannot be after {latest_start_date()}"})
+
+        if reference.current().leave_type(payload.leave_type_id) is None:
+            errors.append({"leave_type_id": "Unknown leave type"})
+
+        overlap_exists = db.execute(
+            LeaveService._overlap_stmt(emp.id, payload.start_date, payload.end_date)
         ).first()
         if overlap_exists:
             errors.append({"overlap": "Overlapping leave request exists"})
 
-        holidays = fetch_holidays(country=settings.COUNTRY, year=payload.start_date.year)
+        holidays = LeaveService._holidays(payload.start_date.year)
         days = workdays(payload.start_date, payload.end_date, holidays)
 
-        approved_days = sum(
-            workdays(l.start_date, l.end_date, fetch_holidays(settings.COUNTRY, l.start_date.year))
-            for l in db.query(LeaveRequest).filter(
-                LeaveRequest.employee_id == emp.id,
-                LeaveRequest.status == LeaveStatus.APPROVED
-            ).all()
-        )
+        approved_days = LeaveService._used_days_now(emp.id, db)
 
         remaining = emp.annual_allocation - approved_days
         if days > remaining:
@@ -70,16 +168,19 @@ class LeaveService:
             start_date=payload.start_date,
             end_date=payload.end_date,
             days=days,
+            month_days=rollups.month_days(payload.start_date, payload.end_date, holidays),
             reason=payload.reason or None,
             status=LeaveStatus.PENDING,
             leave_type_id=payload.leave_type_id, 
         )
         db.add(lr)
-        db.commit()
+        LeaveService._track(db, lr, 1, domain=emp.domain)
+        change = LeaveService._change(outbox.emit(db, "leave.applied", lr))
+        db.flush()
         db.refresh(lr)
 
         # Return as LeaveOut Pydantic model
-        return LeaveOut(
+        out = LeaveOut(
             id=lr.id,
             employee_id=lr.employee_id,
             start_date=lr.start_date,
@@ -91,13 +192,22 @@ class LeaveService:
             approved_at=getattr(lr, 'approved_at', None),
             approver_note=getattr(lr, 'approver_note', None),
         )
+        # A retry with the same Idempotency-Key sees this only if the leave was committed
+        idempotency.remember(db, out)
+        db.commit()
+        LeaveService._balance_changed(lr.employee_id, change)
+        return out
 
     @staticmethod
-    def act_on_leave(leave_id: int, payload: LeaveAction, db: Session) -> LeaveOut:
+    def act_on_leave(leave_id: int, payload: LeaveAction, db: Session, approver_id: int = None) -> LeaveOut:
+        """approver_id None means an admin acting; otherwise they must be above the employee in the hierarchy."""
         lr = db.query(LeaveRequest).get(leave_id)
         if not lr:
             raise HTTPException(status_code=404, detail="Leave request not found")
 
+        if approver_id is not None and not hierarchy.can_approve(db, approver_id, lr.employee_id):
+            raise HTTPException(status_code=403, detail="Not authorized to act on this leave request")
+
         if lr.status != LeaveStatus.PENDING:
             raise HTTPException(status_code=400, detail="Only PENDING requests can be acted upon")
 
@@ -105,22 +215,26 @@ class LeaveService:
         if action not in {"APPROVE", "REJECT"}:
             raise HTTPException(status_code=400, detail="action must be APPROVE or REJECT")
 
+        emp = db.get(Employee, lr.employee_id)
         if action == "APPROVE":
-            emp = db.query(Employee).get(lr.employee_id)
-            approved_days = sum(l.days for l in db.query(LeaveRequest).filter(
-                LeaveRequest.employee_id == emp.id,
-                LeaveRequest.status == LeaveStatus.APPROVED
-            ).all())
+            approved_days = LeaveService._used_days_now(emp.id, db)
             remaining = emp.annual_allocation - approved_days
             if lr.days > remaining:
                 raise HTTPException(status_code=400, detail=f"Not enough balance to approve. Remaining: {remaining}")
             lr.status = LeaveStatus.APPROVED
         else:
             lr.status = LeaveStatus.REJECTED
+        LeaveService._track(db, lr, -1, domain=emp.domain, status=LeaveStatus.PENDING)
+        LeaveService._track(db, lr, 1, domain=emp.domain)
+        change = LeaveService._change(outbox.emit(
+            db, "leave.approved" if lr.status == LeaveStatus.APPROVED else "leave.rejected", lr,
+            approver_note=payload.approver_note, approver_id=approver_id,
+        ))
 
         db.add(lr)
         db.commit()
         db.refresh(lr)
+        LeaveService._balance_changed(lr.employee_id, change)
 
         # Return as LeaveOut Pydantic model with existing lr.days (workdays)
         return LeaveOut(
@@ -142,10 +256,7 @@ class LeaveService:
         if not emp:
             raise HTTPException(status_code=404, detail="Employee not found")
 
-        used = sum(l.days for l in db.query(LeaveRequest).filter(
-            LeaveRequest.employee_id == employee_id,
-            LeaveRequest.status == LeaveStatus.APPROVED
-        ).all())
+        used = LeaveService._used_days(employee_id, db)
 
         return LeaveBalanceOut(
             employee_id=employee_id,
@@ -154,6 +265,329 @@ class LeaveService:
             remaining=emp.annual_allocation - used,
         )
 
+    # ✅ Forecast a leave plan: many candidate ranges, one balance read, no writes
+    @staticmethod
+    def forecast(payload: LeaveForecastRequest, db: Session) -> LeaveForecastOut:
+        totals = LeaveService._balance_totals(employee_ids=[payload.employee_id])
+        row = db.execute(
+            select(
+                Employee.annual_allocation,
+                Employee.joining_date,
+                func.coalesce(totals.c.used, 0).label("used"),
+                func.coalesce(totals.c.pending, 0).label("pending"),
+            )
+            .outerjoin(totals, totals.c.employee_id == Employee.id)
+            .where(Employee.id == payload.employee_id)
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Employee not found")
+
+        ranges = sorted(enumerate(payload.ranges), key=lambda r: (r[1].start_date, r[0]))
+        first = ranges[0][1].start_date
+        last = max(r.end_date for _, r in ranges)
+
+        # Every live request touching the plan window, in one query
+        lower, upper = pruning_bounds(first, last, MAX_LEAVE_SPAN_DAYS)
+        existing = db.execute(
+            select(LeaveRequest.id, LeaveRequest.start_date, LeaveRequest.end_date)
+            .where(
+                LeaveRequest.employee_id == payload.employee_id,
+                LeaveRequest.status != LeaveStatus.REJECTED,
+                LeaveRequest.start_date.between(lower, upper),
+                LeaveRequest.end_date >= first,
+            )
+            .order_by(LeaveRequest.start_date)
+        ).all()
+        existing_starts = [e.start_date for e in existing]
+
+        # Only the years the ranges touch; the schema caps how many there are
+        years = {year for _, r in ranges for year in range(r.start_date.year, r.end_date.year + 1)}
+        calendars = {year: working_day_calendar(settings.COUNTRY, year) for year in sorted(years)}
+
+        # Sweep in start order: `active` holds earlier ranges that may still overlap
+        plan_overlaps: dict[int, list[int]] = {index: [] for index, _ in ranges}
+        active: list[tuple[int, date]] = []
+        for index, r in ranges:
+            active = [(i, end) for i, end in active if end >= r.start_date]
+            for i, _ in active:
+                plan_overlaps[i].append(index)
+                plan_overlaps[index].append(i)
+            active.append((index, r.end_date))
+
+        today = date.today()
+        # Pending days count against the plan: they are taken if approved. apply_leave
+        # only checks approved days, so a range can fail here and still be accepted there.
+        remaining = row.annual_allocation - row.used - row.pending
+        items = []
+        for index, r in ranges:
+            days = working_days(calendars, r.start_date, r.end_date)
+            hits = [
+                e.id for e in existing[:bisect_right(existing_starts, r.end_date)]
+                if e.end_date >= r.start_date
+            ]
+            ok = (
+                r.start_date >= today
+                and r.start_date >= row.joining_date
+                and not hits
+                and not plan_overlaps[index]
+                and days <= remaining
+            )
+            if ok:
+                remaining -= days
+            items.append(LeaveForecastItem(
+                index=index,
+                start_date=r.start_date,
+                end_date=r.end_date,
+                days=days,
+                overlaps_existing=hits,
+                overlaps_plan=sorted(plan_overlaps[index]),
+                remaining_after=remaining,
+                ok=ok,
+            ))
+
+        return LeaveForecastOut(
+            employee_id=payload.employee_id,
+            allocation=row.annual_allocation,
+            used=row.used,
+            pending=row.pending,
+            items=items,
+        )
+
+    @staticmethod
+    def _balance_totals(employee_ids=None):
+        """Approved and pending day totals per employee (archived years included), as a grouped subquery."""
+        live = select(
+            LeaveRequest.employee_id.label("employee_id"),
+            case((LeaveRequest.status == LeaveStatus.APPROVED, LeaveRequest.days), else_=0).label("used"),
+            case((LeaveRequest.status == LeaveStatus.PENDING, LeaveRequest.days), else_=0).label("pending"),
+        )
+        archived = select(
+            LeaveYearSummary.employee_id.label("employee_id"),
+            LeaveYearSummary.approved_days.label("used"),
+            literal(0).label("pending"),
+        )
+        if employee_ids is not None:
+            live = live.where(LeaveRequest.employee_id.in_(employee_ids))
+            archived = archived.where(LeaveYearSummary.employee_id.in_(employee_ids))
+        rows = union_all(live, archived).subquery("balance_rows")
+        return select(
+            rows.c.employee_id,
+            func.coalesce(func.sum(rows.c.used), 0).label("used"),
+            func.coalesce(func.sum(rows.c.pending), 0).label("pending"),
+        ).group_by(rows.c.employee_id).subquery("balance_totals")
+
+    # ✅ Approval queue: pending requests with per-row balance in one round trip
+    @staticmethod
+    def _pending_queue_stmt(domain: str = None, page: int = 1, limit: int = 20, manager_id: int = None):
+        queued = select(LeaveRequest.employee_id).where(LeaveRequest.status == LeaveStatus.PENDING)
+        totals = LeaveService._balance_totals(employee_ids=queued)
+
+        query = (
+            select(
+                LeaveRequest,
+                Employee.name,
+                Employee.domain,
+                Employee.annual_allocation,
+                totals.c.used,
+                totals.c.pending,
+                func.count().over().label("total"),
+            )
+            .join(Employee, Employee.id == LeaveRequest.employee_id)
+            .join(totals, totals.c.employee_id == LeaveRequest.employee_id)
+            .where(LeaveRequest.status == LeaveStatus.PENDING)
+            .order_by(LeaveRequest.created_at, LeaveRequest.id)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
+        if domain:
+            query = query.where(Employee.domain == domain)
+        if manager_id is not None:
+            query = query.where(LeaveRequest.employee_id.in_(hierarchy.reports_of(manager_id)))
+        return query
+
+    @staticmethod
+    def _pending_queue_projection(fields: list[str], domain: str = None, page: int = 1, limit: int = 20,
+                                  manager_id: int = None):
+        """Same queue reading only the requested columns; the balance join is skipped unless asked for."""
+        columns = {
+            "id": LeaveRequest.id,
+            "employee_id": LeaveRequest.employee_id,
+            "leave_type_id": LeaveRequest.leave_type_id,
+            "start_date": LeaveRequest.start_date,
+            "end_date": LeaveRequest.end_date,
+            "days": LeaveRequest.days,
+            "reason": LeaveRequest.reason,
+            "created_at": LeaveRequest.created_at,
+            "employee_name": Employee.name,
+            "domain": Employee.domain,
+            "allocation": Employee.annual_allocation,
+        }
+        query = select(LeaveRequest.id)
+        if BALANCE_FIELDS & set(fields):
+            queued = select(LeaveRequest.employee_id).where(LeaveRequest.status == LeaveStatus.PENDING)
+            totals = LeaveService._balance_totals(employee_ids=queued)
+            columns.update(used=totals.c.used, pending=totals.c.pending,
+                           remaining=Employee.annual_allocation - totals.c.used)
+            query = query.join(totals, totals.c.employee_id == LeaveRequest.employee_id)
+        if domain or EMPLOYEE_FIELDS & set(fields):
+            query = query.join(Employee, Employee.id == LeaveRequest.employee_id)
+        if domain:
+            query = query.where(Employee.domain == domain)
+        if manager_id is not None:
+            query = query.where(LeaveRequest.employee_id.in_(hierarchy.reports_of(manager_id)))
+        return (
+            query.with_only_columns(*[columns[name].label(name) for name in fields], func.count().over().label("total"))
+            .where(LeaveRequest.status == LeaveStatus.PENDING)
+            .order_by(LeaveRequest.created_at, LeaveRequest.id)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
+
+    @staticmethod
+    def _pending_queue_count(domain: str = None, manager_id: int = None):
+        query = select(func.count()).select_from(LeaveRequest).where(LeaveRequest.status == LeaveStatus.PENDING)
+        if domain:
+            query = query.join(Employee, Employee.id == LeaveRequest.employee_id).where(Employee.domain == domain)
+        if manager_id is not None:
+            query = query.where(LeaveRequest.employee_id.in_(hierarchy.reports_of(manager_id)))
+        return query
+
+    @staticmethod
+    def _pending_total(db: Session, rows, domain: str, page: int, manager_id: int) -> int:
+        # The window count rides on the page's rows; past the end there are none to carry it
+        if rows:
+            return rows[0].total
+        if page == 1:
+            return 0
+        return db.execute(LeaveService._pending_queue_count(domain, manager_id)).scalar()
+
+    @staticmethod
+    def pending_approvals(db: Session, domain: str = None, page: int = 1, limit: int = 20,
+                          fields: list[str] = None, manager_id: int = None) -> PendingApprovalPage:
+        """manager_id narrows the queue to requests from everyone under that manager."""
+        if fields:
+            rows = db.execute(LeaveService._pending_queue_projection(fields, domain, page, limit, manager_id)).all()
+            items = [{name: getattr(row, name) for name in fields} for row in rows]
+            total = LeaveService._pending_total(db, rows, domain, page, manager_id)
+            return PendingApprovalPage(items=items, total=total, page=page, limit=limit)
+
+        rows = db.execute(LeaveService._pending_queue_stmt(domain, page, limit, manager_id)).all()
+        items = [
+            PendingApprovalOut(
+                id=lr.id,
+                employee_id=lr.employee_id,
+                employee_name=name,
+                domain=emp_domain,
+                leave_type_id=lr.leave_type_id,
+                start_date=lr.start_date,
+                end_date=lr.end_date,
+                days=lr.days,
+                reason=lr.reason,
+                created_at=lr.created_at,
+                allocation=allocation,
+                used=used,
+                pending=pending,
+                remaining=allocation - used,
+            )
+            for lr, name, emp_domain, allocation, used, pending, _ in rows
+        ]
+        total = LeaveService._pending_total(db, rows, domain, page, manager_id)
+        return PendingApprovalPage(items=items, total=total, page=page, limit=limit)
+
+    # ✅ Mass leave (shutdowns): one calendar pass, joined checks, one batch insert
+    @staticmethod
+    def apply_mass_leave(payload: MassLeaveApply, db: Session) -> MassLeaveReport:
+        if reference.current().leave_type(payload.leave_type_id) is None:
+            raise HTTPException(status_code=400, detail="Unknown leave type")
+        if payload.start_date > latest_start_date():
+            raise HTTPException(status_code=400, detail=f"Start date cannot be after {latest_start_date()}")
+        holidays = LeaveService._holidays(payload.start_date.year)
+        days = workdays(payload.start_date, payload.end_date, holidays)
+        split = rollups.month_days(payload.start_date, payload.end_date, holidays)
+        if days <= 0:
+            raise HTTPException(status_code=400, detail="No working days in selected range")
+
+        if payload.domain is not None:
+            targets = select(Employee.id).where(Employee.domain == payload.domain)
+        else:
+            targets = sorted(set(payload.employee_ids))
+        totals = LeaveService._balance_totals(employee_ids=targets)
+        overlapping = LeaveService._range_overlap_stmt(payload.start_date, payload.end_date)
+        rows = db.execute(
+            select(
+                Employee.id,
+                Employee.domain,
+                Employee.joining_date,
+                Employee.annual_allocation,
+                func.coalesce(totals.c.used, 0),
+                Employee.id.in_(overlapping),
+            )
+            .outerjoin(totals, totals.c.employee_id == Employee.id)
+            .where(Employee.id.in_(targets))
+            .order_by(Employee.id)
+        ).all()
+
+        status = LeaveStatus.APPROVED if payload.auto_approve else LeaveStatus.PENDING
+        results: dict[int, MassLeaveResult] = {}
+        to_insert, per_domain = [], {}
+        for emp_id, domain, joining_date, allocation, used, overlaps in rows:
+            detail = None
+            if overlaps:
+                detail = "Overlapping leave request exists"
+            elif payload.start_date < joining_date:
+                detail = "Cannot apply leave before joining date"
+            elif days > allocation - used:
+                detail = f"Not enough balance. Remaining: {allocation - used}"
+            if detail:
+                results[emp_id] = MassLeaveResult(employee_id=emp_id, status="skipped", detail=detail)
+                continue
+            to_insert.append({
+                "employee_id": emp_id,
+                "start_date": payload.start_date,
+                "end_date": payload.end_date,
+                "days": days,
+                "month_days": split,
+                "reason": payload.reason,
+                "status": status,
+                "leave_type_id": payload.leave_type_id,
+                "approved_at": datetime.now(timezone.utc) if payload.auto_approve else None,
+            })
+            per_domain[domain] = per_domain.get(domain, 0) + 1
+
+        if payload.employee_ids is not None:
+            for emp_id in set(payload.employee_ids) - {row[0] for row in rows}:
+                results[emp_id] = MassLeaveResult(employee_id=emp_id, status="skipped", detail="Employee not found")
+
+        if to_insert:
+            inserted = db.execute(
+                insert(LeaveRequest).returning(LeaveRequest.id, LeaveRequest.employee_id), to_insert
+            ).all()
+            leave_ids = {emp_id: leave_id for leave_id, emp_id in inserted}
+            rollups.record_many(db, per_domain, payload.leave_type_id, split, status)
+            event_type = "leave.approved" if payload.auto_approve else "leave.applied"
+            payloads = [
+                {"leave_id": leave_ids[row["employee_id"]], "employee_id": row["employee_id"],
+                 "leave_type_id": row["leave_type_id"], "start_date": row["start_date"].isoformat(),
+                 "end_date": row["end_date"].isoformat(), "days": days, "status": status.value,
+                 "reason": row["reason"], "bulk": True}
+                for row in to_insert
+            ]
+            outbox.emit_many(db, event_type, payloads)
+            for p in payloads:
+                results[p["employee_id"]] = MassLeaveResult(employee_id=p["employee_id"], status="applied",
+                                                            leave_id=p["leave_id"])
+
+        ordered = [results[k] for k in sorted(results)]
+        applied = sum(1 for r in ordered if r.status == "applied")
+        report = MassLeaveReport(days=days, applied=applied, skipped=len(ordered) - applied, results=ordered)
+        if to_insert:
+            # Stored with the leaves, like apply_leave
+            idempotency.remember(db, report)
+            db.commit()
+            for p in payloads:
+                LeaveService._balance_changed(p["employee_id"], {"event": event_type, **p})
+        return report
+
     # ✅ Cancel leave (only PENDING)
     @staticmethod
     def cancel_leave(leave_id: int, employee_id: int, db: Session):
@@ -167,8 +601,11 @@ class LeaveService:
         if lr.status != LeaveStatus.PENDING:
             raise HTTPException(status_code=400, detail="Only PENDING leave can be cancelled")
 
+        LeaveService._track(db, lr, -1)
+        change = LeaveService._change(outbox.emit(db, "leave.cancelled", lr))
         db.delete(lr)
         db.commit()
+        LeaveService._balance_changed(employee_id, change)
         return {"message": "Leave request cancelled successfully"}
 
     # ✅ Modify leave (only PENDING)
@@ -183,17 +620,27 @@ class LeaveService:
             raise HTTPException(status_code=404, detail="Leave request not found")
         if lr.status != LeaveStatus.PENDING:
             raise HTTPException(status_code=400, detail="Only PENDING leave can be modified")
+        if end_date < start_date or (end_date - start_date).days > MAX_LEAVE_SPAN_DAYS:
+            raise HTTPException(status_code=400, detail="Invalid leave date range")
+        if start_date > latest_start_date():
+            raise HTTPException(status_code=400, detail=f"Start date cannot be after {latest_start_date()}")
 
-        holidays = fetch_holidays(country=settings.COUNTRY, year=start_date.year)
+        holidays = LeaveService._holidays(start_date.year)
         days = workdays(start_date, end_date, holidays)
 
+        LeaveService._track(db, lr, -1)
+        previous = {"previous_start_date": lr.start_date.isoformat(), "previous_end_date": lr.end_date.isoformat()}
         lr.start_date = start_date
         lr.end_date = end_date
         lr.reason = reason
         lr.days = days
+        lr.month_days = rollups.month_days(start_date, end_date, holidays)
+        LeaveService._track(db, lr, 1)
+        change = LeaveService._change(outbox.emit(db, "leave.modified", lr, **previous))
 
         db.commit()
         db.refresh(lr)
+        LeaveService._balance_changed(employee_id, change)
 
         # Return as LeaveOut Pydantic model
         return LeaveOut(
@@ -0,0 +1,267 @@
+# app/services/outbox.py
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from sqlalchemy import bindparam, delete, exists, insert, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Integer
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.db import SessionLocal, is_postgres
+from app.core.http import CircuitBreaker, CircuitOpenError, HttpClient
+from app.core.metrics import metrics
+from app.models.leave_request import LeaveRequest
+from app.models.outbox import OutboxEvent
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(dt: datetime | None) -> datetime | None:
+    # SQLite hands timezone-aware columns back naive
+    return dt.replace(tzinfo=timezone.utc) if dt is not None and dt.tzinfo is None else dt
+
+
+def retry_after_seconds(value: str | None, default: float = 5.0) -> float:
+    """Retry-After in either form it may take: delta-seconds or an HTTP-date."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = _as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (when - _utcnow()).total_seconds())
+
+
+# First key of the relay's per-employee advisory locks
+OUTBOX_LOCK_CLASS = 0x0B0C
+_LOCK_EMPLOYEES = text(
+    "SELECT e FROM unnest(:ids) AS e WHERE pg_try_advisory_xact_lock(:lock_class, e)"
+).bindparams(bindparam("ids", type_=ARRAY(Integer)))
+
+
+def leave_payload(lr: LeaveRequest) -> dict:
+    return {
+        "leave_id": lr.id,
+        "employee_id": lr.employee_id,
+        "leave_type_id": lr.leave_type_id,
+        "start_date": lr.start_date.isoformat(),
+        "end_date": lr.end_date.isoformat(),
+        "days": lr.days,
+        "status": getattr(lr.status, "value", lr.status),
+        "reason": lr.reason,
+    }
+
+
+def emit(db: Session, event_type: str, lr: LeaveRequest, **extra) -> OutboxEvent:
+    """Queue an event in the caller's transaction; it is only visible to the relay once committed."""
+    if lr.id is None:
+        db.flush()
+    event = OutboxEvent(
+        event_type=event_type,
+        employee_id=lr.employee_id,
+        leave_id=lr.id,
+        payload={**leave_payload(lr), **extra},
+        status="pending",
+    )
+    db.add(event)
+    return event
+
+
+def emit_many(db: Session, event_type: str, payloads: list[dict]) -> None:
+    """Bulk variant of emit() for set-based operations; payloads come from leave_payload-shaped dicts."""
+    if payloads:
+        db.execute(insert(OutboxEvent), [
+            {"event_type": event_type, "employee_id": p["employee_id"], "leave_id": p["leave_id"],
+             "payload": p, "status": "pending", "attempts": 0}
+            for p in payloads
+        ])
+
+
+class BackpressureError(RuntimeError):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Sink asked us to back off for {retry_after}s")
+        self.retry_after = retry_after
+
+
+class OutboxRelay:
+    """
+    Delivers pending events to every configured webhook in batches, at least
+    once. Events for one employee are delivered in id order: once an employee
+    has an event waiting for retry, their later events wait too. Each event
+    records the sinks that accepted it, so a failing sink only gets resent
+    what it missed; a sink may still see an event twice (e.g. a timeout after
+    it was stored) and can dedupe on the event id. On Postgres a relay claims
+    whole employees with transaction-scoped advisory locks, so concurrent
+    relays (other workers or hosts) never split one employee's events between
+    them. A 429/503 from a sink pauses the relay for its Retry-After.
+    """
+
+    def __init__(self, urls: list[str], batch_size: int = 100, max_batches: int = 10, max_attempts: int = 10,
+                 client: HttpClient | None = None):
+        self.urls = urls
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.max_attempts = max_attempts
+        self.client = client or HttpClient(timeout=(3.0, 10.0), retries=0, breaker=CircuitBreaker(5, 30.0))
+        self.paused_until: datetime | None = None
+
+    @staticmethod
+    def _deliverable(now: datetime):
+        """
+        Due events whose employee has no earlier event still backing off.
+        Filtered in SQL, so a backlog of waiting events at the head of the
+        table never crowds out the due ones behind it.
+        """
+        earlier = aliased(OutboxEvent)
+        waiting = exists().where(
+            earlier.employee_id == OutboxEvent.employee_id,
+            earlier.id < OutboxEvent.id,
+            earlier.status == "pending",
+            earlier.next_attempt_at > now,
+        )
+        return (
+            OutboxEvent.status == "pending",
+            or_(OutboxEvent.next_attempt_at.is_(None), OutboxEvent.next_attempt_at <= now),
+            ~waiting,
+        )
+
+    def _next_batch(self, db: Session) -> list[OutboxEvent]:
+        deliverable = self._deliverable(_utcnow())
+        query = select(OutboxEvent).where(*deliverable).order_by(OutboxEvent.id).limit(self.batch_size)
+        if is_postgres(db.get_bind()):
+            candidates = db.execute(
+                select(OutboxEvent.employee_id).where(*deliverable).order_by(OutboxEvent.id).limit(self.batch_size)
+            ).scalars().all()
+            # Employees another relay holds are skipped whole; the locks last until this batch commits
+            claimed = db.execute(
+                _LOCK_EMPLOYEES, {"ids": list(dict.fromkeys(candidates)), "lock_class": OUTBOX_LOCK_CLASS}
+            ).scalars().all()
+            if not claimed:
+                return []
+            # Re-read under the locks: another relay may have delivered some in the meantime
+            query = query.where(OutboxEvent.employee_id.in_(claimed))
+        return db.execute(query).scalars().all()
+
+    @staticmethod
+    def _body(events: list[OutboxEvent]) -> dict:
+        return {
+            "events": [
+                {"id": e.id, "type": e.event_type, "employee_id": e.employee_id,
+                 "occurred_at": _as_utc(e.created_at).isoformat() if e.created_at else None, "data": e.payload}
+                for e in events
+            ]
+        }
+
+    def _post(self, events: list[OutboxEvent]) -> None:
+        """
+        Sends each sink the events it has not accepted yet and adds it to their
+        `delivered_to`. Every sink is tried; then backpressure, or else the
+        first failure, is raised.
+        """
+        backpressure: BackpressureError | None = None
+        failure: Exception | None = None
+        for url in self.urls:
+            missing = [e for e in events if url not in (e.delivered_to or ())]
+            if not missing:
+                continue
+            try:
+                self.client.request("POST", url, json=self._body(missing))
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status in (429, 503):
+                    wait = retry_after_seconds(e.response.headers.get("Retry-After"))
+                    if backpressure is None or wait > backpressure.retry_after:
+                        backpressure = BackpressureError(wait)
+                else:
+                    failure = failure or e
+                continue
+            except (requests.RequestException, CircuitOpenError) as e:
+                failure = failure or e
+                continue
+            for event in missing:
+                event.delivered_to = [*(event.delivered_to or ()), url]
+        if backpressure is not None:
+            raise backpressure
+        if failure is not None:
+            raise failure
+
+    def _mark_delivered(self, events: list[OutboxEvent]) -> int:
+        now, done = _utcnow(), 0
+        for event in events:
+            if all(url in (event.delivered_to or ()) for url in self.urls):
+                event.status, event.delivered_at, event.attempts = "delivered", now, event.attempts + 1
+                done += 1
+        return done
+
+    def run_once(self) -> int:
+        if not self.urls or (self.paused_until and _utcnow() < self.paused_until):
+            return 0
+        delivered = 0
+        db = SessionLocal()
+        try:
+            for _ in range(self.max_batches):
+                events = self._next_batch(db)
+                if not events:
+                    break
+                error = None
+                try:
+                    self._post(events)
+                except BackpressureError as e:
+                    self.paused_until = _utcnow() + timedelta(seconds=e.retry_after)
+                    metrics.inc("outbox_backpressure_total")
+                    error = e
+                except (requests.RequestException, CircuitOpenError) as e:
+                    error = e
+                # Whatever every sink accepted is done, even when another sink failed
+                done = self._mark_delivered(events)
+                if error is not None and not isinstance(error, BackpressureError):
+                    # Backpressure is not an attempt; other failures back off what is left
+                    failed = [event for event in events if event.status == "pending"]
+                    self._failed(failed, repr(error))
+                    metrics.inc("outbox_events_total", len(failed), result="failed")
+                db.commit()
+                delivered += done
+                metrics.inc("outbox_events_total", done, result="delivered")
+                if error is not None:
+                    break
+        finally:
+            db.close()
+        return delivered
+
+    def _failed(self, events: list[OutboxEvent], error: str) -> None:
+        now = _utcnow()
+        for event in events:
+            event.attempts += 1
+            event.last_error = error[:500]
+            if event.attempts >= self.max_attempts:
+                event.status = "dead"
+            else:
+                event.next_attempt_at = now + timedelta(seconds=min(2 ** event.attempts, 3600))
+
+    def purge_delivered(self, older_than_days: int) -> int:
+        db = SessionLocal()
+        try:
+            cutoff = _utcnow() - timedelta(days=older_than_days)
+            result = db.execute(delete(OutboxEvent).where(
+                OutboxEvent.status == "delivered", OutboxEvent.delivered_at < cutoff
+            ))
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+
+relay = OutboxRelay(
+    settings.OUTBOX_WEBHOOK_URLS,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    max_batches=settings.OUTBOX_MAX_BATCHES_PER_RUN,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+)
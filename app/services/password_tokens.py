@@ -0,0 +1,57 @@
+# app/services/password_tokens.py
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.password_token import PasswordSetupToken
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def hash_token(token: str) -> str:
+    # Tokens are 256-bit random values, so a fast hash is enough to make a leaked table useless
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue(db: Session, employee_id: int) -> str:
+    """Replace the employee's setup token. Returns the cleartext token for the email; runs in the caller's transaction."""
+    token = secrets.token_urlsafe(32)
+    db.execute(delete(PasswordSetupToken).where(PasswordSetupToken.employee_id == employee_id))
+    db.add(PasswordSetupToken(
+        employee_id=employee_id,
+        token_hash=hash_token(token),
+        expires_at=_utcnow() + timedelta(hours=settings.PASSWORD_SETUP_TOKEN_TTL_HOURS),
+    ))
+    return token
+
+
+def redeem(db: Session, token: str) -> Employee | None:
+    """Consume a valid token: one lookup on the unique hash index. The caller commits."""
+    record = db.execute(
+        select(PasswordSetupToken)
+        .where(PasswordSetupToken.token_hash == hash_token(token), PasswordSetupToken.expires_at > _utcnow())
+        .with_for_update()
+    ).scalar_one_or_none()
+    if record is None:
+        return None
+    db.delete(record)
+    return db.get(Employee, record.employee_id)
+
+
+def purge_expired(db: Session, batch_size: int = 1000) -> int:
+    """Deletes expired tokens in batches to keep the table bounded."""
+    total = 0
+    while True:
+        ids = select(PasswordSetupToken.id).where(PasswordSetupToken.expires_at < _utcnow()).limit(batch_size)
+        deleted = db.execute(delete(PasswordSetupToken).where(PasswordSetupToken.id.in_(ids))).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,132 @@
+# app/services/reference.py
+"""
+Reference data read on nearly every request but changed rarely: leave
+types and company holidays. Loaded once into an immutable snapshot and
+swapped atomically when its version moves. Company holidays are non-working
+days on top of the provider's calendar, see app.services.holidays.
+
+The version is the cache namespace version of "reference", so
+`invalidate()` in any worker makes every worker reload on its next read.
+Checking it is a memoised dict lookup with the memory and redis
+backends, so validation needs no database round trip. Each tenant has its
+own snapshot and version.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import cache
+from app.core.db import SessionLocal
+from app.core.tenancy import current_tenant, tenant_scope
+from app.models.holiday import Holiday
+from app.models.leave_type import LeaveType
+
+NAMESPACE = "reference"
+
+
+@dataclass(frozen=True)
+class LeaveTypeInfo:
+    id: int
+    name: str
+    description: str | None
+    default_balance: int
+    carry_forward: bool
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    version: int
+    leave_types: Mapping[int, LeaveTypeInfo]
+    company_holidays: frozenset[date]
+
+    def leave_type(self, leave_type_id: int) -> LeaveTypeInfo | None:
+        return self.leave_types.get(leave_type_id)
+
+    def company_holidays_in(self, year: int) -> tuple[date, ...]:
+        return tuple(sorted(d for d in self.company_holidays if d.year == year))
+
+
+def _load(db: Session, version: int) -> ReferenceSnapshot:
+    leave_types = {
+        lt.id: LeaveTypeInfo(lt.id, lt.name, lt.description, lt.default_balance, lt.carry_forward)
+        for lt in db.execute(select(LeaveType).order_by(LeaveType.id)).scalars()
+    }
+    holidays = frozenset(db.execute(select(Holiday.date)).scalars())
+    return ReferenceSnapshot(version, MappingProxyType(leave_types), holidays)
+
+
+class ReferenceRegistry:
+    """One snapshot per tenant; the least recently used are dropped beyond max_tenants."""
+
+    def __init__(self, max_tenants: int = 256):
+        self.max_tenants = max_tenants
+        self._snapshots: "OrderedDict[str, ReferenceSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def current(self) -> ReferenceSnapshot:
+        """The live snapshot, reloaded first if another worker invalidated it."""
+        snapshot = self._snapshots.get(current_tenant())
+        if snapshot is not None and snapshot.version == cache.version(NAMESPACE):
+            return snapshot
+        return self.reload()
+
+    def reload(self) -> ReferenceSnapshot:
+        tenant = current_tenant()
+        # One loader at a time; readers keep using the old snapshot meanwhile
+        with self._lock:
+            # Version read before loading: a change committed mid-load bumps it again
+            version = cache.version(NAMESPACE)
+            snapshot = self._snapshots.get(tenant)
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            db = SessionLocal()
+            try:
+                snapshot = _load(db, version)
+            finally:
+                db.close()
+            # Rebuilt rather than mutated, so lock-free readers never see it mid-change
+            snapshots = OrderedDict(self._snapshots)
+            snapshots.pop(tenant, None)
+            snapshots[tenant] = snapshot
+            while len(snapshots) > self.max_tenants:
+                snapshots.popitem(last=False)
+            self._snapshots = snapshots
+            return snapshot
+
+    def invalidate(self) -> int:
+        return cache.invalidate(NAMESPACE)
+
+
+reference = ReferenceRegistry()
+
+
+# ----------------- Change tracking -----------------
+# Writes to reference tables through the ORM invalidate after commit
+
+def _mark_changed(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info["reference_changed"] = True
+
+
+for _model in (LeaveType, Holiday):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _mark_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    if session.info.pop("reference_changed", False):
+        with tenant_scope(session.info.get("tenant") or current_tenant()):
+            reference.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session) -> None:
+    session.info.pop("reference_changed", None)
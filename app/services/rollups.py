@@ -0,0 +1,168 @@
+# app/services/rollups.py
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.employee import Employee
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.models.leave_rollup import LeaveUtilizationRollup
+from app.utils.fields import project
+
+HolidayLookup = Callable[[int], set[date]]
+
+
+def month_split(start: date, end: date, holidays: set[date]) -> dict[date, int]:
+    """Working days of [start, end] per month, using the same holidays as LeaveRequest.days."""
+    per_month: dict[date, int] = defaultdict(int)
+    current = start
+    while current <= end:
+        if current.weekday() < 5 and current not in holidays:
+            per_month[current.replace(day=1)] += 1
+        current += timedelta(days=1)
+    return per_month
+
+
+def month_days(start: date, end: date, holidays: set[date]) -> dict[str, int]:
+    """month_split in the form stored on LeaveRequest.month_days."""
+    return {month.isoformat(): days for month, days in month_split(start, end, holidays).items()}
+
+
+def contribution(lr: LeaveRequest, holidays_for: HolidayLookup) -> dict[str, int]:
+    """What the request added to the rollups when it was written."""
+    if lr.month_days is None:
+        # Written before month_days existed; reconciliation stores it
+        return month_days(lr.start_date, lr.end_date, holidays_for(lr.start_date.year))
+    return lr.month_days
+
+
+def _deltas(domain: str, leave_type_id: int, split: dict[str, int], status, sign: int):
+    if status == LeaveStatus.REJECTED:
+        return []
+    column = "approved_days" if status == LeaveStatus.APPROVED else "pending_days"
+    return [
+        {"domain": domain, "leave_type_id": leave_type_id, "month": date.fromisoformat(month),
+         "approved_days": 0, "pending_days": 0, column: sign * days, "requests": sign}
+        for month, days in split.items()
+    ]
+
+
+def _upsert(db: Session, rows: list[dict]) -> None:
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect)
+    table = LeaveUtilizationRollup.__table__
+    if insert is None:
+        # Generic fallback: read-modify-write under a row lock
+        for row in rows:
+            current = db.execute(
+                select(LeaveUtilizationRollup).filter_by(
+                    domain=row["domain"], leave_type_id=row["leave_type_id"], month=row["month"]
+                ).with_for_update()
+            ).scalar_one_or_none()
+            if current is None:
+                db.add(LeaveUtilizationRollup(**row))
+            else:
+                current.approved_days += row["approved_days"]
+                current.pending_days += row["pending_days"]
+                current.requests += row["requests"]
+        return
+    for row in rows:
+        stmt = insert(table).values(**row)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["domain", "leave_type_id", "month"],
+            set_={
+                "approved_days": table.c.approved_days + stmt.excluded.approved_days,
+                "pending_days": table.c.pending_days + stmt.excluded.pending_days,
+                "requests": table.c.requests + stmt.excluded.requests,
+                "updated_at": func.now(),
+            },
+        ))
+
+
+def record(db: Session, domain: str, lr: LeaveRequest, sign: int, holidays_for: HolidayLookup, status=None) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) one request's contribution. Runs in the
+    caller's transaction. Uses the split stored on the request, so removing
+    it takes off exactly what was added and needs no holiday lookup.
+    """
+    _upsert(db, _deltas(domain, lr.leave_type_id, contribution(lr, holidays_for), status or lr.status, sign))
+
+
+def record_many(db: Session, per_domain: dict[str, int], leave_type_id: int, split: dict[str, int], status) -> None:
+    """Contribution of `count` identical requests per domain, e.g. a mass leave insert."""
+    rows = []
+    for domain, count in per_domain.items():
+        for delta in _deltas(domain, leave_type_id, split, status, 1):
+            rows.append({**delta, "approved_days": delta["approved_days"] * count,
+                         "pending_days": delta["pending_days"] * count, "requests": count})
+    _upsert(db, rows)
+
+
+def _lock_rollups(db: Session) -> None:
+    # Writers wait for the rebuild instead of landing between its read and its write;
+    # report reads go on against the old rows until commit
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"LOCK TABLE {LeaveUtilizationRollup.__tablename__} IN EXCLUSIVE MODE"))
+
+
+def rebuild(db: Session, holidays_for: HolidayLookup, since: date | None = None) -> int:
+    """
+    Recompute rollups from leave_requests. Used for backfill and reconciliation.
+    With `since`, months before it are left alone; their requests may have
+    been archived out of leave_requests. Requests without a stored split get
+    one, so later transitions subtract what the rollups now hold.
+    """
+    _lock_rollups(db)
+    # Deleting first takes the write lock on SQLite before anything is read
+    stale = delete(LeaveUtilizationRollup)
+    if since is not None:
+        stale = stale.where(LeaveUtilizationRollup.month >= since)
+    db.execute(stale)
+
+    totals: dict[tuple, dict] = {}
+    query = (
+        select(Employee.domain, LeaveRequest)
+        .join(Employee, Employee.id == LeaveRequest.employee_id)
+        .where(LeaveRequest.status != LeaveStatus.REJECTED)
+        .execution_options(yield_per=1000)
+    )
+    if since is not None:
+        query = query.where(LeaveRequest.end_date >= since)
+    for domain, lr in db.execute(query):
+        if lr.month_days is None:
+            lr.month_days = contribution(lr, holidays_for)
+        for delta in _deltas(domain, lr.leave_type_id, lr.month_days, lr.status, 1):
+            if since is not None and delta["month"] < since:
+                continue
+            key = (delta["domain"], delta["leave_type_id"], delta["month"])
+            agg = totals.setdefault(key, {**delta, "approved_days": 0, "pending_days": 0, "requests": 0})
+            agg["approved_days"] += delta["approved_days"]
+            agg["pending_days"] += delta["pending_days"]
+            agg["requests"] += 1
+
+    if totals:
+        db.execute(LeaveUtilizationRollup.__table__.insert(), list(totals.values()))
+    db.commit()
+    return len(totals)
+
+
+def utilization_report(db: Session, year: int, domain: str = None, leave_type_id: int = None, fields: list[str] = None):
+    """Rollup rows for the year; with `fields`, only those columns are selected and rows come back as dicts."""
+    columns = project(LeaveUtilizationRollup, fields) if fields else [LeaveUtilizationRollup]
+    query = select(*columns).where(
+        LeaveUtilizationRollup.month >= date(year, 1, 1),
+        LeaveUtilizationRollup.month < date(year + 1, 1, 1),
+        LeaveUtilizationRollup.requests > 0,
+    ).order_by(LeaveUtilizationRollup.month, LeaveUtilizationRollup.domain, LeaveUtilizationRollup.leave_type_id)
+    if domain:
+        query = query.where(LeaveUtilizationRollup.domain == domain)
+    if leave_type_id:
+        query = query.where(LeaveUtilizationRollup.leave_type_id == leave_type_id)
+    if fields:
+        return [dict(row) for row in db.execute(query).mappings()]
+    return db.execute(query).scalars().all()
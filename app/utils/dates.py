@@ -14,4 +14,32 @@ def business_days_between(start: date, end: date, holidays: Iterable[date] = ())
     return sum(1 for d in daterange(start, end) if d.weekday() not in WEEKENDS and d not in holidays_set)
 
 def overlaps(a_start: date, a_end: date, b_start: date, b_end: date) -> bool:
-    return not (a_end < b_start or b_end < a_start)
\ No newline at end of file
+    return not (a_end < b_start or b_end < a_start)
+
+
+class WorkingDayCalendar:
+    """
+    Working days of one year as a prefix sum: counting any range inside the
+    year is two list lookups, however long the range is.
+    """
+
+    def __init__(self, year: int, holidays: Iterable[date] = (), weekend: Iterable[int] = WEEKENDS):
+        self.year = year
+        self.first = date(year, 1, 1)
+        holidays_set = set(holidays)
+        weekend = set(weekend)
+        # _cum[i] = working days in [Jan 1, Jan 1 + i)
+        self._cum = [0]
+        for d in daterange(self.first, date(year, 12, 31)):
+            self._cum.append(self._cum[-1] + (d.weekday() not in weekend and d not in holidays_set))
+
+    def count(self, start: date, end: date) -> int:
+        """Working days in [start, end], clipped to this year."""
+        lo = max((start - self.first).days, 0)
+        hi = min((end - self.first).days + 1, len(self._cum) - 1)
+        return self._cum[hi] - self._cum[lo] if hi > lo else 0
+
+
+def working_days(calendars: dict[int, WorkingDayCalendar], start: date, end: date) -> int:
+    """Working days in [start, end] using each year's own calendar; needs one per year touched."""
+    return sum(calendars[year].count(start, end) for year in range(start.year, end.year + 1))
@@ -0,0 +1,50 @@
+import base64
+import json
+from typing import Iterable
+
+from fastapi import HTTPException
+
+
+def parse_fields(fields: str | None, allowed: Iterable[str], default: Iterable[str], always: Iterable[str] = ("id",)) -> list[str]:
+    """
+    Turn a `fields=a,b,c` query value into a column list, in the order the
+    model declares them. `always` columns are added because keyset cursors
+    and links depend on them.
+    """
+    allowed = list(allowed)
+    if not fields:
+        wanted = set(default)
+    else:
+        wanted = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = wanted - set(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}",
+            )
+    wanted |= set(always)
+    return [name for name in allowed if name in wanted]
+
+
+def project(model, names: list[str]) -> list:
+    """Model columns for a SELECT list, so unrequested columns are never read."""
+    return [getattr(model, name) for name in names]
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple[type, ...]) -> list:
+    """Values of a cursor made by encode_cursor; anything but a list of `types`, in order, is a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # bool is an int to isinstance, but never a valid key value here
+    if not isinstance(values, list) or len(values) != len(types) or any(
+        isinstance(v, bool) or not isinstance(v, t) for v, t in zip(values, types)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
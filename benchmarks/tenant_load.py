@@ -0,0 +1,167 @@
+# benchmarks/tenant_load.py
+"""
+Load test for multi-tenant mode: hundreds of simulated tenants on SQLite
+database-per-tenant routing, with skewed traffic (one big tenant takes
+--big-share of all requests) to check that small tenants keep their
+latency, that open pools stay bounded and that cache partitions stay
+within their quota.
+
+    python benchmarks/tenant_load.py --tenants 300 --requests 20000 --workers 32
+
+Runs the app in-process; nothing is sent to the holiday provider (the
+shared holiday cache is warmed with empty calendars first).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+HOST_SUFFIX = ".bench.local"
+
+
+def configure(args, tenants: list[str]) -> None:
+    # Settings are read at import time, so the environment is set up first
+    os.environ.update({
+        "API_KEY": os.environ.get("API_KEY", "bench"),
+        "DB_URL": f"sqlite:///{args.dir}/default.db",
+        "SCHEDULER_ENABLED": "false",
+        "MULTI_TENANT": "true",
+        "TENANTS": json.dumps(tenants),
+        "TENANT_ROUTING": "database",
+        "TENANT_DB_URL_TEMPLATE": f"sqlite:///{args.dir}/{{tenant}}.db",
+        "TENANT_AUTO_PROVISION": "true",
+        "TENANT_HOST_SUFFIX": HOST_SUFFIX,
+        "TENANT_MAX_ENGINES": str(args.max_engines),
+        "TENANT_MAX_INFLIGHT": str(args.max_inflight_per_tenant),
+        "CACHE_BACKEND": "memory",
+        "CACHE_TENANT_MAX_ENTRIES": str(args.cache_per_tenant),
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed(tenants: list[str], employees: int) -> None:
+    from app.core.cache import cache
+    from app.core.config import settings
+    from app.core.db import SessionLocal
+    from app.core.tenancy import tenant_scope
+    from app.models.employee import Employee
+    from app.models.leave_type import LeaveType
+
+    year = date.today().year
+    for y in (year, year + 1, year + 2):
+        cache.set("holidays", f"{settings.COUNTRY}:{y}", [])
+    for tenant in tenants:
+        with tenant_scope(tenant):
+            db = SessionLocal()
+            try:
+                db.add(LeaveType(name="Annual", default_balance=20, carry_forward=False))
+                db.add_all(
+                    Employee(name=f"Employee {i}", email=f"e{i}@{tenant}.example.com", domain="eng",
+                             joining_date=date(2020, 1, 1), annual_allocation=200)
+                    for i in range(employees)
+                )
+                db.commit()
+            finally:
+                db.close()
+
+
+def request(client, tenant: str, employees: int, rng: random.Random):
+    headers = {"host": tenant.replace("_", "-") + HOST_SUFFIX}
+    emp = rng.randint(1, employees)
+    roll = rng.random()
+    start = time.perf_counter()
+    if roll < 0.7:
+        kind = "balance"
+        r = client.get(f"/leaves/balance/{emp}", headers=headers)
+    elif roll < 0.9:
+        kind = "working-days"
+        first = date.today() + timedelta(days=rng.randint(1, 200))
+        ranges = [{"start_date": str(first), "end_date": str(first + timedelta(days=d))} for d in range(30)]
+        r = client.post("/leaves/working-days", json={"ranges": ranges}, headers=headers)
+    else:
+        kind = "apply"
+        first = date.today() + timedelta(days=rng.randint(1, 300))
+        first += timedelta(days=max(0, 7 - first.weekday()) if first.weekday() >= 5 else 0)  # a working day
+        r = client.post("/leaves/", headers=headers, json={
+            "employee_id": emp, "leave_type_id": 1, "start_date": str(first), "end_date": str(first),
+            "reason": "load test",
+        })
+    return kind, r.status_code, time.perf_counter() - start
+
+
+def pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=300)
+    parser.add_argument("--employees", type=int, default=20, help="per tenant")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--big-share", type=float, default=0.5, help="share of traffic sent to the big tenant")
+    parser.add_argument("--max-engines", type=int, default=64)
+    parser.add_argument("--max-inflight-per-tenant", type=int, default=8)
+    parser.add_argument("--cache-per-tenant", type=int, default=200)
+    parser.add_argument("--dir", default=None, help="where tenant databases go (default: a temp dir)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    args.dir = args.dir or tempfile.mkdtemp(prefix="tenant_load_")
+    tenants = [f"t{i:04d}" for i in range(args.tenants)]
+    configure(args, tenants)
+
+    from fastapi.testclient import TestClient
+    from app.core.cache import cache
+    from app.core.db import tenant_router
+    import main as app_main
+
+    big = tenants[0]
+    started = time.perf_counter()
+    seed(tenants, args.employees)
+    print(f"Seeded {len(tenants)} tenants in {time.perf_counter() - started:.1f}s ({args.dir})")
+
+    rng = random.Random(args.seed)
+    plan = [big if rng.random() < args.big_share else rng.choice(tenants[1:]) for _ in range(args.requests)]
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+    with TestClient(app_main.app) as client:
+        def run(i_tenant):
+            i, tenant = i_tenant
+            kind, status, elapsed = request(client, tenant, args.employees, random.Random(args.seed + i))
+            return tenant, kind, status, elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.workers) as pool:
+            for tenant, kind, status, elapsed in pool.map(run, enumerate(plan)):
+                size = "big" if tenant == big else "small"
+                statuses[(size, status)] += 1
+                if status != 503:
+                    latencies[size].append(elapsed)
+                    latencies[f"{size} {kind}"].append(elapsed)
+        wall = time.perf_counter() - started
+
+    print(f"\n{args.requests} requests, {args.workers} workers, {wall:.1f}s, {args.requests / wall:.0f} req/s")
+    print(f"{'class':<22}{'n':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name in sorted(latencies):
+        values = latencies[name]
+        print(f"{name:<22}{len(values):>7}{statistics.median(values) * 1000:>9.1f}{pct(values, 0.95):>9.1f}{pct(values, 0.99):>9.1f}")
+    print("\nstatus codes:", dict(sorted(statuses.items())))
+
+    parts = getattr(cache.backend, "_parts", {})
+    sizes = sorted((len(p) for name, p in parts.items() if name), reverse=True)
+    print(f"open tenant pools: {tenant_router.open_binds()} (cap {args.max_engines})")
+    if sizes:
+        print(f"cache partitions: {len(sizes)}, largest {sizes[0]} entries (cap {args.cache_per_tenant})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.Webhandler import auth_routes
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
 from app.core.db import init_db
+from app.core.metrics import metrics
+from app.core.push import STREAM_PATHS
+from app.core.ratelimit import LoadShedderMiddleware
+from app.core.scheduler import scheduler
+from app.core.tenancy import TenantMiddleware
+from app.core.tracing import instrument_app, tracer
 from app.exception.exceptions import http_exception_handler, validation_exception_handler
-from app.routers import employees, leaves
+from app.routers import admin, employees, leaves, reports
+from app.services.jobs import register_jobs
+from app.services.reference import reference
 from app.Webhandler.protect_routes import router as protected_router
 
-app = FastAPI(title="Leave Management API", version="0.1.0")
+# ----------------- Lifespan -----------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reference.reload()
+    if settings.SCHEDULER_ENABLED:
+        register_jobs(scheduler)
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    tracer.flush()
+
+app = FastAPI(title="Leave Management API", version="0.1.0", lifespan=lifespan)
 
 # ----------------- Initialize DB -----------------
 init_db()
@@ -30,13 +53,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ----------------- Tenancy -----------------
+app.add_middleware(TenantMiddleware, max_inflight_per_tenant=settings.TENANT_MAX_INFLIGHT, stream_paths=STREAM_PATHS)
+
+# ----------------- Compression -----------------
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# ----------------- Load Shedding -----------------
+# Added last so it runs first and can refuse work before anything else
+app.add_middleware(
+    LoadShedderMiddleware,
+    max_inflight=settings.MAX_INFLIGHT_REQUESTS,
+    auth_max_concurrency=settings.AUTH_MAX_CONCURRENCY,
+    shed_low_priority_at=settings.SHED_LOW_PRIORITY_AT,
+    stream_paths=STREAM_PATHS,
+)
+
+# ----------------- Tracing -----------------
+# Wraps the whole middleware stack, so shed requests get a span as well
+instrument_app(app)
+
 # ----------------- Include Routers -----------------
 app.include_router(auth_routes.router, prefix="/auth", tags=["Auth"])
 app.include_router(protected_router)
 app.include_router(employees.router, prefix="/employees", tags=["Employees"])
 app.include_router(leaves.router, prefix="/leaves", tags=["Leaves"])
+app.include_router(reports.router, prefix="/reports", tags=["Reports"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 # ----------------- Root -----------------
 @app.get("/")
 def root():
     return {"message": "Hello World"}
+
+# ----------------- Metrics -----------------
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics_endpoint():
+    return metrics.render()
@@ -0,0 +1,11 @@
+# tests/conftest.py
+import os
+import sys
+
+# Settings are read at import time: point them at local stand-ins before any app import
+os.environ.setdefault("API_KEY", "test")
+os.environ.setdefault("DB_URL", "sqlite://")
+os.environ.setdefault("HOLIDAY_API_URL", "http://127.0.0.1:9/holidays")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
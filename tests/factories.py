@@ -0,0 +1,51 @@
+# tests/factories.py
+"""Rows for service and route tests. Emails are unique, so tests can share the in-memory database."""
+import uuid
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.employee import Employee
+from app.models.leave_type import LeaveType
+from app.models.user import RoleEnum, User
+from app.services import hierarchy
+from app.Webhandler.auth import create_access_token
+
+
+def leave_type(db: Session) -> int:
+    leave_type_id = db.execute(select(LeaveType.id).where(LeaveType.name == "Annual Leave")).scalar()
+    if leave_type_id is None:
+        lt = LeaveType(name="Annual Leave", default_balance=20, carry_forward=True)
+        db.add(lt)
+        db.commit()
+        leave_type_id = lt.id
+    return leave_type_id
+
+
+def employee(db: Session, name: str = "Test Employee", domain: str | None = None, manager_id: int | None = None,
+             annual_allocation: int = 24, joining_date: date = date(2020, 1, 1)) -> Employee:
+    """Committed employee with their hierarchy rows; the domain defaults to one of its own."""
+    emp = Employee(
+        name=name,
+        email=f"{uuid.uuid4().hex[:12]}@x.com",
+        domain=domain or f"d-{uuid.uuid4().hex[:8]}",
+        joining_date=joining_date,
+        annual_allocation=annual_allocation,
+        manager_id=manager_id,
+    )
+    db.add(emp)
+    db.flush()
+    hierarchy.add_employee(db, emp.id, manager_id)
+    db.commit()
+    return emp
+
+
+def auth_headers(db: Session, role: RoleEnum = RoleEnum.admin, email: str | None = None) -> dict:
+    """Bearer header for a (new) login with the given role."""
+    email = email or f"{uuid.uuid4().hex[:12]}@x.com"
+    if db.execute(select(User).where(User.email == email)).scalar() is None:
+        db.add(User(email=email, role=role))
+        db.commit()
+    token = create_access_token({"sub": email, "role": role.value, "tenant": "default"})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,68 @@
+# tests/http_server.py
+"""
+Scripted HTTP stand-in for the holiday provider and webhook endpoints.
+Each request takes the next queued (status, headers, body) reply, or the
+default once the queue is empty, and is recorded for assertions.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real endpoints
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        server: ScriptedServer = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with server.lock:
+            server.requests.append({"method": self.command, "path": self.path, "client": self.client_address,
+                                    "headers": dict(self.headers), "body": body})
+            status, headers, payload = server.replies.pop(0) if server.replies else server.default
+        if server.delay:
+            server.delay.wait()
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class ScriptedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, default=(200, {}, {})):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests: list[dict] = []
+        self.replies: list[tuple] = []
+        self.default = default
+        # Set to an Event to hold every reply until it is set
+        self.delay: threading.Event | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reply(self, status: int, body=None, headers: dict = None) -> None:
+        self.replies.append((status, headers or {}, {} if body is None else body))
+
+    def start(self) -> "ScriptedServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self.delay:
+            self.delay.set()
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,111 @@
+# tests/resp_server.py
+"""
+Local stand-in for a Redis-protocol server, enough of it for RedisBackend:
+GET, SET (NX, EX), DEL, INCRBY, PUBLISH and SUBSCRIBE. `drop_after` makes
+the server run the next command of that name and close the connection
+without replying, the way a server restart mid-request looks to a client;
+`drop_subscribers()` does the same to subscriber connections.
+"""
+import socket
+import socketserver
+import threading
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    data = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _array(*items: str) -> bytes:
+    return b"*%d\r\n" % len(items) + b"".join(_bulk(item) for item in items)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+
+    def handle(self):
+        server: RespServer = self.server
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            with server.lock:
+                server.commands.append(args)
+                reply = server.execute(self, name, args[1:])
+                drop = server.drop_after.pop(name, False)
+            if drop:
+                return
+            self.wfile.write(reply)
+            self.wfile.flush()
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.store: dict[str, str] = {}
+        self.commands: list[list[str]] = []
+        self.subscribers: list[tuple[object, str]] = []
+        self.drop_after: dict[str, bool] = {}
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def start(self) -> "RespServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def drop_subscribers(self) -> None:
+        """Close every subscriber connection, as a server restart would."""
+        with self.lock:
+            handlers, self.subscribers = {h for h, _ in self.subscribers}, []
+        for handler in handlers:
+            handler.connection.shutdown(socket.SHUT_RDWR)
+
+    def count(self, name: str) -> int:
+        return sum(1 for args in self.commands if args[0].upper() == name)
+
+    def execute(self, handler, name: str, args: list[str]) -> bytes:
+        if name == "GET":
+            return _bulk(self.store.get(args[0]))
+        if name == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            if "NX" in options and key in self.store:
+                return _bulk(None)
+            self.store[key] = value
+            return b"+OK\r\n"
+        if name == "DEL":
+            return b":%d\r\n" % (self.store.pop(args[0], None) is not None)
+        if name == "INCRBY":
+            self.store[args[0]] = str(int(self.store.get(args[0], 0)) + int(args[1]))
+            return b":%s\r\n" % self.store[args[0]].encode()
+        if name == "PUBLISH":
+            listeners = [h for h, channel in self.subscribers if channel == args[0]]
+            for listener in listeners:
+                listener.wfile.write(_array("message", args[0], args[1]))
+                listener.wfile.flush()
+            return b":%d\r\n" % len(listeners)
+        if name == "SUBSCRIBE":
+            for channel in args:
+                self.subscribers.append((handler, channel))
+            return b"".join(_array("subscribe", channel) for channel in args)
+        return b"-ERR unknown command\r\n"
@@ -0,0 +1,70 @@
+# tests/test_archive.py
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.db import SessionLocal, init_db
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.services import archive
+from app.services.leave_service import LeaveService
+from tests.factories import employee, leave_type
+
+OLD = 2019  # well before any cutoff
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    init_db()
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _leave(db, emp_id: int, leave_type_id: int, start: date, days: int, status: LeaveStatus) -> LeaveRequest:
+    lr = LeaveRequest(employee_id=emp_id, leave_type_id=leave_type_id, start_date=start,
+                      end_date=start + timedelta(days=days - 1), days=days, status=status)
+    db.add(lr)
+    return lr
+
+
+def _balance(db, emp_id: int) -> tuple[int, int]:
+    """(used, pending) as the balance and approval-queue paths compute them."""
+    totals = LeaveService._balance_totals(employee_ids=[emp_id])
+    row = db.execute(select(totals.c.used, totals.c.pending)).one()
+    assert LeaveService._used_days_now(emp_id, db) == row.used
+    return row.used, row.pending
+
+
+def test_archive_round_trip_keeps_balances(db):
+    emp_id = employee(db, joining_date=date(OLD - 1, 1, 1)).id
+    lt = leave_type(db)
+    old = [
+        _leave(db, emp_id, lt, date(OLD, 3, 4), 3, LeaveStatus.APPROVED),
+        _leave(db, emp_id, lt, date(OLD, 6, 10), 5, LeaveStatus.APPROVED),
+        _leave(db, emp_id, lt, date(OLD, 8, 5), 2, LeaveStatus.REJECTED),
+        _leave(db, emp_id, lt, date(OLD + 1, 2, 3), 4, LeaveStatus.APPROVED),
+    ]
+    stuck = _leave(db, emp_id, lt, date(OLD, 9, 2), 1, LeaveStatus.PENDING)
+    db.commit()
+    stuck_id = stuck.id
+    originals = {lr.id: {c: archive._encode(getattr(lr, c)) for c in archive.COLUMNS} for lr in old}
+    before = _balance(db, emp_id)
+
+    archived = archive.archive_closed_years(db, batch_size=2)
+    assert archived == {OLD: 3, OLD + 1: 1}
+    assert _balance(db, emp_id) == before == (12, 1)
+
+    # Only the pending request is left in the table
+    remaining = db.execute(select(LeaveRequest.id).where(LeaveRequest.employee_id == emp_id)).scalars().all()
+    assert remaining == [stuck_id]
+    records = [*archive.iter_records(OLD, employee_id=emp_id), *archive.iter_records(OLD + 1, employee_id=emp_id)]
+    assert {r["id"]: r for r in records} == originals
+    assert [(s.approved_days, s.approved_requests, s.rejected_requests)
+            for s in archive.year_summaries(db, OLD, employee_id=emp_id)] == [(8, 2, 1)]
+
+    # Nothing left to move: a second run changes nothing
+    assert archive.archive_closed_years(db) == {}
+    assert _balance(db, emp_id) == before
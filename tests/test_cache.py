@@ -0,0 +1,193 @@
+# tests/test_cache.py
+import threading
+import time
+
+import pytest
+
+from app.core.cache import Cache, InMemoryBackend, MmapBackend, RedisBackend
+from app.core.tenancy import tenant_scope
+from tests.resp_server import RespServer
+
+
+@pytest.fixture
+def resp_server():
+    server = RespServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["memory", "mmap", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryBackend()
+    elif request.param == "mmap":
+        yield MmapBackend(str(tmp_path / "cache.mmap"), slots=64)
+    else:
+        server = RespServer().start()
+        yield RedisBackend(server.url)
+        server.stop()
+
+
+# ----------------- Backend contract -----------------
+def test_get_set_delete(backend):
+    assert backend.get("k") is None
+    backend.set("k", "v")
+    assert backend.get("k") == "v"
+    backend.delete("k")
+    assert backend.get("k") is None
+
+
+def test_add_only_when_absent(backend):
+    assert backend.add("lock", "a") is True
+    assert backend.add("lock", "b") is False
+    assert backend.get("lock") == "a"
+
+
+def test_incr(backend):
+    assert backend.incr("n") == 1
+    assert backend.incr("n", 5) == 6
+    assert backend.get("n") == "6"
+
+
+def test_ttl_expires(backend):
+    if isinstance(backend, RedisBackend):
+        pytest.skip("the stand-in server does not expire keys")
+    backend.set("k", "v", ttl=1)
+    time.sleep(1.1)
+    assert backend.get("k") is None
+
+
+# ----------------- In-memory bounds -----------------
+def test_memory_tenant_partition_is_capped():
+    backend = InMemoryBackend(max_entries=100, tenant_max_entries=3)
+    for i in range(5):
+        backend.set(f"leave:t=acme/ns:v1:{i}", "x")
+    backend.set("leave:ns:v1:shared", "x")
+    assert [backend.get(f"leave:t=acme/ns:v1:{i}") for i in range(5)] == [None, None, "x", "x", "x"]
+    assert backend.get("leave:ns:v1:shared") == "x"
+
+
+def test_memory_global_limit_covers_every_partition():
+    backend = InMemoryBackend(max_entries=10, tenant_max_entries=10)
+    for tenant in ("a", "b", "c"):
+        for i in range(5):
+            backend.set(f"leave:t={tenant}/ns:v1:{i}", "x")
+    assert backend._size <= 10
+    assert sum(len(part) for part in backend._parts.values()) == backend._size
+
+
+def test_memory_drops_least_recently_used_tenant():
+    backend = InMemoryBackend(max_tenants=2)
+    backend.set("leave:t=a/ns:k", "x")
+    backend.set("leave:t=b/ns:k", "x")
+    backend.get("leave:t=a/ns:k")
+    backend.set("leave:t=c/ns:k", "x")
+    assert backend.get("leave:t=a/ns:k") == "x"
+    assert backend.get("leave:t=b/ns:k") is None
+
+
+# ----------------- Versioned cache -----------------
+def test_invalidate_hides_old_entries():
+    cache = Cache(InMemoryBackend())
+    cache.set("balance", "1", 5)
+    assert cache.get("balance", "1") == 5
+    cache.invalidate("balance")
+    assert cache.get("balance", "1") is None
+
+
+def test_get_or_set_loads_once():
+    cache = Cache(InMemoryBackend())
+    calls = []
+    load = lambda: calls.append(1) or {"used": 3}
+    assert cache.get_or_set("balance", "1", load) == {"used": 3}
+    assert cache.get_or_set("balance", "1", load) == {"used": 3}
+    assert len(calls) == 1
+
+
+def test_value_loaded_during_invalidation_is_not_served():
+    cache = Cache(InMemoryBackend())
+
+    def load():
+        cache.invalidate("balance")
+        return "stale"
+
+    cache.get_or_set("balance", "1", load)
+    assert cache.get("balance", "1") is None
+
+
+def test_namespaces_are_scoped_per_tenant(monkeypatch):
+    monkeypatch.setattr("app.core.tenancy.is_known", lambda tenant: True)
+    cache = Cache(InMemoryBackend())
+    cache.set("balance", "1", "default")
+    with tenant_scope("acme"):
+        assert cache.get("balance", "1") is None
+        cache.set("balance", "1", "acme")
+        cache.invalidate("balance")
+    assert cache.get("balance", "1") == "default"
+
+
+def test_invalidation_reaches_other_processes_over_redis(resp_server):
+    writer, reader = Cache(RedisBackend(resp_server.url)), Cache(RedisBackend(resp_server.url))
+    heard = threading.Event()
+    reader.on_invalidate(lambda namespace: heard.set())
+    # The listener thread subscribes asynchronously
+    deadline = time.time() + 5
+    while resp_server.count("SUBSCRIBE") < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    writer.set("balance", "1", 5)
+    assert reader.get("balance", "1") == 5
+    writer.invalidate("balance")
+    assert heard.wait(5)
+    assert reader.get("balance", "1") is None
+
+
+# ----------------- Redis reconnects -----------------
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_versions_are_not_trusted_across_a_subscriber_reconnect(resp_server):
+    writer, reader = Cache(RedisBackend(resp_server.url)), Cache(RedisBackend(resp_server.url))
+    _wait_for(lambda: reader.backend.subscribed)
+    writer.set("balance", "1", 5)
+    assert reader.get("balance", "1") == 5
+    assert "balance" in reader._versions
+
+    resp_server.drop_subscribers()
+    _wait_for(lambda: not reader.backend.subscribed)
+    # Published while the reader is not listening, so it never hears of it
+    writer.invalidate("balance")
+    assert reader.get("balance", "1") is None
+
+    _wait_for(lambda: reader.backend.subscribed)
+    assert reader.get("balance", "1") is None
+    assert reader.version("balance") == writer.version("balance")
+
+
+def test_idempotent_command_is_retried_on_a_new_connection(resp_server):
+    backend = RedisBackend(resp_server.url)
+    backend.set("k", "v")
+    resp_server.drop_after["GET"] = True
+    assert backend.get("k") == "v"
+    assert resp_server.count("GET") == 2
+
+
+def test_incr_is_not_sent_twice(resp_server):
+    backend = RedisBackend(resp_server.url)
+    backend.incr("n")
+    resp_server.drop_after["INCRBY"] = True
+    with pytest.raises((OSError, ConnectionError)):
+        backend.incr("n")
+    assert resp_server.store["n"] == "2"
+    assert backend.incr("n") == 3
+
+
+def test_add_is_not_sent_twice(resp_server):
+    backend = RedisBackend(resp_server.url)
+    resp_server.drop_after["SET"] = True
+    with pytest.raises((OSError, ConnectionError)):
+        backend.add("lock", "me")
+    assert resp_server.count("SET") == 1
@@ -0,0 +1,54 @@
+# tests/test_directory.py
+import uuid
+
+import pytest
+
+from app.core.db import SessionLocal, init_db
+from app.services import directory
+from tests.factories import employee
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def team(db):
+    """Seven employees in one domain, five of them sharing a name."""
+    domain = f"dir-{uuid.uuid4().hex[:8]}"
+    names = ["Sam Lee", "Alex Kim", "Sam Lee", "Sam Lee", "Zoe Park", "Sam Lee", "Sam Lee"]
+    emps = [employee(db, name=name, domain=domain) for name in names]
+    return domain, sorted(((e.name, e.id) for e in emps))
+
+
+def _walk(db, limit: int, **filters) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        page = directory.list_employees(db, cursor=cursor, limit=limit, **filters)
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_pages_through_duplicate_names_without_gaps(db, team):
+    domain, expected = team
+    pages = _walk(db, limit=2, fields=["id", "name"], domain=domain)
+    assert [len(p) for p in pages] == [2, 2, 2, 1]
+    assert [(row["name"], row["id"]) for page in pages for row in page] == expected
+
+
+def test_cursor_works_when_name_is_not_selected(db, team):
+    domain, expected = team
+    pages = _walk(db, limit=3, fields=["id"], domain=domain)
+    assert [row for page in pages for row in page] == [{"id": emp_id} for _, emp_id in expected]
+
+
+def test_prefix_search_pages_only_matches(db, team):
+    domain, expected = team
+    pages = _walk(db, limit=2, fields=["id", "name"], domain=domain, q="SAM")
+    assert [row["id"] for page in pages for row in page] == [emp_id for name, emp_id in expected if name == "Sam Lee"]
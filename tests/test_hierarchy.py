@@ -0,0 +1,63 @@
+# tests/test_hierarchy.py
+import pytest
+from fastapi import HTTPException
+
+from app.core.db import SessionLocal, init_db
+from app.services import hierarchy
+from tests.factories import employee
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def chain(db):
+    """ceo <- manager <- developer, plus a second manager under the ceo."""
+    ceo = employee(db, name="Ceo")
+    manager = employee(db, name="Manager", manager_id=ceo.id)
+    developer = employee(db, name="Developer", manager_id=manager.id)
+    other = employee(db, name="Other manager", manager_id=ceo.id)
+    return ceo, manager, developer, other
+
+
+def test_anyone_above_may_approve_but_nobody_else(db, chain):
+    ceo, manager, developer, other = chain
+    assert hierarchy.can_approve(db, manager.id, developer.id)
+    assert hierarchy.can_approve(db, ceo.id, developer.id)
+    assert not hierarchy.can_approve(db, developer.id, manager.id)
+    assert not hierarchy.can_approve(db, other.id, developer.id)
+    assert not hierarchy.can_approve(db, developer.id, developer.id)
+    assert [e.id for e in hierarchy.approvers(db, developer.id)] == [manager.id, ceo.id]
+
+
+def test_reorg_into_own_subtree_is_rejected(db, chain):
+    ceo, manager, developer, _ = chain
+    for new_manager in (developer.id, manager.id):
+        with pytest.raises(HTTPException) as e:
+            hierarchy.move(db, manager.id, new_manager)
+        assert e.value.status_code == 400
+        db.rollback()
+    with pytest.raises(HTTPException):
+        hierarchy.move(db, ceo.id, developer.id)
+    db.rollback()
+    assert hierarchy.can_approve(db, manager.id, developer.id)
+
+
+def test_reorg_moves_the_whole_subtree(db, chain):
+    ceo, manager, developer, other = chain
+    hierarchy.move(db, manager.id, other.id)
+    db.commit()
+    assert hierarchy.can_approve(db, other.id, developer.id)
+    assert hierarchy.can_approve(db, ceo.id, developer.id)
+    assert [e.id for e in hierarchy.approvers(db, developer.id)] == [manager.id, other.id, ceo.id]
+
+    hierarchy.move(db, manager.id, None)
+    db.commit()
+    assert not hierarchy.can_approve(db, ceo.id, developer.id)
+    assert not hierarchy.can_approve(db, other.id, manager.id)
+    assert [e.id for e in hierarchy.reports(db, manager.id)] == [developer.id]
@@ -0,0 +1,156 @@
+# tests/test_http_client.py
+import threading
+import time
+from datetime import date
+
+import pytest
+import requests
+
+from app.core.config import settings
+from app.core.http import CircuitBreaker, CircuitOpenError, HttpClient, SingleFlight
+from app.services import holidays
+from tests.http_server import ScriptedServer
+
+
+@pytest.fixture
+def provider():
+    server = ScriptedServer(default=(200, {}, {"ok": True})).start()
+    yield server
+    server.stop()
+
+
+def _client(**kwargs) -> HttpClient:
+    return HttpClient(timeout=(1.0, 2.0), backoff=0, **kwargs)
+
+
+# ----------------- HttpClient -----------------
+def test_retries_server_errors(provider):
+    provider.reply(503)
+    provider.reply(502)
+    assert _client(retries=2).get_json(provider.url) == {"ok": True}
+    assert len(provider.requests) == 3
+
+
+def test_gives_up_after_the_retry_budget(provider):
+    for _ in range(3):
+        provider.reply(500)
+    with pytest.raises(requests.HTTPError):
+        _client(retries=1).get_json(provider.url)
+    assert len(provider.requests) == 2
+
+
+def test_client_errors_are_not_retried(provider):
+    provider.reply(404)
+    with pytest.raises(requests.HTTPError):
+        _client(retries=2).get_json(provider.url)
+    assert len(provider.requests) == 1
+
+
+def test_connections_are_reused(provider):
+    client = _client()
+    for _ in range(3):
+        client.get_json(provider.url)
+    # Every request came in on the same client socket
+    assert len({r["client"] for r in provider.requests}) == 1
+
+
+# ----------------- CircuitBreaker -----------------
+def test_breaker_opens_and_skips_calls(provider):
+    client = _client(retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        provider.reply(500)
+        with pytest.raises(requests.HTTPError):
+            client.get_json(provider.url)
+    with pytest.raises(CircuitOpenError):
+        client.get_json(provider.url)
+    assert len(provider.requests) == 2
+
+
+def test_client_errors_do_not_open_the_breaker(provider):
+    client = _client(retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(3):
+        provider.reply(404)
+        with pytest.raises(requests.HTTPError):
+            client.get_json(provider.url)
+    assert client.breaker.state == "closed"
+    assert client.get_json(provider.url) == {"ok": True}
+
+
+def test_rate_limiting_counts_as_a_failure(provider):
+    client = _client(retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    provider.reply(429)
+    with pytest.raises(requests.HTTPError):
+        client.get_json(provider.url)
+    assert client.breaker.state == "open"
+
+
+def test_half_open_trial_closes_the_breaker(provider):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    client = _client(retries=0, breaker=breaker)
+    provider.reply(500)
+    with pytest.raises(requests.HTTPError):
+        client.get_json(provider.url)
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert client.get_json(provider.url) == {"ok": True}
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+
+
+# ----------------- SingleFlight -----------------
+def test_single_flight_shares_one_call():
+    flight, calls, release = SingleFlight(), [], threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_single_flight_shares_errors_then_forgets_them():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("down")))
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+# ----------------- Holiday provider -----------------
+def test_concurrent_cold_lookups_make_one_provider_call(provider, monkeypatch):
+    monkeypatch.setattr(settings, "HOLIDAY_API_URL", provider.url)
+    monkeypatch.setattr(holidays.holiday_client, "breaker", CircuitBreaker())
+    provider.default = (200, {}, {"response": {"holidays": [{"date": {"iso": "2031-01-26"}},
+                                                            {"date": {"iso": "2031-08-15T00:00:00"}}]}})
+    provider.delay = threading.Event()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(holidays.fetch_holidays("IN", 2031)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    provider.delay.set()
+    for t in threads:
+        t.join(5)
+    assert results == [{date(2031, 1, 26), date(2031, 8, 15)}] * 5
+    assert len(provider.requests) == 1
+    assert "year=2031" in provider.requests[0]["path"]
@@ -0,0 +1,142 @@
+# tests/test_idempotency.py
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.db import SessionLocal, init_db
+from app.models.idempotency import IdempotencyRecord
+from app.models.leave_request import LeaveRequest
+from app.schemas.leave import LeaveApply
+from app.services import outbox
+from app.services.idempotency import _hash
+from app.services.leave_service import LeaveService
+from main import app
+from tests.factories import auth_headers, employee, leave_type
+
+client = TestClient(app)
+START = date.today() + timedelta(days=14 - date.today().weekday())  # a Monday two weeks out
+
+
+@pytest.fixture
+def db(monkeypatch):
+    init_db()
+    monkeypatch.setattr(LeaveService, "_holidays", staticmethod(lambda year: set()))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _leave(emp_id: int, leave_type_id: int, days: int = 3) -> dict:
+    return {"employee_id": emp_id, "leave_type_id": leave_type_id,
+            "start_date": START.isoformat(), "end_date": (START + timedelta(days=days - 1)).isoformat()}
+
+
+def _record(db, key: str) -> IdempotencyRecord | None:
+    db.expire_all()
+    return db.execute(select(IdempotencyRecord).where(IdempotencyRecord.key == key)).scalar_one_or_none()
+
+
+def _leaves(db, emp_id: int) -> int:
+    return db.execute(select(func.count()).select_from(LeaveRequest).where(LeaveRequest.employee_id == emp_id)).scalar()
+
+
+# ----------------- POST /leaves/ -----------------
+def test_retry_replays_the_stored_response(db):
+    emp = employee(db)
+    body, headers = _leave(emp.id, leave_type(db)), {"Idempotency-Key": "apply-1"}
+    first = client.post("/leaves/", json=body, headers=headers)
+    assert first.status_code == 201
+    record = _record(db, "apply-1")
+    assert (record.status_code, record.response_body["id"]) == (201, first.json()["id"])
+
+    retry = client.post("/leaves/", json=body, headers=headers)
+    assert (retry.status_code, retry.json()) == (201, first.json())
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert _leaves(db, emp.id) == 1
+
+
+def test_same_key_with_another_payload_is_rejected(db):
+    emp = employee(db)
+    lt = leave_type(db)
+    headers = {"Idempotency-Key": "apply-2"}
+    assert client.post("/leaves/", json=_leave(emp.id, lt), headers=headers).status_code == 201
+    r = client.post("/leaves/", json=_leave(emp.id, lt, days=2), headers=headers)
+    assert r.status_code == 422
+    assert _leaves(db, emp.id) == 1
+
+
+def test_key_still_claimed_by_a_running_request_conflicts(db):
+    emp = employee(db)
+    body = _leave(emp.id, leave_type(db))
+    now = datetime.now(timezone.utc)
+    db.add(IdempotencyRecord(scope=f"POST /leaves:{emp.id}", key="apply-3", request_hash=_hash(LeaveApply(**body)),
+                             created_at=now, expires_at=now + timedelta(hours=1)))
+    db.commit()
+    assert client.post("/leaves/", json=body, headers={"Idempotency-Key": "apply-3"}).status_code == 409
+    assert _leaves(db, emp.id) == 0
+
+
+def test_rejected_request_releases_its_key(db):
+    emp = employee(db, annual_allocation=1)
+    body, headers = _leave(emp.id, leave_type(db)), {"Idempotency-Key": "apply-4"}
+    assert client.post("/leaves/", json=body, headers=headers).status_code == 400
+    assert _record(db, "apply-4") is None
+    # The client can fix the cause and retry under the same key
+    emp.annual_allocation = 24
+    db.commit()
+    assert client.post("/leaves/", json=body, headers=headers).status_code == 201
+
+
+def test_handler_crash_rolls_back_and_releases_its_key(db, monkeypatch):
+    emp = employee(db)
+    body, headers = _leave(emp.id, leave_type(db)), {"Idempotency-Key": "apply-5"}
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("outbox down")
+
+    monkeypatch.setattr(outbox, "emit", broken)
+    with pytest.raises(RuntimeError):
+        client.post("/leaves/", json=body, headers=headers)
+    assert _record(db, "apply-5") is None
+    assert _leaves(db, emp.id) == 0
+
+
+# ----------------- POST /leaves/bulk -----------------
+def test_bulk_retry_replays_the_report(db):
+    admin = auth_headers(db)
+    emps = [employee(db), employee(db)]
+    body = {"employee_ids": [e.id for e in emps], "leave_type_id": leave_type(db),
+            "start_date": START.isoformat(), "end_date": (START + timedelta(days=1)).isoformat()}
+    headers = {**admin, "Idempotency-Key": "bulk-1"}
+    first = client.post("/leaves/bulk", json=body, headers=headers)
+    assert (first.status_code, first.json()["applied"]) == (200, 2)
+
+    retry = client.post("/leaves/bulk", json=body, headers=headers)
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert [_leaves(db, e.id) for e in emps] == [1, 1]
+    assert client.post("/leaves/bulk", json={**body, "reason": "Shutdown"}, headers=headers).status_code == 422
+
+
+def test_bulk_failure_releases_its_key(db, monkeypatch):
+    admin = auth_headers(db)
+    emp = employee(db)
+    body = {"employee_ids": [emp.id], "leave_type_id": leave_type(db),
+            "start_date": START.isoformat(), "end_date": START.isoformat()}
+    headers = {**admin, "Idempotency-Key": "bulk-2"}
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("outbox down")
+
+    monkeypatch.setattr(outbox, "emit_many", broken)
+    with pytest.raises(RuntimeError):
+        client.post("/leaves/bulk", json=body, headers=headers)
+    assert _record(db, "bulk-2") is None
+    assert _leaves(db, emp.id) == 0
+
+    monkeypatch.undo()
+    monkeypatch.setattr(LeaveService, "_holidays", staticmethod(lambda year: set()))
+    r = client.post("/leaves/bulk", json=body, headers=headers)
+    assert (r.status_code, r.json()["applied"]) == (200, 1)
@@ -0,0 +1,70 @@
+# tests/test_mass_leave.py
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.db import SessionLocal, init_db
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.schemas.leave import LeaveApply, MassLeaveApply
+from app.services.leave_service import LeaveService
+from tests.factories import employee, leave_type
+
+START = date.today() + timedelta(days=21 - date.today().weekday())  # a Monday three weeks out
+END = START + timedelta(days=4)  # five working days
+
+
+@pytest.fixture
+def db(monkeypatch):
+    init_db()
+    monkeypatch.setattr(LeaveService, "_holidays", staticmethod(lambda year: set()))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _mass(db, **target) -> MassLeaveApply:
+    return MassLeaveApply(start_date=START, end_date=END, leave_type_id=leave_type(db), **target)
+
+
+def _results(report) -> dict[int, tuple[str, str | None]]:
+    return {r.employee_id: (r.status, r.detail) for r in report.results}
+
+
+def test_applies_to_eligible_employees_and_reports_the_rest(db):
+    ok = employee(db)
+    busy = employee(db, domain=ok.domain)
+    short = employee(db, domain=ok.domain, annual_allocation=4)
+    late = employee(db, domain=ok.domain, joining_date=END + timedelta(days=30))
+    LeaveService.apply_leave(
+        LeaveApply(employee_id=busy.id, start_date=END, end_date=END, leave_type_id=leave_type(db)), db
+    )
+
+    report = LeaveService.apply_mass_leave(_mass(db, domain=ok.domain), db)
+    assert (report.days, report.applied, report.skipped) == (5, 1, 3)
+    assert _results(report) == {
+        ok.id: ("applied", None),
+        busy.id: ("skipped", "Overlapping leave request exists"),
+        short.id: ("skipped", "Not enough balance. Remaining: 4"),
+        late.id: ("skipped", "Cannot apply leave before joining date"),
+    }
+    rows = db.execute(select(LeaveRequest).where(LeaveRequest.employee_id.in_([ok.id, short.id, late.id]))).scalars().all()
+    assert [(r.employee_id, r.status, r.days) for r in rows] == [(ok.id, LeaveStatus.PENDING, 5)]
+
+
+def test_explicit_ids_report_unknown_employees(db):
+    emp = employee(db)
+    report = LeaveService.apply_mass_leave(_mass(db, employee_ids=[emp.id, 10**9], auto_approve=True), db)
+    assert _results(report) == {emp.id: ("applied", None), 10**9: ("skipped", "Employee not found")}
+    lr = db.get(LeaveRequest, report.results[0].leave_id)
+    assert (lr.status, lr.approved_at is not None) == (LeaveStatus.APPROVED, True)
+
+
+def test_range_without_working_days_is_refused(db):
+    emp = employee(db)
+    weekend = MassLeaveApply(start_date=START - timedelta(days=2), end_date=START - timedelta(days=1),
+                             leave_type_id=leave_type(db), employee_ids=[emp.id])
+    with pytest.raises(HTTPException) as e:
+        LeaveService.apply_mass_leave(weekend, db)
+    assert e.value.status_code == 400
@@ -0,0 +1,228 @@
+# tests/test_outbox.py
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql
+
+from app.core.db import SessionLocal, init_db
+from app.core.http import CircuitBreaker, HttpClient
+from app.models.outbox import OutboxEvent
+from app.services.outbox import _LOCK_EMPLOYEES, OutboxRelay, emit_many, retry_after_seconds
+from tests.http_server import ScriptedServer
+
+
+@pytest.fixture(autouse=True)
+def empty_outbox():
+    init_db()
+    db = SessionLocal()
+    db.execute(delete(OutboxEvent))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def sink():
+    server = ScriptedServer().start()
+    yield server
+    server.stop()
+
+
+def _relay(sink, **kwargs) -> OutboxRelay:
+    client = HttpClient(timeout=(1.0, 2.0), retries=0, backoff=0, breaker=CircuitBreaker(100, 30))
+    return OutboxRelay([sink.url], client=client, **kwargs)
+
+
+def _emit(*employee_ids: int) -> None:
+    db = SessionLocal()
+    emit_many(db, "leave.applied", [
+        {"leave_id": 100 + i, "employee_id": employee_id, "days": 1} for i, employee_id in enumerate(employee_ids)
+    ])
+    db.commit()
+    db.close()
+
+
+def _events() -> list[OutboxEvent]:
+    db = SessionLocal()
+    events = db.execute(select(OutboxEvent).order_by(OutboxEvent.id)).scalars().all()
+    db.close()
+    return events
+
+
+def _delivered_ids(sink) -> list[int]:
+    return [event["id"] for request in sink.requests for event in json.loads(request["body"])["events"]]
+
+
+# ----------------- Delivery -----------------
+def test_delivers_pending_events_in_id_order(sink):
+    _emit(1, 2, 1)
+    assert _relay(sink).run_once() == 3
+    events = _events()
+    assert _delivered_ids(sink) == [e.id for e in events]
+    assert {e.status for e in events} == {"delivered"}
+    body = json.loads(sink.requests[0]["body"])
+    assert body["events"][0]["type"] == "leave.applied"
+    assert body["events"][0]["data"]["leave_id"] == 100
+
+
+def test_batches_are_bounded(sink):
+    _emit(*range(1, 8))
+    assert _relay(sink, batch_size=3, max_batches=2).run_once() == 6
+    assert [len(json.loads(r["body"])["events"]) for r in sink.requests] == [3, 3]
+    assert [e.status for e in _events()].count("pending") == 1
+
+
+def test_failed_batch_is_scheduled_for_retry(sink):
+    _emit(1, 2)
+    sink.reply(500)
+    assert _relay(sink).run_once() == 0
+    events = _events()
+    assert [e.status for e in events] == ["pending", "pending"]
+    assert [e.attempts for e in events] == [1, 1]
+    assert all(e.next_attempt_at is not None and "500" in e.last_error for e in events)
+
+
+def test_waiting_employee_holds_back_their_later_events_only(sink):
+    _emit(1)
+    sink.reply(500)
+    relay = _relay(sink)
+    relay.run_once()
+    _emit(1, 2)
+    sink.requests.clear()
+    assert relay.run_once() == 1
+    first, later, other = _events()
+    assert _delivered_ids(sink) == [other.id]
+    assert (first.status, later.status, other.status) == ("pending", "pending", "delivered")
+
+
+def test_events_go_dead_after_max_attempts(sink):
+    _emit(1)
+    relay = _relay(sink, max_attempts=2)
+    db = SessionLocal()
+    for _ in range(2):
+        sink.reply(500)
+        relay.run_once()
+        # Make the retry due straight away
+        db.execute(OutboxEvent.__table__.update().values(next_attempt_at=None))
+        db.commit()
+    db.close()
+    (event,) = _events()
+    assert (event.status, event.attempts) == ("dead", 2)
+
+
+def test_events_backing_off_do_not_starve_due_ones(sink):
+    _emit(*range(1, 7))
+    relay = _relay(sink, batch_size=3)
+    for _ in range(2):
+        sink.reply(500)
+        relay.run_once()
+    assert [e.attempts for e in _events()] == [1] * 6
+    _emit(99)
+    sink.requests.clear()
+    assert relay.run_once() == 1
+    assert _delivered_ids(sink) == [_events()[-1].id]
+
+
+# ----------------- Several sinks -----------------
+@pytest.fixture
+def second_sink():
+    server = ScriptedServer().start()
+    yield server
+    server.stop()
+
+
+def _relay_to(*sinks, **kwargs) -> OutboxRelay:
+    client = HttpClient(timeout=(1.0, 2.0), retries=0, backoff=0, breaker=CircuitBreaker(100, 30))
+    return OutboxRelay([s.url for s in sinks], client=client, **kwargs)
+
+
+def _make_due() -> None:
+    db = SessionLocal()
+    db.execute(OutboxEvent.__table__.update().values(next_attempt_at=None))
+    db.commit()
+    db.close()
+
+
+def test_a_failing_sink_is_retried_without_resending_to_the_others(sink, second_sink):
+    _emit(1, 2)
+    relay = _relay_to(sink, second_sink)
+    second_sink.reply(500)
+    assert relay.run_once() == 0
+    assert [(e.status, e.attempts, e.delivered_to) for e in _events()] == [("pending", 1, [sink.url])] * 2
+    _make_due()
+    assert relay.run_once() == 2
+    assert len(sink.requests) == 1
+    assert len(second_sink.requests) == 2
+    assert {e.status for e in _events()} == {"delivered"}
+
+
+def test_backpressure_from_one_sink_keeps_what_the_others_accepted(sink, second_sink):
+    _emit(1)
+    relay = _relay_to(sink, second_sink)
+    second_sink.reply(429, headers={"Retry-After": "0"})
+    assert relay.run_once() == 0
+    (event,) = _events()
+    assert (event.status, event.attempts, event.delivered_to) == ("pending", 0, [sink.url])
+    assert relay.run_once() == 1
+    assert len(sink.requests) == 1
+
+
+# ----------------- Backpressure -----------------
+@pytest.mark.parametrize("status", [429, 503])
+def test_backpressure_pauses_without_counting_an_attempt(sink, status):
+    _emit(1)
+    sink.reply(status, headers={"Retry-After": "120"})
+    relay = _relay(sink)
+    assert relay.run_once() == 0
+    assert timedelta(seconds=110) < relay.paused_until - datetime.now(timezone.utc) <= timedelta(seconds=120)
+    (event,) = _events()
+    assert (event.status, event.attempts) == ("pending", 0)
+    # Paused: nothing is sent until the time is up
+    assert relay.run_once() == 0
+    assert len(sink.requests) == 1
+
+
+def test_backpressure_accepts_an_http_date(sink):
+    _emit(1)
+    when = datetime.now(timezone.utc) + timedelta(minutes=5)
+    sink.reply(429, headers={"Retry-After": format_datetime(when, usegmt=True)})
+    relay = _relay(sink)
+    relay.run_once()
+    assert timedelta(minutes=4) < relay.paused_until - datetime.now(timezone.utc) <= timedelta(minutes=5)
+
+
+def test_retry_after_forms():
+    assert retry_after_seconds("30") == 30.0
+    assert retry_after_seconds(None) == 5.0
+    assert retry_after_seconds("soon", default=7.0) == 7.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= retry_after_seconds(later) <= 60
+
+
+# ----------------- Housekeeping -----------------
+def test_purge_keeps_recent_and_undelivered_events(sink):
+    _emit(1, 2)
+    relay = _relay(sink)
+    relay.run_once()
+    _emit(3)
+    db = SessionLocal()
+    first = db.execute(select(OutboxEvent).order_by(OutboxEvent.id)).scalars().first()
+    first.delivered_at = datetime.now(timezone.utc) - timedelta(days=30)
+    db.commit()
+    db.close()
+    assert relay.purge_delivered(older_than_days=7) == 1
+    assert [e.status for e in _events()] == ["delivered", "pending"]
+
+
+def test_nothing_is_sent_without_webhooks():
+    _emit(1)
+    assert OutboxRelay([]).run_once() == 0
+    assert _events()[0].status == "pending"
+
+
+def test_employee_claim_compiles_for_postgres():
+    sql = str(_LOCK_EMPLOYEES.compile(dialect=postgresql.dialect()))
+    assert "pg_try_advisory_xact_lock" in sql and "unnest" in sql
@@ -0,0 +1,62 @@
+# tests/test_password_tokens.py
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.db import SessionLocal, init_db
+from app.models.password_token import PasswordSetupToken
+from app.services import password_tokens
+from tests.factories import employee
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _issue(db, employee_id: int) -> str:
+    token = password_tokens.issue(db, employee_id)
+    db.commit()
+    return token
+
+
+def _later(monkeypatch, **delta) -> None:
+    now = password_tokens._utcnow()
+    monkeypatch.setattr(password_tokens, "_utcnow", lambda: now + timedelta(**delta))
+
+
+def test_token_is_stored_hashed_and_redeemed_once(db):
+    emp = employee(db)
+    token = _issue(db, emp.id)
+    stored = db.execute(select(PasswordSetupToken.token_hash).where(PasswordSetupToken.employee_id == emp.id)).scalar()
+    assert stored == password_tokens.hash_token(token) != token
+
+    assert password_tokens.redeem(db, token).id == emp.id
+    db.commit()
+    assert password_tokens.redeem(db, token) is None
+
+
+def test_reissuing_revokes_the_previous_token(db):
+    emp = employee(db)
+    first = _issue(db, emp.id)
+    second = _issue(db, emp.id)
+    assert password_tokens.redeem(db, first) is None
+    assert password_tokens.redeem(db, second).id == emp.id
+
+
+def test_expired_token_is_refused_and_purged(db, monkeypatch):
+    emp = employee(db)
+    token = _issue(db, emp.id)
+    _later(monkeypatch, hours=settings.PASSWORD_SETUP_TOKEN_TTL_HOURS, minutes=1)
+    assert password_tokens.redeem(db, token) is None
+    assert password_tokens.purge_expired(db) >= 1
+    assert db.execute(select(PasswordSetupToken).where(PasswordSetupToken.employee_id == emp.id)).first() is None
+
+
+def test_unknown_token_is_refused(db):
+    assert password_tokens.redeem(db, "not-a-token") is None
@@ -0,0 +1,30 @@
+# tests/test_push.py
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.core.push import PushBroker
+
+
+def test_queue_size_below_two_is_refused():
+    with pytest.raises(ValidationError):
+        Settings(PUSH_QUEUE_SIZE=1)
+
+
+def test_overflow_sends_overflow_then_closes():
+    async def scenario():
+        broker = PushBroker(queue_size=2, heartbeat_seconds=60)
+        sub = broker.open(7)
+        stream = broker.stream(sub)
+        await stream.__anext__()  # ready
+        for i in range(3):
+            broker._deliver(sub.key, f"event {i}".encode())
+        frames = [frame async for frame in stream]
+        broker._heartbeat_task.cancel()
+        return frames, broker.connections
+
+    frames, connections = asyncio.run(scenario())
+    assert len(frames) == 1 and frames[0].startswith(b"event: overflow")
+    assert connections == 0
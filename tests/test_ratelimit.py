@@ -0,0 +1,24 @@
+# tests/test_ratelimit.py
+import pytest
+
+from app.core.cache import RedisBackend
+from app.core.ratelimit import MemoryBucketStore, Rule, SharedBucketStore
+from tests.resp_server import RespServer
+
+
+def test_memory_bucket_refuses_past_the_burst():
+    store, rule = MemoryBucketStore(), Rule(2, 1)
+    assert [store.take("login:ip:1", rule) for _ in range(2)] == [0, 0]
+    assert store.take("login:ip:1", rule) > 0
+
+
+def test_shared_bucket_script_is_not_sent_twice():
+    server = RespServer().start()
+    try:
+        store = SharedBucketStore(RedisBackend(server.url))
+        server.drop_after["EVAL"] = True
+        with pytest.raises((OSError, ConnectionError)):
+            store.take("login:ip:1", Rule(5, 1))
+        assert server.count("EVAL") == 1
+    finally:
+        server.stop()
@@ -0,0 +1,124 @@
+# tests/test_replica_routing.py
+from datetime import date
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.core import db as core_db
+from app.core.db import Base, SessionLocal, TenantSession, create_db_engine, get_read_db, init_db, is_replica
+from app.core.etag import bump
+from app.models.employee import Employee
+from app.models.leave_request import LeaveRequest, LeaveStatus
+from app.models.leave_type import LeaveType
+from app.services.leave_service import LeaveService
+
+
+def _request(auth: str = "Bearer test") -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", auth.encode())], "client": ("10.0.0.1", 1234)})
+
+
+def _open(request: Request):
+    gen = get_read_db(request)
+    return gen, next(gen)
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second SQLite database standing in for the replica; it only sees what the test copies into it."""
+    init_db()
+    replica_engine = create_db_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(core_db, "replica_engine", replica_engine)
+    monkeypatch.setattr(core_db, "ReplicaSessionLocal",
+                        sessionmaker(bind=replica_engine, class_=TenantSession, autocommit=False, autoflush=False))
+    monkeypatch.setattr(core_db, "_replica_health", {"checked_at": 0.0, "fresh": False})
+    yield replica_engine
+    replica_engine.dispose()
+
+
+@pytest.fixture
+def employee():
+    db = SessionLocal()
+    leave_type = db.query(LeaveType).filter_by(name="Replica test").first()
+    if leave_type is None:
+        leave_type = LeaveType(name="Replica test", default_balance=10)
+        db.add(leave_type)
+        db.flush()
+    emp = Employee(name="Replica", email=f"replica{db.query(Employee).count()}@x.com", phone_number=9876543210,
+                   domain="eng", joining_date=date(2024, 1, 1), annual_allocation=20)
+    db.add(emp)
+    db.flush()
+    db.add(LeaveRequest(employee_id=emp.id, start_date=date(2026, 3, 2), end_date=date(2026, 3, 4), days=3,
+                        status=LeaveStatus.APPROVED, leave_type_id=leave_type.id))
+    db.commit()
+    ids = emp.id, leave_type.id
+    db.close()
+    bump(f"balance:{ids[0]}")
+    return ids
+
+
+def test_primary_without_replica(monkeypatch):
+    monkeypatch.setattr(core_db, "ReplicaSessionLocal", None)
+    gen, db = _open(_request())
+    assert not is_replica(db)
+    gen.close()
+
+
+def test_fresh_replica_serves_reads(replica):
+    gen, db = _open(_request())
+    assert is_replica(db)
+    assert db.get_bind().url == replica.url
+    gen.close()
+
+
+def test_lagging_replica_falls_back_to_primary(replica, monkeypatch):
+    monkeypatch.setattr(core_db, "replica_is_fresh", lambda: False)
+    gen, db = _open(_request())
+    assert not is_replica(db)
+    gen.close()
+
+
+def test_health_check_is_cached_and_failures_count_as_stale(replica, monkeypatch):
+    assert core_db.replica_is_fresh() is True
+    replica.dispose()
+    monkeypatch.setattr(core_db, "replica_engine", None)
+    # Within the interval the cached answer stands
+    assert core_db.replica_is_fresh() is True
+    core_db._replica_health["checked_at"] = 0.0
+    assert core_db.replica_is_fresh() is False
+
+
+def test_recent_writer_reads_from_primary(replica):
+    request = _request("Bearer writer")
+    gen = core_db.get_db(request)
+    db = next(gen)
+    db.add(LeaveType(name=f"Written {id(request)}", default_balance=1))
+    db.commit()
+    gen.close()
+
+    gen, db = _open(request)
+    assert not is_replica(db)
+    gen.close()
+    # Other clients still use the replica
+    gen, db = _open(_request("Bearer someone-else"))
+    assert is_replica(db)
+    gen.close()
+
+
+def test_balance_is_never_cached_from_the_replica(replica, employee):
+    employee_id, leave_type_id = employee
+    # The replica has the employee but not the approved leave yet
+    lagging = core_db.ReplicaSessionLocal()
+    lagging.add(LeaveType(id=leave_type_id, name="Replica test", default_balance=10))
+    lagging.add(Employee(id=employee_id, name="Replica", email="lagging@x.com", phone_number=9876543210,
+                         domain="eng", joining_date=date(2024, 1, 1), annual_allocation=20))
+    lagging.commit()
+    lagging.info["replica"] = True
+
+    assert LeaveService._used_days(employee_id, lagging) == 3
+    # The cached figure came from the primary too
+    primary = SessionLocal()
+    assert LeaveService._used_days(employee_id, primary) == 3
+    primary.close()
+    lagging.close()
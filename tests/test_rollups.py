@@ -0,0 +1,76 @@
+# tests/test_rollups.py
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.db import SessionLocal, init_db
+from app.models.leave_rollup import LeaveUtilizationRollup
+from app.schemas.leave import LeaveAction, LeaveApply
+from app.services import rollups
+from app.services.leave_service import LeaveService
+from tests.factories import employee, leave_type
+
+# Straddles the end of next month, so each request touches two month rows
+_NEXT_MONTH = (date.today().replace(day=1) + timedelta(days=62)).replace(day=1)
+START, END = _NEXT_MONTH - timedelta(days=3), _NEXT_MONTH + timedelta(days=3)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    init_db()
+    monkeypatch.setattr(LeaveService, "_holidays", staticmethod(lambda year: set()))
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def _weekdays_per_month() -> dict[date, int]:
+    days = [START + timedelta(days=i) for i in range((END - START).days + 1)]
+    months = sorted({d.replace(day=1) for d in days})
+    return {m: sum(1 for d in days if d.replace(day=1) == m and d.weekday() < 5) for m in months}
+
+
+def _rollups(db, domain: str) -> dict[date, tuple[int, int, int]]:
+    """(approved_days, pending_days, requests) per month for the domain."""
+    db.expire_all()
+    rows = db.execute(select(LeaveUtilizationRollup).where(LeaveUtilizationRollup.domain == domain)).scalars()
+    return {r.month: (r.approved_days, r.pending_days, r.requests) for r in rows}
+
+
+def _apply(db, emp) -> int:
+    payload = LeaveApply(employee_id=emp.id, start_date=START, end_date=END, leave_type_id=leave_type(db))
+    return LeaveService.apply_leave(payload, db).id
+
+
+def test_apply_adds_pending_days_to_each_month(db):
+    emp = employee(db)
+    _apply(db, emp)
+    split = _weekdays_per_month()
+    assert len(split) == 2
+    assert _rollups(db, emp.domain) == {m: (0, days, 1) for m, days in split.items()}
+
+
+def test_approve_moves_days_from_pending_to_approved(db):
+    emp = employee(db)
+    LeaveService.act_on_leave(_apply(db, emp), LeaveAction(action="APPROVE"), db)
+    assert _rollups(db, emp.domain) == {m: (days, 0, 1) for m, days in _weekdays_per_month().items()}
+
+
+def test_reject_and_cancel_take_the_request_back_out(db):
+    emp = employee(db)
+    LeaveService.act_on_leave(_apply(db, emp), LeaveAction(action="REJECT"), db)
+    assert set(_rollups(db, emp.domain).values()) == {(0, 0, 0)}
+
+    other = employee(db, domain=emp.domain)
+    LeaveService.cancel_leave(_apply(db, other), other.id, db)
+    assert set(_rollups(db, emp.domain).values()) == {(0, 0, 0)}
+
+
+def test_rebuild_matches_the_incremental_rows(db):
+    emp = employee(db)
+    LeaveService.act_on_leave(_apply(db, emp), LeaveAction(action="APPROVE"), db)
+    _apply(db, employee(db, domain=emp.domain))
+    incremental = _rollups(db, emp.domain)
+    rollups.rebuild(db, LeaveService._holidays)
+    assert _rollups(db, emp.domain) == incremental
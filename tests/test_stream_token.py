@@ -0,0 +1,45 @@
+# tests/test_stream_token.py
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.db import SessionLocal, init_db
+from app.models.user import RoleEnum, User
+from app.Webhandler.auth import STREAM_TOKEN_PURPOSE, create_access_token, create_stream_token
+from app.Webhandler.oauth2 import _resolve_user
+
+EMAIL = "stream@x.com"
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    if session.query(User).filter(User.email == EMAIL).first() is None:
+        session.add(User(email=EMAIL, role=RoleEnum.employee))
+        session.commit()
+    yield session
+    session.close()
+
+
+def test_stream_token_only_opens_the_stream(db):
+    token = create_stream_token(EMAIL, "default")
+    assert _resolve_user(token, db, STREAM_TOKEN_PURPOSE).email == EMAIL
+    # Not accepted as a login token by the rest of the API
+    with pytest.raises(HTTPException) as e:
+        _resolve_user(token, db)
+    assert e.value.status_code == 401
+
+
+def test_login_token_is_not_a_stream_token(db):
+    login = create_access_token({"sub": EMAIL, "role": "employee", "tenant": "default"})
+    assert _resolve_user(login, db).email == EMAIL
+    with pytest.raises(HTTPException):
+        _resolve_user(login, db, STREAM_TOKEN_PURPOSE)
+
+
+def test_expired_stream_token_is_rejected(db):
+    token = create_access_token({"sub": EMAIL, "purpose": STREAM_TOKEN_PURPOSE}, timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        _resolve_user(token, db, STREAM_TOKEN_PURPOSE)
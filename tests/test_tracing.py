@@ -0,0 +1,150 @@
+# tests/test_tracing.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind, StatusCode
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.db import create_db_engine
+from app.core.http import CircuitBreaker, HttpClient
+from app.core.tracing import instrument_app, instrument_engine, instrument_sessions, traced_methods, tracer
+from tests.http_server import ScriptedServer
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def spans():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer.set_provider(provider)
+    yield exporter
+    tracer.set_provider(None)
+
+
+def _named(exporter, name):
+    return [s for s in exporter.get_finished_spans() if s.name == name]
+
+
+# ----------------- Tracer -----------------
+def test_disabled_tracer_records_nothing():
+    assert not tracer.enabled
+    with tracer.span("work") as span:
+        assert span is None
+        assert tracer.current_span() is None
+    assert tracer.inject({}) == {}
+
+
+def test_spans_nest_and_carry_attributes(spans):
+    with tracer.span("outer", attributes={"employee_id": 7}) as outer:
+        with tracer.span("inner", kind="client") as inner:
+            assert tracer.current_span() is inner
+        outer.set_attribute("days", 3)
+    (inner,), (outer,) = _named(spans, "inner"), _named(spans, "outer")
+    assert inner.parent.span_id == outer.context.span_id
+    assert inner.kind == SpanKind.CLIENT
+    assert dict(outer.attributes) == {"employee_id": 7, "days": 3}
+
+
+def test_exceptions_fail_the_span(spans):
+    with pytest.raises(ValueError):
+        with tracer.span("work"):
+            raise ValueError("bad dates")
+    (span,) = spans.get_finished_spans()
+    assert span.status.status_code == StatusCode.ERROR
+    assert span.events[0].name == "exception"
+
+
+def test_traced_methods_wraps_public_and_listed_private_methods(spans):
+    @traced_methods("_listed")
+    class Service:
+        @staticmethod
+        def public():
+            return Service._listed() + Service._skipped()
+
+        @staticmethod
+        def _listed():
+            return 1
+
+        @staticmethod
+        def _skipped():
+            return 2
+
+    assert Service.public() == 3
+    assert sorted(s.name for s in spans.get_finished_spans()) == ["Service._listed", "Service.public"]
+
+
+# ----------------- Propagation -----------------
+def test_outgoing_requests_carry_traceparent(spans):
+    server = ScriptedServer().start()
+    try:
+        client = HttpClient(timeout=(1.0, 2.0), retries=0, backoff=0, breaker=CircuitBreaker())
+        with tracer.span("job"):
+            client.get_json(server.url)
+    finally:
+        server.stop()
+    (http,) = _named(spans, "HTTP GET")
+    version, trace_id, parent_id, flags = server.requests[0]["headers"]["traceparent"].split("-")
+    assert (trace_id, parent_id) == (f"{http.context.trace_id:032x}", f"{http.context.span_id:016x}")
+    assert int(flags, 16) & 1
+    assert http.attributes["http.status_code"] == 200
+
+
+def test_server_span_continues_the_callers_trace(spans):
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        tracer.current_span().set_attribute("tenant.id", "acme")
+        return {}
+
+    instrument_app(app)
+    TestClient(app).get("/ping", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+    (server,) = [s for s in spans.get_finished_spans() if s.kind == SpanKind.SERVER]
+    assert f"{server.context.trace_id:032x}" == TRACE_ID
+    assert f"{server.parent.span_id:016x}" == PARENT_ID
+    assert server.attributes["tenant.id"] == "acme"
+    # Per-message send/receive spans are left out
+    assert len(spans.get_finished_spans()) == 1
+
+
+# ----------------- SQL -----------------
+def test_statements_and_commits_are_children_of_the_request(spans, tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'traced.db'}")
+    instrument_engine(engine)
+    factory = sessionmaker(bind=engine)
+    instrument_sessions(factory)
+    with tracer.span("request") as request:
+        db = factory()
+        db.execute(text("CREATE TABLE t (x INTEGER)"))
+        db.execute(text("INSERT INTO t VALUES (1)"))
+        db.commit()
+        db.close()
+    # Outside a trace nothing is recorded
+    with engine.connect() as conn:
+        conn.execute(text("SELECT x FROM t"))
+    engine.dispose()
+    request_id = request.get_span_context().span_id
+    statements = [s for s in spans.get_finished_spans() if s.name.startswith("SQL ")]
+    assert [s.name for s in statements] == ["SQL CREATE", "SQL INSERT"]
+    assert {s.parent.span_id for s in statements} == {request_id}
+    assert statements[1].attributes["db.rowcount"] == 1
+    (commit,) = _named(spans, "Session.commit")
+    assert commit.parent.span_id == request_id
+
+
+def test_failed_statement_fails_its_span(spans):
+    engine = create_db_engine("sqlite://")
+    instrument_engine(engine)
+    with tracer.span("request"), engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing"))
+    engine.dispose()
+    (select,) = _named(spans, "SQL SELECT")
+    assert select.status.status_code == StatusCode.ERROR
@@ -0,0 +1,76 @@
+# tests/test_working_days.py
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.http import CircuitBreaker
+from app.models.user import RoleEnum, User
+from app.services import holidays
+from app.Webhandler.auth import create_access_token
+from main import app
+from tests.http_server import ScriptedServer
+
+YEAR = date.today().year
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def auth():
+    db = SessionLocal()
+    if db.query(User).filter(User.email == "calendar@x.com").first() is None:
+        db.add(User(email="calendar@x.com", role=RoleEnum.employee))
+        db.commit()
+    db.close()
+    token = create_access_token({"sub": "calendar@x.com", "role": "employee", "tenant": "default"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    server = ScriptedServer(default=(200, {}, {"response": {"holidays": []}})).start()
+    monkeypatch.setattr(settings, "HOLIDAY_API_URL", server.url)
+    monkeypatch.setattr(settings, "WORKING_DAYS_COUNTRIES", ["US"])
+    monkeypatch.setattr(holidays.holiday_client, "breaker", CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    yield server
+    server.stop()
+
+
+def _body(start: str, end: str, country: str | None = None) -> dict:
+    return {"country": country, "ranges": [{"start_date": start, "end_date": end}]}
+
+
+def test_requires_a_login(provider):
+    assert client.post("/leaves/working-days", json=_body(f"{YEAR}-03-02", f"{YEAR}-03-06")).status_code == 401
+    assert provider.requests == []
+
+
+def test_counts_working_days(provider, auth):
+    r = client.post("/leaves/working-days", headers=auth, json=_body(f"{YEAR + 1}-03-01", f"{YEAR + 1}-03-31", "US"))
+    assert r.status_code == 200
+    assert r.json()["days"] == [sum(1 for d in range(1, 32) if date(YEAR + 1, 3, d).weekday() < 5)]
+
+
+def test_unlisted_country_and_far_years_are_refused(provider, auth):
+    r = client.post("/leaves/working-days", headers=auth, json=_body(f"{YEAR}-03-02", f"{YEAR}-03-06", "FR"))
+    assert (r.status_code, r.json()["detail"]) == (400, "Unsupported country: FR")
+    far = YEAR + settings.WORKING_DAYS_YEAR_WINDOW + 1
+    r = client.post("/leaves/working-days", headers=auth, json=_body(f"{far}-03-02", f"{far}-03-06"))
+    assert r.status_code == 400
+    assert provider.requests == []
+
+
+def test_provider_rejection_is_a_400_and_leaves_the_breaker_closed(provider, auth):
+    provider.reply(404)
+    r = client.post("/leaves/working-days", headers=auth, json=_body(f"{YEAR - 1}-03-02", f"{YEAR - 1}-03-06", "US"))
+    assert r.status_code == 400
+    assert holidays.holiday_client.breaker.state == "closed"
+
+
+def test_open_breaker_is_a_503(provider, auth):
+    holidays.holiday_client.breaker.record_failure()
+    r = client.post("/leaves/working-days", headers=auth, json=_body(f"{YEAR - 2}-03-02", f"{YEAR - 2}-03-06", "US"))
+    assert r.status_code == 503
+    assert "Retry-After" in r.headers